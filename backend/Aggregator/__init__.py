@@ -1,28 +1,42 @@
+import math
 import os
 from datetime import datetime, timezone
 from collections import defaultdict
 
-from azure.cosmos import CosmosClient
+from shared.histograms import HistogramSet
 
-# 🔐 Key Vault (shared across App Service & Functions)
-from shared.secrets import get_secret
+# 🔐 Cosmos containers (lazy, Key Vault backed; reused across invocations)
+from shared.cosmos import (
+    traces_container,
+    evaluations_container as evals_container,
+    metrics_container,
+)
 
 
-def main(mytimer):
+def _score_stats(scores):
+    n = len(scores)
+    mean = sum(scores) / n
+    var = sum((s - mean) ** 2 for s in scores) / (n - 1) if n > 1 else 0.0
+    return n, mean, var
 
-    # ==========================================
-    # Connect to Cosmos DB (via Key Vault)
-    # ==========================================
-    COSMOS_CONN_WRITE = get_secret("COSMOS-CONN-WRITE")
 
-    cosmos = CosmosClient.from_connection_string(
-        COSMOS_CONN_WRITE
-    )
-    db = cosmos.get_database_client("llmops-data")
+def _compare_scores(control, variant):
+    """Variant vs control: mean difference, Welch z and two-sided p (normal approx.)."""
+    if len(control) < 2 or len(variant) < 2:
+        return {"delta": None, "z": None, "p_value": None}
+
+    n1, m1, v1 = _score_stats(control)
+    n2, m2, v2 = _score_stats(variant)
+    se = math.sqrt(v1 / n1 + v2 / n2)
+    z = (m2 - m1) / se if se else None
+    return {
+        "delta": round(m2 - m1, 3),
+        "z": round(z, 2) if z is not None else None,
+        "p_value": round(math.erfc(abs(z) / math.sqrt(2)), 4) if z is not None else None,
+    }
+
 
-    traces_container = db.get_container_client("traces")
-    evals_container = db.get_container_client("evaluations")
-    metrics_container = db.get_container_client("metrics")
+def main(mytimer):
 
     # ==========================================
     # 1. Load Traces
@@ -129,6 +143,151 @@ def main(mytimer):
                 "avg_score": round(eval_score_sum[name] / count, 3)
             }
 
+    # ==========================================
+    # 5b. Pre-screen Report (LLM calls avoided)
+    # ==========================================
+    # Agreement is measured on shadow samples only: confident local
+    # verdicts that were still sent to the LLM. Both tiers "agree"
+    # when they land on the same side of the 0.5 pass mark.
+    prescreen_stats = defaultdict(lambda: {
+        "evaluations": 0,
+        "llm_calls_avoided": 0,
+        "cache_hits": 0,
+        "shadow_samples": 0,
+        "shadow_agreements": 0,
+        "shadow_abs_error": 0.0,
+    })
+
+    for e in evaluations:
+        method = e.get("method")
+        if method is None:
+            continue
+
+        p = prescreen_stats[e["evaluator_name"]]
+        p["evaluations"] += 1
+
+        if method == "prescreen":
+            p["llm_calls_avoided"] += 1
+            continue
+
+        if method == "cache":
+            # reused verdict (shared.evalcache), not a fresh shadow sample
+            p["cache_hits"] += 1
+            continue
+
+        local = e.get("prescreen_score")
+        score = e.get("score")
+        if e.get("prescreen_confident") and local is not None and score is not None:
+            p["shadow_samples"] += 1
+            p["shadow_agreements"] += int((local >= 0.5) == (score >= 0.5))
+            p["shadow_abs_error"] += abs(local - score)
+
+    prescreen_summary = {}
+    for name, p in prescreen_stats.items():
+        shadows = p["shadow_samples"]
+        prescreen_summary[name] = {
+            "evaluations": p["evaluations"],
+            "llm_calls_avoided": p["llm_calls_avoided"],
+            "avoided_share": round(
+                p["llm_calls_avoided"] / p["evaluations"], 3
+            ),
+            "cache_hits": p["cache_hits"],
+            "shadow_samples": shadows,
+            "agreement": round(
+                p["shadow_agreements"] / shadows, 3
+            ) if shadows else None,
+            "mean_abs_error": round(
+                p["shadow_abs_error"] / shadows, 3
+            ) if shadows else None,
+        }
+
+    # ==========================================
+    # 5c. Prompt Variant Comparison (A/B)
+    # ==========================================
+    # Traces carry prompt_name / prompt_variant when the caller was routed
+    # through a split (services/variants.py). Each variant is compared
+    # with "control" (or the first variant by name) per evaluator.
+    variant_traces = defaultdict(lambda: {
+        "traces": 0,
+        "latency": 0,
+        "cost": 0.0,
+        "versions": set(),
+        "scores": defaultdict(list),
+    })
+
+    for t in traces:
+        prompt, variant = t.get("prompt_name"), t.get("prompt_variant")
+        if not prompt or not variant:
+            continue
+
+        v = variant_traces[(prompt, variant)]
+        v["traces"] += 1
+        v["latency"] += t.get("latency_ms", 0) or 0
+        v["cost"] += t.get("cost", 0.0) or 0.0
+        if t.get("prompt_version") is not None:
+            v["versions"].add(t["prompt_version"])
+
+        for name, score in evals_by_trace.get(t.get("trace_id"), {}).items():
+            if score is not None:
+                v["scores"][name].append(score)
+
+    variants_by_prompt = defaultdict(dict)
+    for (prompt, variant), v in variant_traces.items():
+        variants_by_prompt[prompt][variant] = v
+
+    variant_summary = {}
+    for prompt, variants in variants_by_prompt.items():
+        control = "control" if "control" in variants else sorted(variants)[0]
+        control_scores = variants[control]["scores"]
+
+        variant_summary[prompt] = {"control": control, "variants": {}}
+        for variant, v in variants.items():
+            entry = {
+                "traces": v["traces"],
+                "versions": sorted(v["versions"]),
+                "avg_latency_ms": round(v["latency"] / v["traces"], 2),
+                "total_cost": round(v["cost"], 6),
+                "scores": {
+                    name: {
+                        "count": len(scores),
+                        "avg_score": round(sum(scores) / len(scores), 3),
+                    }
+                    for name, scores in v["scores"].items()
+                },
+            }
+            if variant != control:
+                entry["vs_control"] = {
+                    name: _compare_scores(control_scores[name], scores)
+                    for name, scores in v["scores"].items()
+                    if name in control_scores
+                }
+            variant_summary[prompt]["variants"][variant] = entry
+
+    # ==========================================
+    # 5d. Distributions (pre-binned for /dashboard/histograms)
+    # ==========================================
+    trace_hists = {m: HistogramSet(m) for m in ("latency_ms", "cost", "tokens")}
+    trace_labels = {}
+    for t in traces:
+        labels = {"model": t.get("model"), "trace_name": t.get("trace_name")}
+        trace_labels[t.get("trace_id")] = labels
+        for metric, hist in trace_hists.items():
+            hist.add(t.get(metric), labels)
+
+    score_hists = defaultdict(lambda: HistogramSet("score"))
+    for e in evaluations:
+        score_hists[e["evaluator_name"]].add(
+            e.get("score"), trace_labels.get(e.get("trace_id"), {})
+        )
+
+    histograms = {
+        "id": "histograms_snapshot",
+        "partitionKey": "histograms_snapshot",
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "metrics": {m: h.to_doc() for m, h in trace_hists.items()},
+        "scores": {name: h.to_doc() for name, h in score_hists.items()},
+    }
+
     # ==========================================
     # 6. Final KPI Snapshot
     # ==========================================
@@ -160,10 +319,13 @@ def main(mytimer):
         "cost_by_trace_name": dict(cost_by_trace_name),
         "tokens_by_trace_name": dict(tokens_by_trace_name),
 
-        "evaluation_summary": evaluation_summary
+        "evaluation_summary": evaluation_summary,
+        "prescreen_summary": prescreen_summary,
+        "variant_summary": variant_summary
     }
 
     # ==========================================
     # 7. Save Metrics
     # ==========================================
     metrics_container.upsert_item(metrics)
+    metrics_container.upsert_item(histograms)
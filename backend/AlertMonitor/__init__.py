@@ -0,0 +1,23 @@
+import logging
+
+from azure.functions import DocumentList
+
+from shared.alerts import cosmos_engine
+
+# Module level: windows live as long as the worker process
+engine = cosmos_engine("traces")
+
+
+# --------------------------------------------------
+# Azure Function Entry (traces change feed)
+# --------------------------------------------------
+def main(documents: DocumentList):
+    if not documents:
+        return
+
+    transitions = engine.process_batch([dict(d) for d in documents])
+
+    logging.info(
+        f"[AlertMonitor] {len(documents)} events against {len(engine.rules)} rules, "
+        f"{len(transitions)} alert transitions"
+    )
@@ -0,0 +1,23 @@
+import logging
+
+from azure.functions import DocumentList
+
+from shared.alerts import cosmos_engine
+
+# Module level: windows live as long as the worker process
+engine = cosmos_engine("evaluations")
+
+
+# --------------------------------------------------
+# Azure Function Entry (evaluations change feed)
+# --------------------------------------------------
+def main(documents: DocumentList):
+    if not documents:
+        return
+
+    transitions = engine.process_batch([dict(d) for d in documents])
+
+    logging.info(
+        f"[AlertMonitorScores] {len(documents)} events against {len(engine.rules)} rules, "
+        f"{len(transitions)} alert transitions"
+    )
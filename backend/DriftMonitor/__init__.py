@@ -0,0 +1,59 @@
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from azure.cosmos import exceptions
+from azure.functions import DocumentList
+
+from shared.cosmos import metrics_container
+from shared.drift import apply_scores, drift_keys
+
+CONCURRENCY = 8
+
+
+# --------------------------------------------------
+# Azure Function Entry (evaluations change feed)
+# --------------------------------------------------
+def main(documents: DocumentList):
+    if not documents:
+        return
+
+    # `ttl` is stamped by RetentionArchiver on evaluations it archived; that
+    # patch comes through the change feed again and is not a new score
+    evaluations = [
+        e for e in (dict(d) for d in documents)
+        if e.get("status") == "completed" and e.get("evaluator_name")
+        and isinstance(e.get("score"), (int, float)) and "ttl" not in e
+    ]
+    evaluations.sort(key=lambda e: e.get("timestamp") or "")
+
+    scores = defaultdict(list)
+    for e in evaluations:
+        for key in drift_keys(e):
+            scores[key].append((float(e["score"]), e.get("timestamp")))
+    if not scores:
+        return
+
+    def apply(key):
+        try:
+            return apply_scores(metrics_container, key, scores[key])
+        except exceptions.CosmosHttpResponseError as e:
+            if e.status_code != 400:
+                raise
+            # a rejected document fails the same way on every redelivery
+            logging.error(f"[DriftMonitor] Skipping {key}: {e}")
+            return []
+
+    # Raising triggers the retry policy in function.json. Redelivered
+    # batches count twice, which only nudges the running statistics.
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        results = dict(zip(scores, pool.map(apply, scores)))
+
+    for key, changes in results.items():
+        for change in changes:
+            logging.warning(
+                f"[DriftMonitor] {change['direction']} shift for {'/'.join(key)}: "
+                f"{change['baseline_mean']} -> {change['recent_mean']}"
+            )
+
+    logging.info(f"[DriftMonitor] {len(evaluations)} scores into {len(scores)} detectors")
@@ -0,0 +1,129 @@
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from azure.cosmos import exceptions
+
+from EvaluatorRunner import resolve_evaluator, run_evaluation
+from shared.evalcache import evaluator_scope
+from shared.cosmos import (
+    traces_container_read,
+    evaluations_container,
+    eval_retries_container,
+    eval_deadletters_container,
+)
+from shared.retry import (
+    MAX_ATTEMPTS,
+    dead_letter,
+    due_retries,
+    is_failure,
+    schedule_retry,
+)
+
+
+BATCH_SIZE = 50
+CONCURRENCY = 8
+
+
+# --------------------------------------------------
+# Re-run one parked evaluation
+# --------------------------------------------------
+def redrive(item: dict) -> dict:
+    """
+    Re-run a retry / dead-letter item against its trace and persist
+    the resulting evaluation (overwriting the failed document).
+    Raises LookupError when the evaluator or trace no longer exists.
+    """
+    evaluator_fn = resolve_evaluator(item.get("evaluator", {}))
+    if not evaluator_fn:
+        raise LookupError(
+            f"No evaluator registered for template "
+            f"{item.get('evaluator', {}).get('template', {}).get('id')}"
+        )
+
+    trace_id = item["trace_id"]
+    try:
+        trace = traces_container_read.read_item(
+            item=trace_id,
+            partition_key=trace_id,
+        )
+    except exceptions.CosmosResourceNotFoundError:
+        raise LookupError(f"Trace {trace_id} not found")
+
+    doc = run_evaluation(
+        item["evaluator_name"],
+        evaluator_fn,
+        trace_id,
+        trace,
+        item.get("evaluator", {}).get("execution", {}),
+        cache_scope=evaluator_scope(item.get("evaluator", {})),
+    )
+    doc["attempts"] = item.get("attempts", 0) + 1
+
+    evaluations_container.upsert_item(doc)
+    return doc
+
+
+def process_retry(item: dict) -> str:
+    """Retry one due item: recovered, rescheduled or dead-lettered."""
+    attempts = item.get("attempts", 0) + 1
+
+    try:
+        doc = redrive(item)
+        error = doc["explanation"] if is_failure(doc) else None
+    except LookupError as e:
+        # not transient — no point backing off
+        dead_letter(eval_retries_container, eval_deadletters_container, item, str(e))
+        return "dead_lettered"
+    except Exception as e:
+        logging.exception(f"[EvaluatorRetry] Retry failed for {item['id']}")
+        error = str(e)
+
+    if error is None:
+        eval_retries_container.delete_item(
+            item=item["id"],
+            partition_key=item["trace_id"],
+        )
+        return "recovered"
+
+    if attempts >= MAX_ATTEMPTS:
+        dead_letter(
+            eval_retries_container,
+            eval_deadletters_container,
+            {**item, "attempts": attempts},
+            error,
+        )
+        return "dead_lettered"
+
+    schedule_retry(
+        eval_retries_container,
+        {
+            "id": item["id"],
+            "trace_id": item["trace_id"],
+            "evaluator_name": item["evaluator_name"],
+            "explanation": error,
+            "status": "failed",
+        },
+        item.get("evaluator", {}),
+        attempts=attempts,
+    )
+    return "rescheduled"
+
+
+# --------------------------------------------------
+# Azure Function Entry (timer)
+# --------------------------------------------------
+def main(mytimer):
+    try:
+        items = due_retries(eval_retries_container, limit=BATCH_SIZE)
+    except Exception:
+        logging.exception("[EvaluatorRetry] Failed to load retry queue")
+        return
+
+    if not items:
+        return
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        outcomes = Counter(pool.map(process_retry, items))
+
+    logging.info(f"[EvaluatorRetry] Processed {len(items)} retries: {dict(outcomes)}")
@@ -0,0 +1,109 @@
+"""
+Re-drive dead-lettered evaluations in bulk.
+
+    python -m EvaluatorRetry.replay --evaluator hallucination --concurrency 16
+    python -m EvaluatorRetry.replay --requeue     # back onto the retry queue
+
+Run from the backend/ directory with KEY_VAULT_URI set.
+"""
+
+import argparse
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from EvaluatorRetry import redrive
+from shared.cosmos import (
+    eval_retries_container,
+    eval_deadletters_container,
+)
+from shared.retry import is_failure, schedule_retry
+
+
+def load_dead_letters(evaluator: str | None = None, limit: int = 1000) -> list:
+    query = "SELECT TOP @limit * FROM c"
+    params = [{"name": "@limit", "value": limit}]
+
+    if evaluator:
+        query += " WHERE c.evaluator_name = @evaluator"
+        params.append({"name": "@evaluator", "value": evaluator})
+
+    return list(
+        eval_deadletters_container.query_items(
+            query=query,
+            parameters=params,
+            enable_cross_partition_query=True,
+        )
+    )
+
+
+def _remove(item: dict):
+    eval_deadletters_container.delete_item(
+        item=item["id"],
+        partition_key=item["trace_id"],
+    )
+
+
+def replay_one(item: dict, requeue: bool = False) -> str:
+    if requeue:
+        schedule_retry(
+            eval_retries_container,
+            {**item, "explanation": item.get("last_error", ""), "status": "failed"},
+            item.get("evaluator", {}),
+            attempts=0,
+        )
+        _remove(item)
+        return "requeued"
+
+    try:
+        doc = redrive(item)
+        error = doc["explanation"] if is_failure(doc) else None
+    except Exception as e:
+        error = str(e)
+
+    if error is None:
+        _remove(item)
+        return "recovered"
+
+    eval_deadletters_container.upsert_item({
+        **{k: v for k, v in item.items() if not k.startswith("_")},
+        "last_error": error,
+        "replays": item.get("replays", 0) + 1,
+        "last_replayed_at": datetime.now(timezone.utc).isoformat(),
+    })
+    return "failed"
+
+
+def replay(
+    evaluator: str | None = None,
+    limit: int = 1000,
+    concurrency: int = 8,
+    requeue: bool = False,
+) -> dict:
+    items = load_dead_letters(evaluator, limit)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = Counter(pool.map(lambda i: replay_one(i, requeue), items))
+
+    return {"dead_letters": len(items), **outcomes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--evaluator", help="only this evaluator_name")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--requeue",
+        action="store_true",
+        help="reset attempts and hand items back to EvaluatorRetry",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    print(replay(args.evaluator, args.limit, args.concurrency, args.requeue))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,29 +5,25 @@ import time
 from datetime import datetime, timezone
 
 from azure.functions import DocumentList
-from azure.cosmos import CosmosClient, exceptions
+from azure.cosmos import exceptions
 
-from Templates.registry import EVALUATORS
+from Templates.registry import gate_settings, get_evaluator
+from shared.blobstore import hydrate_payloads
+from shared.evalcache import EvalResultCache, cache_key, evaluator_scope
 from shared.audit import audit_log
+from shared.llm import call_policy
+from shared.retry import is_failure, schedule_retry
 
-# 🔐 Key Vault (shared across App Service & Functions)
-from shared.secrets import get_secret
+# 🔐 Cosmos containers (lazy, Key Vault backed)
+from shared.cosmos import (
+    evaluators_container_read as EVALUATORS_CONTAINER,
+    evaluations_container as EVALS_CONTAINER,
+    eval_retries_container as RETRIES_CONTAINER,
+    eval_cache_container,
+)
 
-
-# --------------------------------------------------
-# Cosmos Clients (via Key Vault)
-# --------------------------------------------------
-COSMOS_CONN_READ = get_secret("COSMOS-CONN-READ")
-COSMOS_CONN_WRITE = get_secret("COSMOS-CONN-WRITE")
-
-COSMOS_READ = CosmosClient.from_connection_string(COSMOS_CONN_READ)
-COSMOS_WRITE = CosmosClient.from_connection_string(COSMOS_CONN_WRITE)
-
-DB_READ = COSMOS_READ.get_database_client("llmops-data")
-DB_WRITE = COSMOS_WRITE.get_database_client("llmops-data")
-
-EVALUATORS_CONTAINER = DB_READ.get_container_client("evaluators")
-EVALS_CONTAINER = DB_WRITE.get_container_client("evaluations")
+# ♻️ Results keyed on trace content hashes (LRU + eval_cache container)
+EVAL_CACHE = EvalResultCache(eval_cache_container)
 
 
 # --------------------------------------------------
@@ -47,7 +43,12 @@ def normalize_trace(trace: dict) -> dict:
       - question
       - context
       - answer
+
+    Offloaded payloads (payload_refs) are loaded from the blob store here;
+    if one can't be, this raises so the evaluation fails and is retried
+    instead of scoring (and caching) the preview.
     """
+    trace = hydrate_payloads(trace, strict=True)
     return {
         "question": trace.get("question") or trace.get("input", ""),
         "context": trace.get("context", ""),
@@ -56,6 +57,117 @@ def normalize_trace(trace: dict) -> dict:
     }
 
 
+# --------------------------------------------------
+# Single Evaluation (shared with EvaluatorRetry)
+# --------------------------------------------------
+def run_evaluation(
+    evaluator_name: str,
+    evaluator_fn,
+    trace_id: str,
+    trace: dict,
+    execution_cfg: dict | None = None,
+    cache_scope: str | None = None,
+) -> dict:
+    """
+    Run one evaluator on one trace and build the evaluation document.
+    Evaluators that swallow their own errors (score=None) are marked failed.
+    `execution.deadline_ms` / `execution.hedge` override the LLM call policy.
+    With a `cache_scope` (see evaluator_scope) identical trace content reuses
+    a cached verdict unless `execution.cache` is false.
+    """
+    execution_cfg = execution_cfg or {}
+
+    key = None
+    if cache_scope and execution_cfg.get("cache", True):
+        key = cache_key(cache_scope, trace)
+
+    start_time = time.time()
+    try:
+        result = lookup_cached(key)
+        if result is None:
+            normalized_trace = normalize_trace(trace)
+            with call_policy(
+                deadline_ms=execution_cfg.get("deadline_ms"),
+                hedge=execution_cfg.get("hedge"),
+            ):
+                result = evaluator_fn(normalized_trace)
+        status = "completed" if result.get("score") is not None else "failed"
+    except Exception as e:
+        logging.exception(
+            f"[EvaluatorRunner] Evaluator {evaluator_name} failed for trace {trace_id}"
+        )
+        result = {"score": None, "explanation": str(e)}
+        status = "failed"
+
+    duration_ms = int((time.time() - start_time) * 1000)
+
+    # only LLM verdicts are worth reusing; pre-screen verdicts are cheap to
+    # recompute and must go through the gate so shadow sampling still happens
+    if key and status == "completed" and result.get("method", "llm") == "llm":
+        try:
+            EVAL_CACHE.put(key, result)
+        except Exception:
+            logging.exception("[EvaluatorRunner] Failed to write eval cache")
+
+    return {
+        "id": f"{trace_id}:{evaluator_name}",
+        "trace_id": trace_id,
+        "evaluator_name": evaluator_name,
+        # 📈 Trace labels, so score consumers (drift) need no trace lookup
+        "model": trace.get("model"),
+        "trace_name": trace.get("trace_name"),
+        "score": result.get("score"),
+        "explanation": result.get("explanation", ""),
+        "status": status,
+        "duration_ms": duration_ms,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+
+        # ⚡ Pre-screen tier ("prescreen" / "cache" = no LLM call made)
+        "method": result.get("method", "llm"),
+        "cached_method": result.get("cached_method"),
+        "prescreen_score": result.get("prescreen_score"),
+        "prescreen_confident": result.get("prescreen_confident"),
+
+        # 🔢 Actual Azure OpenAI token usage (None if no LLM call)
+        "prompt_tokens": result.get("prompt_tokens"),
+        "completion_tokens": result.get("completion_tokens"),
+    }
+
+
+def lookup_cached(key: str | None) -> dict | None:
+    """Cached verdict for a content key; cache trouble is just a miss."""
+    if not key:
+        return None
+    try:
+        cached = EVAL_CACHE.get(key)
+    except Exception:
+        logging.exception("[EvaluatorRunner] Eval cache lookup failed")
+        return None
+    if cached is None:
+        return None
+    return {**cached, "method": "cache", "cached_method": cached.get("method")}
+
+
+def retry_evaluator(ev: dict) -> dict:
+    """Evaluator config kept on retry / dead-letter items."""
+    return {
+        "score_name": ev.get("score_name"),
+        "template": ev.get("template", {}),
+        "execution": ev.get("execution", {}),
+    }
+
+
+def resolve_evaluator(ev: dict):
+    """Evaluator config -> callable (pre-screen gated if enabled)."""
+    template_id = ev.get("template", {}).get("id")
+    gate = gate_settings(template_id, ev.get("execution", {}))
+    return get_evaluator(
+        template_id,
+        prescreen=gate is not None,
+        shadow_rate=gate["shadow_rate"] if gate else 0.0,
+    )
+
+
 # --------------------------------------------------
 # Azure Function Entry
 # --------------------------------------------------
@@ -129,7 +241,7 @@ def main(documents: DocumentList):
             # Evaluator function
             # -----------------------------
             template_id = ev.get("template", {}).get("id")
-            evaluator_fn = EVALUATORS.get(template_id)
+            evaluator_fn = resolve_evaluator(ev)
 
             if not evaluator_fn:
                 logging.warning(
@@ -155,35 +267,12 @@ def main(documents: DocumentList):
                 continue
 
             # -----------------------------
-            # Run evaluator (NORMALIZED TRACE)
+            # Run evaluator + persist
             # -----------------------------
-            start_time = time.time()
-            try:
-                normalized_trace = normalize_trace(trace)
-                result = evaluator_fn(normalized_trace)
-                status = "completed"
-            except Exception as e:
-                logging.exception(
-                    f"[EvaluatorRunner] Evaluator {evaluator_name} failed for trace {trace_id}"
-                )
-                result = {"score": None, "explanation": str(e)}
-                status = "failed"
-
-            duration_ms = int((time.time() - start_time) * 1000)
-
-            # -----------------------------
-            # Persist evaluation
-            # -----------------------------
-            doc = {
-                "id": eval_id,
-                "trace_id": trace_id,
-                "evaluator_name": evaluator_name,
-                "score": result.get("score"),
-                "explanation": result.get("explanation", ""),
-                "status": status,
-                "duration_ms": duration_ms,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
+            doc = run_evaluation(
+                evaluator_name, evaluator_fn, trace_id, trace, execution_cfg,
+                cache_scope=evaluator_scope(ev),
+            )
 
             try:
                 EVALS_CONTAINER.upsert_item(doc)
@@ -191,6 +280,15 @@ def main(documents: DocumentList):
             except Exception:
                 logging.exception("[EvaluatorRunner] Failed to persist evaluation")
 
+            # -----------------------------
+            # 🔁 Failed → retry queue
+            # -----------------------------
+            if is_failure(doc):
+                try:
+                    schedule_retry(RETRIES_CONTAINER, doc, retry_evaluator(ev))
+                except Exception:
+                    logging.exception("[EvaluatorRunner] Failed to schedule retry")
+
         # --------------------------------------------------
         # ✅ AUDIT: Evaluator Run Completed (ONCE)
         # --------------------------------------------------
@@ -0,0 +1,218 @@
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from azure.cosmos import exceptions
+
+from shared.archive import (
+    ARCHIVE_PATH,
+    ArchiveNotDurable,
+    load_checkpoint,
+    load_manifest,
+    partition_date,
+    quarantine_part,
+    require_durable,
+    save_checkpoint,
+    verify_part,
+    write_part,
+)
+from shared.cosmos import traces_container, evaluations_container
+
+
+HOT_RETENTION_DAYS = int(os.getenv("HOT_RETENTION_DAYS", "30"))
+ARCHIVED_TTL_SECONDS = int(os.getenv("ARCHIVED_TTL_SECONDS", "86400"))  # grace before purge
+BATCH_SIZE = 5000
+EXPIRE_CONCURRENCY = 16
+TIME_BUDGET_SECONDS = 240  # stay well inside the Functions timeout
+
+CONTAINERS = {
+    "traces": traces_container,
+    "evaluations": evaluations_container,
+}
+
+
+# --------------------------------------------------
+# Archive job (shared with the CLI)
+# --------------------------------------------------
+class RetentionArchiver:
+    """
+    Moves documents older than the hot window from Cosmos into the
+    Parquet archive. Per part the steps are
+
+        written  → Parquet + manifest on disk
+        verified → file re-read and matched against the manifest
+        expired  → `ttl` stamped on the Cosmos docs (Cosmos purges them
+                   after ARCHIVED_TTL_SECONDS, using spare RU)
+
+    and each step is checkpointed, so a crashed or timed-out run is
+    resumed by the next one. Docs are only expired when their `_ts` still
+    matches the archived version; changed docs stay hot and are archived
+    again later (both versions are then in the archive, `doc._ts` tells
+    them apart).
+    """
+
+    def __init__(
+        self,
+        dataset: str,
+        container=None,
+        root: str = ARCHIVE_PATH,
+        retention_days: int = HOT_RETENTION_DAYS,
+        batch_size: int = BATCH_SIZE,
+    ):
+        require_durable(root)  # expired docs are purged from Cosmos
+
+        self.dataset = dataset
+        self.container = container if container is not None else CONTAINERS[dataset]
+        self.root = root
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.checkpoint = load_checkpoint(dataset, root)
+        self.stats = defaultdict(int)
+
+    # -------------------------------------------------
+    def run(self, time_budget: float | None = None) -> dict:
+        deadline = time.monotonic() + time_budget if time_budget else None
+
+        self.resume()
+
+        run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        seq = 0
+        while deadline is None or time.monotonic() < deadline:
+            docs = self.fetch_expired()
+            if not docs:
+                break
+
+            by_date = defaultdict(list)
+            for doc in docs:
+                date = partition_date(doc)
+                if date is None:
+                    # stays hot; an undatable part would break the archive's date column
+                    logging.warning(f"[RetentionArchiver] {doc.get('id')} has no timestamp, not archived")
+                    self.stats["undated"] += 1
+                    continue
+                by_date[date].append(doc)
+            if not by_date:
+                break
+
+            for date, group in sorted(by_date.items()):
+                seq += 1
+                self.archive(date, f"part-{run_id}-{seq:04d}", group)
+
+            # unverified docs stay hot and would just be fetched again
+            if self.stats["verify_failed"] or len(docs) < self.batch_size:
+                break
+
+        return dict(self.stats)
+
+    def resume(self):
+        """Finish parts a previous run left half done."""
+        for part, entry in list(self.checkpoint["parts"].items()):
+            if entry["state"] in ("expired", "failed"):
+                continue
+            manifest = load_manifest(self.dataset, entry["date"], part, self.root)
+            self.advance(part, manifest)
+            self.stats["resumed"] += 1
+            if entry["state"] == "written":
+                # still unverifiable: give up on this part, its docs are
+                # still hot and get archived into a fresh part
+                quarantine_part(manifest)
+                self._set_state(part, entry["date"], "failed")
+
+    def fetch_expired(self) -> list:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        # docs without a string `timestamp` age by `_ts` (partition_date
+        # dates them the same way)
+        return list(
+            self.container.query_items(
+                query=(
+                    "SELECT TOP @n * FROM c "
+                    "WHERE (c.timestamp < @cutoff "
+                    "OR (NOT IS_STRING(c.timestamp) AND c._ts < @cutoff_ts)) "
+                    "AND NOT IS_DEFINED(c.ttl)"
+                ),
+                parameters=[
+                    {"name": "@n", "value": self.batch_size},
+                    {"name": "@cutoff", "value": cutoff.isoformat()},
+                    {"name": "@cutoff_ts", "value": int(cutoff.timestamp())},
+                ],
+                enable_cross_partition_query=True,
+            )
+        )
+
+    # -------------------------------------------------
+    def archive(self, date: str, part: str, docs: list):
+        manifest = write_part(self.dataset, date, part, docs, self.root)
+        self._set_state(part, date, "written", rows=manifest["rows"])
+        self.stats["rows_written"] += manifest["rows"]
+        self.advance(part, manifest)
+
+    def advance(self, part: str, manifest: dict):
+        entry = self.checkpoint["parts"][part]
+
+        if entry["state"] == "written":
+            problems = verify_part(manifest)
+            if problems:
+                # leave the docs hot; the next run retries verification
+                logging.error(f"[RetentionArchiver] {part} failed verification: {problems}")
+                self.stats["verify_failed"] += 1
+                return
+            self._set_state(part, manifest["date"], "verified")
+
+        if entry["state"] == "verified":
+            expired, skipped = self.expire(manifest)
+            self._set_state(part, manifest["date"], "expired", expired=expired, skipped=skipped)
+            self.stats["rows_expired"] += expired
+            self.stats["rows_changed"] += skipped
+
+    def expire(self, manifest: dict) -> tuple:
+        """Stamp `ttl` on archived docs whose `_ts` is unchanged."""
+        pks = manifest["partition_keys"]
+        versions = manifest["versions"]
+
+        def stamp(doc_id):
+            ts = versions.get(doc_id)
+            try:
+                self.container.patch_item(
+                    item=doc_id,
+                    partition_key=pks[doc_id],
+                    patch_operations=[
+                        {"op": "add", "path": "/ttl", "value": ARCHIVED_TTL_SECONDS},
+                    ],
+                    filter_predicate=f"from c where c._ts = {int(ts)}" if ts else None,
+                )
+                return "expired"
+            except exceptions.CosmosResourceNotFoundError:
+                return "expired"  # already gone
+            except exceptions.CosmosAccessConditionFailedError:
+                return "skipped"  # updated after archiving
+
+        with ThreadPoolExecutor(max_workers=EXPIRE_CONCURRENCY) as pool:
+            outcomes = list(pool.map(stamp, manifest["digests"].keys()))
+
+        return outcomes.count("expired"), outcomes.count("skipped")
+
+    def _set_state(self, part: str, date: str, state: str, **extra):
+        entry = self.checkpoint["parts"].setdefault(part, {"date": date})
+        entry.update(state=state, **extra)
+        save_checkpoint(self.checkpoint, self.root)
+
+
+# --------------------------------------------------
+# Azure Function Entry (timer, nightly)
+# --------------------------------------------------
+def main(mytimer):
+    try:
+        require_durable()
+    except ArchiveNotDurable as e:
+        logging.error(f"[RetentionArchiver] Not archiving: {e}")
+        return
+
+    for dataset in CONTAINERS:
+        try:
+            stats = RetentionArchiver(dataset).run(time_budget=TIME_BUDGET_SECONDS / len(CONTAINERS))
+            logging.info(f"[RetentionArchiver] {dataset}: {stats}")
+        except Exception:
+            logging.exception(f"[RetentionArchiver] Archiving {dataset} failed")
@@ -0,0 +1,129 @@
+"""
+Run, verify and set up the trace / evaluation cold archive.
+
+    python -m RetentionArchiver.cli enable-ttl          # once per environment
+    python -m RetentionArchiver.cli run --dataset traces --days 30
+    python -m RetentionArchiver.cli verify --dataset evaluations --sample 200
+
+Run from the backend/ directory with KEY_VAULT_URI set, ARCHIVE_PATH on
+durable shared storage and ARCHIVE_DURABLE=true. `run` is safe to
+interrupt: the next run resumes from the checkpoint.
+"""
+
+import argparse
+import json
+import logging
+import random
+
+from azure.cosmos import PartitionKey, exceptions
+
+from RetentionArchiver import CONTAINERS, HOT_RETENTION_DAYS, RetentionArchiver
+from shared.archive import ARCHIVE_PATH, load_checkpoint, load_manifest, require_durable, verify_part
+from shared.cosmos import COSMOS_DB, get_client
+
+
+def enable_ttl() -> dict:
+    """
+    Turn on per-item TTL (DefaultTimeToLive = -1: nothing expires unless
+    a document carries its own `ttl`, which only the archiver sets).
+    Refused while the archive is not on durable shared storage.
+    """
+    require_durable()
+
+    database = get_client("write").get_database_client(COSMOS_DB)
+    result = {}
+    for name in CONTAINERS:
+        props = database.get_container_client(name).read()
+        if props.get("defaultTtl") is not None:
+            result[name] = "already enabled"
+            continue
+        # replace_container rewrites the whole definition: carry over
+        # everything but the TTL, or a custom indexing policy is reset
+        database.replace_container(
+            name,
+            partition_key=PartitionKey(
+                path=props["partitionKey"]["paths"][0],
+                kind=props["partitionKey"].get("kind", "Hash"),
+            ),
+            indexing_policy=props.get("indexingPolicy"),
+            conflict_resolution_policy=props.get("conflictResolutionPolicy"),
+            default_ttl=-1,
+        )
+        result[name] = "enabled"
+    return result
+
+
+def verify(dataset: str, sample: int, root: str = ARCHIVE_PATH) -> dict:
+    """
+    Re-check every archived part against its manifest and, for a sample
+    of expired ids, that Cosmos has purged them or carries the ttl stamp.
+    """
+    checkpoint = load_checkpoint(dataset, root)
+    container = CONTAINERS[dataset]
+    report = {"parts": 0, "rows": 0, "bad_parts": [], "still_hot": []}
+
+    for part, entry in checkpoint["parts"].items():
+        if entry["state"] != "expired":
+            continue
+        manifest = load_manifest(dataset, entry["date"], part, root)
+        report["parts"] += 1
+        report["rows"] += manifest["rows"]
+
+        problems = verify_part(manifest)
+        if problems:
+            report["bad_parts"].append({"part": part, "problems": problems})
+
+        ids = list(manifest["digests"])
+        for doc_id in random.sample(ids, min(sample, len(ids))):
+            try:
+                doc = container.read_item(
+                    item=doc_id,
+                    partition_key=manifest["partition_keys"][doc_id],
+                )
+            except exceptions.CosmosResourceNotFoundError:
+                continue
+            if "ttl" not in doc and doc.get("_ts") == manifest["versions"].get(doc_id):
+                report["still_hot"].append(doc_id)
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("enable-ttl", help="enable per-item TTL on the hot containers")
+
+    run = commands.add_parser("run", help="archive documents past the hot window")
+    run.add_argument("--dataset", choices=sorted(CONTAINERS), required=True)
+    run.add_argument("--days", type=int, default=HOT_RETENTION_DAYS)
+    run.add_argument("--batch-size", type=int, default=5000)
+    run.add_argument("--time-budget", type=float, help="seconds, default unlimited")
+
+    check = commands.add_parser("verify", help="verify archived parts against manifests")
+    check.add_argument("--dataset", choices=sorted(CONTAINERS), required=True)
+    check.add_argument("--sample", type=int, default=100, help="Cosmos ids checked per part")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "enable-ttl":
+        result = enable_ttl()
+    elif args.command == "run":
+        archiver = RetentionArchiver(
+            args.dataset,
+            retention_days=args.days,
+            batch_size=args.batch_size,
+        )
+        result = archiver.run(time_budget=args.time_budget)
+    else:
+        result = verify(args.dataset, args.sample)
+
+    print(json.dumps(result, indent=2))
+
+    if args.command == "verify" and (result["bad_parts"] or result["still_hot"]):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from azure.functions import DocumentList
+
+from shared.cosmos import traces_by_session_container
+from shared.session_index import session_ref
+
+CONCURRENCY = 16
+
+
+# --------------------------------------------------
+# Azure Function Entry (traces change feed)
+# --------------------------------------------------
+def main(documents: DocumentList):
+    if not documents:
+        return
+
+    refs = [r for r in (session_ref(dict(d)) for d in documents) if r]
+    if not refs:
+        return
+
+    # Raising triggers the retry policy in function.json; upserts are idempotent
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        list(pool.map(traces_by_session_container.upsert_item, refs))
+
+    logging.info(f"[SessionIndexer] Indexed {len(refs)} of {len(documents)} traces")
@@ -0,0 +1,159 @@
+"""
+Backfill and check the traces_by_session index.
+
+    python -m SessionIndexer.cli backfill                 # resumable
+    python -m SessionIndexer.cli check --sample 200
+    python -m SessionIndexer.cli check --session session-42 --repair
+
+Run from the backend/ directory with KEY_VAULT_URI set.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from azure.cosmos import exceptions
+
+from shared.cosmos import traces_container_read, traces_by_session_container
+from shared.session_index import PREVIEW_FIELDS, REF_FIELDS, session_ref, session_traces
+
+
+STATE_FILE = ".session_backfill.json"
+CONCURRENCY = 16
+
+# only what a ref needs (plus version / ttl), not the full trace
+PROJECTION = ", ".join(
+    f"c.{f}" for f in ("id", "_ts", "ttl", *REF_FIELDS, *PREVIEW_FIELDS)
+)
+
+
+def _upsert_all(refs: list):
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        list(pool.map(traces_by_session_container.upsert_item, refs))
+
+
+# --------------------------------------------------
+# Backfill
+# --------------------------------------------------
+def backfill(page_size: int = 1000, restart: bool = False) -> dict:
+    """
+    Index every existing trace. Progress (the query continuation token)
+    is saved after each page, so an interrupted run picks up where it
+    stopped; re-indexing a page twice is harmless (upserts).
+    """
+    state = {"continuation": None, "indexed": 0, "pages": 0}
+    if not restart and os.path.exists(STATE_FILE):
+        with open(STATE_FILE) as f:
+            state = json.load(f)
+
+    pages = traces_container_read.query_items(
+        query=f"SELECT {PROJECTION} FROM c WHERE IS_DEFINED(c.session_id)",
+        enable_cross_partition_query=True,
+        max_item_count=page_size,
+    ).by_page(state["continuation"])
+
+    for page in pages:
+        refs = [r for r in (session_ref(t) for t in page) if r]
+        _upsert_all(refs)
+
+        state["indexed"] += len(refs)
+        state["pages"] += 1
+        state["continuation"] = pages.continuation_token
+        with open(STATE_FILE, "w") as f:
+            json.dump(state, f)
+        logging.info(f"[SessionIndexer] backfill page {state['pages']}: {state['indexed']} refs")
+
+        if not state["continuation"]:
+            break
+
+    if os.path.exists(STATE_FILE):
+        os.remove(STATE_FILE)  # finished: next backfill starts from scratch
+    return {"indexed": state["indexed"], "pages": state["pages"]}
+
+
+# --------------------------------------------------
+# Consistency check
+# --------------------------------------------------
+def _sample_sessions(sample: int) -> list:
+    sessions = list(
+        traces_container_read.query_items(
+            query="SELECT DISTINCT VALUE c.session_id FROM c WHERE IS_DEFINED(c.session_id)",
+            enable_cross_partition_query=True,
+        )
+    )
+    return random.sample(sessions, min(sample, len(sessions)))
+
+
+def check_session(session_id: str, repair: bool = False) -> dict:
+    source = {
+        t["id"]: t
+        for t in traces_container_read.query_items(
+            query=f"SELECT {PROJECTION} FROM c WHERE c.session_id = @sid",
+            parameters=[{"name": "@sid", "value": session_id}],
+            enable_cross_partition_query=True,
+        )
+    }
+    index = {r["id"]: r for r in session_traces(traces_by_session_container, session_id)}
+
+    missing = [i for i in source if i not in index]
+    stale = [
+        i for i in source
+        if i in index and index[i].get("source_ts") != source[i].get("_ts")
+    ]
+    orphans = [i for i in index if i not in source]
+
+    if repair:
+        _upsert_all([session_ref(source[i]) for i in missing + stale])
+        for ref_id in orphans:
+            try:
+                traces_by_session_container.delete_item(item=ref_id, partition_key=session_id)
+            except exceptions.CosmosResourceNotFoundError:
+                pass
+
+    return {"missing": missing, "stale": stale, "orphans": orphans}
+
+
+def check(sessions: list | None = None, sample: int = 100, repair: bool = False) -> dict:
+    sessions = sessions or _sample_sessions(sample)
+    report = {"sessions": len(sessions), "inconsistent": {}, "repaired": repair}
+
+    for sid in sessions:
+        result = check_session(sid, repair)
+        if any(result.values()):
+            report["inconsistent"][sid] = {k: len(v) for k, v in result.items()}
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fill = commands.add_parser("backfill", help="index all existing traces")
+    fill.add_argument("--page-size", type=int, default=1000)
+    fill.add_argument("--restart", action="store_true", help="ignore saved progress")
+
+    verify = commands.add_parser("check", help="compare the index with the traces container")
+    verify.add_argument("--session", action="append", help="session id (repeatable)")
+    verify.add_argument("--sample", type=int, default=100, help="random sessions to check")
+    verify.add_argument("--repair", action="store_true", help="fix missing / stale / orphan refs")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "backfill":
+        result = backfill(args.page_size, args.restart)
+    else:
+        result = check(args.session, args.sample, args.repair)
+
+    print(json.dumps(result, indent=2))
+
+    if args.command == "check" and result["inconsistent"] and not args.repair:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
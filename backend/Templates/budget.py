@@ -0,0 +1,166 @@
+import logging
+import os
+import re
+from functools import lru_cache
+
+from .prescreen import tokenize
+
+
+# =====================================================
+# Token counting (local tokenizer)
+# =====================================================
+#
+# tiktoken (backend/requirements.txt) does the counting. Its encoding
+# files are read from TIKTOKEN_CACHE_DIR, which defaults to
+# backend/.tiktoken_cache and is filled at build time by
+# `python -m Templates.budget` (the Dockerfile does this; run it before
+# publishing the function app). If the files are missing, a conservative
+# regex estimate is used instead of downloading them — no network call is
+# made on the evaluation path.
+
+TOKENIZER_ENCODING = os.getenv("EVAL_TOKENIZER_ENCODING", "o200k_base")
+TIKTOKEN_CACHE_DIR = os.environ.setdefault(
+    "TIKTOKEN_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".tiktoken_cache"),
+)
+
+_PIECE_RE = re.compile(r"[A-Za-z0-9]+|[^\sA-Za-z0-9]")
+_SENTENCE_RE = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if not os.path.isdir(TIKTOKEN_CACHE_DIR) or not os.listdir(TIKTOKEN_CACHE_DIR):
+        logging.warning(
+            f"No tiktoken encodings in {TIKTOKEN_CACHE_DIR}; using the token estimate"
+        )
+        return None
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception as e:
+        logging.warning(f"tiktoken unavailable ({e}); using the token estimate")
+        return None
+
+
+def _estimate_piece(piece: str) -> int:
+    # Latin words average ~4 chars/token; every other symbol
+    # (punctuation, CJK ideographs, ...) counts as one token.
+    return 1 + len(piece) // 5 if piece[0].isalnum() else 1
+
+
+def count_tokens(text: str) -> int:
+    text = text or ""
+    enc = _encoding()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return sum(_estimate_piece(p) for p in _PIECE_RE.findall(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Hard cut to `max_tokens` (last resort for a single huge sentence)."""
+    text = text or ""
+    if max_tokens <= 0:
+        return ""
+
+    enc = _encoding()
+    if enc is not None:
+        ids = enc.encode(text, disallowed_special=())
+        return text if len(ids) <= max_tokens else enc.decode(ids[:max_tokens])
+
+    used = 0
+    for m in _PIECE_RE.finditer(text):
+        used += _estimate_piece(m.group())
+        if used > max_tokens:
+            # a single oversized piece: fall back to ~4 chars/token
+            return text[:m.start()].rstrip() or text[:max_tokens * 4]
+    return text
+
+
+def split_sentences(text: str) -> list:
+    return [s.strip() for s in _SENTENCE_RE.split(text or "") if s.strip()]
+
+
+# =====================================================
+# Budgets
+# =====================================================
+
+# Deployment context window (tokens). Budgets are clamped to it.
+CONTEXT_WINDOW = int(os.getenv("AZURE_OPENAI_CONTEXT_WINDOW", "128000"))
+
+
+def effective_budget(requested: int, fixed_tokens: int, completion_tokens: int) -> int:
+    """
+    Clamp a per-evaluator budget to what the deployment window leaves
+    after the fixed prompt text and the reserved completion.
+    """
+    available = CONTEXT_WINDOW - fixed_tokens - completion_tokens
+    return max(0, min(requested, available))
+
+
+def select_context(question: str, context: str, max_tokens: int) -> str:
+    """
+    Keep the context sentences most relevant to the question that fit
+    in `max_tokens`, in their original order. Context that already fits
+    is returned untouched.
+    """
+    context = context or ""
+    if count_tokens(context) <= max_tokens:
+        return context
+
+    sentences = split_sentences(context)
+    q_terms = set(tokenize(question))
+
+    def relevance(i):
+        terms = set(tokenize(sentences[i]))
+        overlap = len(q_terms & terms) / len(terms) if terms else 0.0
+        return (overlap, -i)  # ties: earlier sentences first
+
+    chosen, used = [], 0
+    for i in sorted(range(len(sentences)), key=relevance, reverse=True):
+        cost = count_tokens(sentences[i])
+        if used + cost <= max_tokens:
+            chosen.append(i)
+            used += cost
+
+    if not chosen:
+        return truncate_tokens(context, max_tokens)
+
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def fit_text(text: str, max_tokens: int) -> str:
+    """Keep whole leading sentences that fit in `max_tokens`."""
+    text = text or ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    kept, used = [], 0
+    for sentence in split_sentences(text):
+        cost = count_tokens(sentence)
+        if used + cost > max_tokens:
+            break
+        kept.append(sentence)
+        used += cost
+
+    if not kept:
+        return truncate_tokens(text, max_tokens)
+
+    return " ".join(kept)
+
+
+def usage_fields(usage: dict) -> dict:
+    """Token usage reported by Azure OpenAI, as evaluation fields."""
+    usage = usage or {}
+    return {
+        "prompt_tokens": usage.get("prompt_tokens"),
+        "completion_tokens": usage.get("completion_tokens"),
+    }
+
+
+if __name__ == "__main__":
+    # build step: download the encoding into TIKTOKEN_CACHE_DIR
+    import tiktoken
+
+    tiktoken.get_encoding(TOKENIZER_ENCODING)
+    print(f"{TOKENIZER_ENCODING} cached in {TIKTOKEN_CACHE_DIR}")
@@ -1,80 +1,62 @@
 import os
 import json
-import requests
 
-# 🔐 Key Vault (shared across App Service & Functions)
-from shared.secrets import get_secret
+# 🔐 Azure OpenAI (lazy, Key Vault backed)
+from shared.llm import chat_completion
 
-
-# =====================================================
-# Azure OpenAI configuration (from Key Vault)
-# =====================================================
-
-AZURE_KEY = get_secret("AZURE-OPENAI-KEY")
-AZURE_ENDPOINT = get_secret("AZURE-OPENAI-ENDPOINT").rstrip("/") + "/"
-AZURE_DEPLOYMENT = get_secret("AZURE-OPENAI-DEPLOYMENT")
-AZURE_API_VERSION = get_secret("AZURE-OPENAI-API-VERSION")
-
-if not AZURE_ENDPOINT.startswith("https://"):
-    raise RuntimeError("❌ AZURE_OPENAI_ENDPOINT looks incorrect")
+from .budget import (
+    count_tokens,
+    effective_budget,
+    select_context,
+    usage_fields,
+)
 
 
 # =====================================================
 # Azure OpenAI Chat Completions Call
 # =====================================================
 
-def call_azure_llm(prompt: str) -> str:
-    url = (
-        f"{AZURE_ENDPOINT}"
-        f"openai/deployments/{AZURE_DEPLOYMENT}/chat/completions"
-        f"?api-version={AZURE_API_VERSION}"
-    )
+SYSTEM_PROMPT = (
+    "You are a strict RAG evaluator. "
+    "Judge relevance with fine-grained numeric precision. "
+    "Return ONLY valid JSON."
+)
 
-    headers = {
-        "Content-Type": "application/json",
-        "api-key": AZURE_KEY,
-    }
-
-    payload = {
-        "messages": [
-            {
-                "role": "system",
-                "content": (
-                    "You are a strict RAG evaluator. "
-                    "Judge relevance with fine-grained numeric precision. "
-                    "Return ONLY valid JSON."
-                )
-            },
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0,
-    }
-
-    response = requests.post(
-        url,
-        headers=headers,
-        json=payload,
-        timeout=30,
-    )
-    response.raise_for_status()
 
-    data = response.json()
-    choices = data.get("choices", [])
-    if not choices:
-        raise ValueError("No choices returned from Azure OpenAI")
+# Hard per-call deadline (hedged past the observed p95)
+DEADLINE_SECONDS = 15
 
-    return choices[0]["message"]["content"]
+
+def call_azure_llm(prompt: str) -> tuple:
+    return chat_completion(
+        SYSTEM_PROMPT,
+        prompt,
+        MAX_COMPLETION_TOKENS,
+        name="context_relevance",
+        deadline_s=DEADLINE_SECONDS,
+    )
 
 
 # =====================================================
 # Prompt Template (CONTINUOUS SCORING)
 # =====================================================
 
-MAX_CONTEXT_CHARS = 4000
+# Token budget (per evaluator), clamped to the deployment window
+CONTEXT_TOKEN_BUDGET = 1000
+MAX_COMPLETION_TOKENS = 200
+PROMPT_OVERHEAD_TOKENS = 250  # instructions + JSON format block
 
 def build_prompt(question: str, context: str) -> str:
     question = (question or "").strip()
-    context = (context or "")[:MAX_CONTEXT_CHARS]
+    context = select_context(
+        question,
+        context,
+        effective_budget(
+            CONTEXT_TOKEN_BUDGET,
+            PROMPT_OVERHEAD_TOKENS + count_tokens(question),
+            MAX_COMPLETION_TOKENS,
+        ),
+    )
 
     return f"""
 Evaluate the CONTEXT RELEVANCE of the retrieved RAG context.
@@ -120,7 +102,7 @@ def context_relevance_llm(trace: dict) -> dict:
     )
 
     try:
-        llm_output = call_azure_llm(prompt)
+        llm_output, usage = call_azure_llm(prompt)
 
         cleaned = (
             llm_output.replace("```json", "")
@@ -132,7 +114,8 @@ def context_relevance_llm(trace: dict) -> dict:
 
         return {
             "score": float(result["score"]),
-            "explanation": result.get("explanation", "")
+            "explanation": result.get("explanation", ""),
+            **usage_fields(usage),
         }
 
     except Exception as e:
@@ -1,83 +1,71 @@
 import os
 import json
-import requests
 
-# 🔐 Key Vault (shared across App Service & Functions)
-from shared.secrets import get_secret
+# 🔐 Azure OpenAI (lazy, Key Vault backed)
+from shared.llm import chat_completion
 
-
-# =====================================================
-# Azure OpenAI configuration (from Key Vault)
-# =====================================================
-
-AZURE_KEY = get_secret("AZURE-OPENAI-KEY")
-AZURE_ENDPOINT = get_secret("AZURE-OPENAI-ENDPOINT").rstrip("/") + "/"
-AZURE_DEPLOYMENT = get_secret("AZURE-OPENAI-DEPLOYMENT")
-AZURE_API_VERSION = get_secret("AZURE-OPENAI-API-VERSION")
-
-if not AZURE_ENDPOINT.startswith("https://"):
-    raise RuntimeError("❌ AZURE_OPENAI_ENDPOINT looks incorrect")
+from .budget import (
+    count_tokens,
+    effective_budget,
+    fit_text,
+    select_context,
+    usage_fields,
+)
 
 
 # =====================================================
 # Azure OpenAI Chat API Call
 # =====================================================
 
-def call_azure_llm(prompt: str) -> str:
-    url = (
-        f"{AZURE_ENDPOINT}"
-        f"openai/deployments/{AZURE_DEPLOYMENT}/chat/completions"
-        f"?api-version={AZURE_API_VERSION}"
-    )
+SYSTEM_PROMPT = (
+    "You are a strict hallucination evaluator. "
+    "Hallucination means information NOT supported by the provided context. "
+    "You must produce a fine-grained numeric judgment. "
+    "Return ONLY valid JSON."
+)
 
-    headers = {
-        "Content-Type": "application/json",
-        "api-key": AZURE_KEY,
-    }
-
-    payload = {
-        "messages": [
-            {
-                "role": "system",
-                "content": (
-                    "You are a strict hallucination evaluator. "
-                    "Hallucination means information NOT supported by the provided context. "
-                    "You must produce a fine-grained numeric judgment. "
-                    "Return ONLY valid JSON."
-                )
-            },
-            {"role": "user", "content": prompt},
-        ],
-        "temperature": 0,
-    }
-
-    response = requests.post(
-        url,
-        headers=headers,
-        json=payload,
-        timeout=30,
-    )
-    response.raise_for_status()
 
-    data = response.json()
-    choices = data.get("choices", [])
-    if not choices:
-        raise ValueError("No choices returned from Azure OpenAI")
+# Hard per-call deadline (hedged past the observed p95)
+DEADLINE_SECONDS = 20
+
 
-    return choices[0]["message"]["content"]
+def call_azure_llm(prompt: str) -> tuple:
+    return chat_completion(
+        SYSTEM_PROMPT,
+        prompt,
+        MAX_COMPLETION_TOKENS,
+        name="hallucination",
+        deadline_s=DEADLINE_SECONDS,
+    )
 
 
 # =====================================================
 # Prompt Template (CONTINUOUS SCORING)
 # =====================================================
 
-MAX_CONTEXT_CHARS = 4000
-MAX_ANSWER_CHARS = 2000
+# Token budgets (per evaluator), clamped to the deployment window
+CONTEXT_TOKEN_BUDGET = 1000
+ANSWER_TOKEN_BUDGET = 500
+MAX_COMPLETION_TOKENS = 200
+PROMPT_OVERHEAD_TOKENS = 250  # instructions + JSON format block
 
 def build_prompt(question: str, context: str, answer: str) -> str:
     question = (question or "").strip()
-    context = (context or "")[:MAX_CONTEXT_CHARS]
-    answer = (answer or "")[:MAX_ANSWER_CHARS]
+    fixed = PROMPT_OVERHEAD_TOKENS + count_tokens(question)
+
+    answer = fit_text(
+        answer,
+        effective_budget(ANSWER_TOKEN_BUDGET, fixed, MAX_COMPLETION_TOKENS),
+    )
+    context = select_context(
+        question,
+        context,
+        effective_budget(
+            CONTEXT_TOKEN_BUDGET,
+            fixed + count_tokens(answer),
+            MAX_COMPLETION_TOKENS,
+        ),
+    )
 
     return f"""
 Evaluate the hallucination of the following answer.
@@ -127,7 +115,7 @@ def hallucination_llm(trace: dict) -> dict:
     )
 
     try:
-        llm_output = call_azure_llm(prompt)
+        llm_output, usage = call_azure_llm(prompt)
 
         cleaned = (
             llm_output.replace("```json", "")
@@ -145,6 +133,7 @@ def hallucination_llm(trace: dict) -> dict:
         return {
             "score": final_score,
             "explanation": result.get("explanation", ""),
+            **usage_fields(usage),
         }
 
     except Exception as e:
@@ -0,0 +1,157 @@
+import re
+import random
+
+
+# =====================================================
+# Local pre-screen scorers (no network, microseconds)
+# =====================================================
+#
+# These run before the LLM templates. When a local score is
+# clearly high or clearly low the verdict is taken as-is;
+# only the uncertain middle band is escalated to the LLM.
+# All scores follow the registry convention: higher = better.
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset({
+    "a", "an", "the", "and", "or", "but", "if", "of", "to", "in", "on",
+    "at", "by", "for", "with", "from", "as", "is", "are", "was", "were",
+    "be", "been", "it", "its", "this", "that", "these", "those", "can",
+    "may", "do", "does", "did", "how", "what", "why", "which", "when",
+    "should", "i", "we", "you", "they", "he", "she", "not", "no",
+})
+
+
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping so 'trips' / 'tripping' meet 'trip'."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> list:
+    """Lowercased, lightly stemmed content words (stopwords dropped)."""
+    return [
+        _stem(w) for w in _WORD_RE.findall((text or "").lower())
+        if w not in STOPWORDS
+    ]
+
+
+def _ngrams(tokens: list, n: int) -> set:
+    return {tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1)}
+
+
+def lexical_overlap(source: str, target: str) -> float:
+    """Share of distinct words in `source` that also appear in `target`."""
+    src = set(tokenize(source))
+    if not src:
+        return 0.0
+    return len(src & set(tokenize(target))) / len(src)
+
+
+def ngram_containment(answer: str, context: str, n: int = 2) -> float:
+    """Share of the answer's n-grams that are contained in the context."""
+    a_tokens = tokenize(answer)
+    if len(a_tokens) < n:
+        return lexical_overlap(answer, context)
+
+    a_grams = _ngrams(a_tokens, n)
+    c_grams = _ngrams(tokenize(context), n)
+    return len(a_grams & c_grams) / len(a_grams)
+
+
+def length_ratio(answer: str, reference: str) -> float:
+    """Answer length relative to the reference, in content words."""
+    ref_len = len(tokenize(reference))
+    if not ref_len:
+        return 0.0
+    return len(tokenize(answer)) / ref_len
+
+
+# =====================================================
+# Local evaluators (same contract as the LLM templates)
+# =====================================================
+
+RATIO_FLOOR = 0.25   # at or below: fully concise
+RATIO_CEIL = 1.5     # at or above: fully verbose
+
+
+def _clamp(x: float) -> float:
+    return round(max(0.0, min(1.0, x)), 4)
+
+
+def hallucination_local(trace: dict) -> dict:
+    """Grounding proxy: how much of the answer is supported by the context."""
+    answer = trace.get("answer", "")
+    context = trace.get("context", "")
+
+    score = _clamp(
+        0.5 * lexical_overlap(answer, context)
+        + 0.5 * ngram_containment(answer, context, 2)
+    )
+    return {
+        "score": score,
+        "explanation": f"Local grounding overlap {score:.2f}",
+    }
+
+
+def context_relevance_local(trace: dict) -> dict:
+    """Share of question terms covered by the retrieved context."""
+    score = _clamp(
+        lexical_overlap(trace.get("question", ""), trace.get("context", ""))
+    )
+    return {
+        "score": score,
+        "explanation": f"Local question/context overlap {score:.2f}",
+    }
+
+
+def conciseness_local(trace: dict) -> dict:
+    """Answer length relative to the context it was built from."""
+    ratio = length_ratio(trace.get("answer", ""), trace.get("context", ""))
+    score = _clamp(1.0 - (ratio - RATIO_FLOOR) / (RATIO_CEIL - RATIO_FLOOR))
+    return {
+        "score": score,
+        "explanation": f"Local answer/context length ratio {ratio:.2f}",
+    }
+
+
+# =====================================================
+# Gating policy
+# =====================================================
+
+def gated(llm_fn, scorer, low=None, high=None, shadow_rate: float = 0.0):
+    """
+    Wrap an LLM evaluator behind a local scorer.
+
+    Local scores <= `low` or >= `high` are trusted and returned without
+    an LLM call (either bound may be None to disable that side).
+    Everything in between is escalated. `shadow_rate` sends
+    a share of the confident cases to the LLM anyway, so agreement
+    between the two tiers can be measured on unbiased samples.
+    """
+
+    def evaluate(trace: dict) -> dict:
+        local = scorer(trace)
+        local_score = local["score"]
+        confident = (
+            (low is not None and local_score <= low)
+            or (high is not None and local_score >= high)
+        )
+
+        if confident and random.random() >= shadow_rate:
+            return {**local, "method": "prescreen"}
+
+        result = llm_fn(trace)
+        return {
+            **result,
+            "method": "llm",
+            "prescreen_score": local_score,
+            "prescreen_confident": confident,
+        }
+
+    return evaluate
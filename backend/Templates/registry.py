@@ -1,11 +1,113 @@
 # backend/evaluators/registry.py
 
+import hashlib
+import inspect
+import sys
+from functools import lru_cache
+
 from .hallucination_v2 import hallucination_llm
 from .context_relevance_v2 import context_relevance_llm
 from .conciseness_v2 import conciseness_llm
+from .prescreen import (
+    gated,
+    hallucination_local,
+    context_relevance_local,
+    conciseness_local,
+)
 
 EVALUATORS = {
     "hallucination_llm": hallucination_llm,
     "context_relevance_llm": context_relevance_llm,
     "conciseness_llm": conciseness_llm,
+
+    # ⚡ Local pre-screen tier (no LLM call)
+    "hallucination_local": hallucination_local,
+    "context_relevance_local": context_relevance_local,
+    "conciseness_local": conciseness_local,
 }
+
+# Share of confident pre-screen results still sent to the LLM, so the
+# Aggregator can report how often the local scorer agrees with it.
+DEFAULT_SHADOW_RATE = 0.05
+
+# Local scorer + confidence band per LLM template, used when an evaluator
+# opts in with execution.prescreen = true.
+# Scores outside (low, high) skip the LLM call; None disables a side.
+# Zero question/context overlap still occurs on relevant pairs
+# (paraphrased questions), so context relevance only trusts the top end.
+PRESCREEN = {
+    "hallucination_llm": {
+        "scorer": hallucination_local,
+        "low": 0.10,
+        "high": 0.90,
+    },
+    "context_relevance_llm": {
+        "scorer": context_relevance_local,
+        "low": None,
+        "high": 0.95,
+    },
+    "conciseness_llm": {
+        "scorer": conciseness_local,
+        "low": 0.05,
+        "high": 0.95,
+    },
+}
+
+
+def gate_settings(template_id: str, execution: dict) -> dict | None:
+    """
+    Pre-screen gate an evaluator's `execution` config selects, or None
+    when its LLM template runs ungated (the default: pre-screened scores
+    differ from LLM ones, so evaluators opt in).
+    """
+    policy = PRESCREEN.get(template_id)
+    if not policy or not execution.get("prescreen", False):
+        return None
+    return {
+        "low": policy["low"],
+        "high": policy["high"],
+        "shadow_rate": float(execution.get("prescreen_shadow_rate", DEFAULT_SHADOW_RATE)),
+    }
+
+
+@lru_cache(maxsize=None)
+def template_fingerprint(template_id: str) -> str | None:
+    """
+    Hash of the source behind a template (its prompt lives in the module)
+    and of its pre-screen scorer, so a code or prompt edit changes it.
+    """
+    fns = [EVALUATORS.get(template_id)]
+    policy = PRESCREEN.get(template_id)
+    if policy:
+        fns += [policy["scorer"], gated]
+    modules = sorted({fn.__module__ for fn in fns if fn})
+    if not modules:
+        return None
+
+    digest = hashlib.sha256()
+    for name in modules:
+        try:
+            digest.update(inspect.getsource(sys.modules[name]).encode("utf-8"))
+        except (OSError, TypeError):
+            digest.update(name.encode("utf-8"))  # no source on disk (frozen build)
+    return digest.hexdigest()[:16]
+
+
+def get_evaluator(template_id: str, prescreen: bool = False, shadow_rate: float = DEFAULT_SHADOW_RATE):
+    """
+    Resolve a template id to an evaluator function.
+    With `prescreen`, LLM templates that have a registered pre-screen are gated.
+    """
+    evaluator_fn = EVALUATORS.get(template_id)
+    policy = PRESCREEN.get(template_id)
+
+    if not evaluator_fn or not prescreen or not policy:
+        return evaluator_fn
+
+    return gated(
+        evaluator_fn,
+        policy["scorer"],
+        low=policy["low"],
+        high=policy["high"],
+        shadow_rate=shadow_rate,
+    )
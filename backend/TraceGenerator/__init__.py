@@ -1,10 +1,15 @@
+import logging
 import os
 import random
 from datetime import datetime, timezone
-from azure.cosmos import CosmosClient, exceptions
 
-# 🔐 Key Vault (shared across App Service & Functions)
-from shared.secrets import get_secret
+# 🔐 Cosmos containers (lazy, Key Vault backed; reused across invocations)
+from shared.cosmos import (
+    traces_container,
+    metrics_container as counter_container,
+)
+from shared.blobstore import offload_payloads
+from shared.ids import BlockIdAllocator, new_ulid
 
 
 # ============================================================
@@ -354,40 +359,34 @@ ALL_CONTEXTS = [d["context"] for d in DATA]
 
 
 # ============================================================
-# TRACE COUNTER
+# TRACE IDS
 # ============================================================
-def get_next_trace_number(counter_container):
-    try:
-        doc = counter_container.read_item(
-            item="trace_counter",
-            partition_key="trace_counter"
-        )
-        next_no = doc["value"] + 1
-    except exceptions.CosmosResourceNotFoundError:
-        next_no = 1
-        doc = {
-            "id": "trace_counter",
-            "partitionKey": "trace_counter",
-            "value": 0
-        }
+# "counter": trace-0001 style numbers, leased in blocks (no per-trace I/O)
+# "ulid":    trace-<ULID>, time-ordered, no coordination at all
+TRACE_ID_MODE = os.getenv("TRACE_ID_MODE", "counter")
+
+_allocator = BlockIdAllocator(
+    counter_container,
+    block_size=int(os.getenv("TRACE_ID_BLOCK_SIZE", "100")),
+)
+
 
-    doc["value"] = next_no
-    counter_container.upsert_item(doc)
-    return next_no
+def next_trace_id() -> str:
+    if TRACE_ID_MODE == "ulid":
+        return f"trace-{new_ulid()}"
+    return f"trace-{str(_allocator.next()).zfill(4)}"
 
 
 # ============================================================
 # TRACE BUILDER
 # ============================================================
-def make_trace(trace_no, session_id, user_id, trace_name,
+def make_trace(trace_id, session_id, user_id, trace_name,
                input_text, context_text, output_text):
 
     tokens_in = random.randint(200, 3500)
     tokens_out = random.randint(50, 1500)
 
-    trace_id = f"trace-{str(trace_no).zfill(4)}"
-
-    return {
+    return offload_payloads({
         "id": trace_id,
         "partitionKey": trace_id,
         "trace_id": trace_id,
@@ -409,24 +408,31 @@ def make_trace(trace_no, session_id, user_id, trace_name,
         "cost": round((tokens_in + tokens_out) * random.uniform(0.00008, 0.00025), 5),
 
         "model": random.choice(["gpt-4o", "gpt-4o-mini", "llama-3.3-70b"]),
-    }
+    })
 
 
 # ============================================================
 # TIMER FUNCTION (AZURE FUNCTION ENTRY)
 # ============================================================
-def main(mytimer):
+LOADGEN_RATE = float(os.getenv("LOADGEN_RATE", "0"))
+LOADGEN_DURATION_SECONDS = float(os.getenv("LOADGEN_DURATION_SECONDS", "50"))
+LOADGEN_PROFILE = os.getenv("LOADGEN_PROFILE", "constant")
 
-    # 🔐 Read Cosmos connection securely from Key Vault
-    COSMOS_CONN_WRITE = get_secret("COSMOS-CONN-WRITE")
 
-    cosmos = CosmosClient.from_connection_string(
-        COSMOS_CONN_WRITE
-    )
+def main(mytimer):
+
+    # 🔥 LOAD-GENERATION MODE (capacity testing, see loadgen.py)
+    if LOADGEN_RATE > 0:
+        from TraceGenerator.loadgen import run_load
 
-    db = cosmos.get_database_client("llmops-data")
-    traces_container = db.get_container_client("traces")
-    counter_container = db.get_container_client("metrics")
+        report = run_load(
+            traces_container,
+            rate=LOADGEN_RATE,
+            duration=LOADGEN_DURATION_SECONDS,
+            profile=LOADGEN_PROFILE,
+        )
+        logging.info(f"[TraceGenerator] Load run: {report}")
+        return
 
     # 🔥 HIGH VOLUME TRACE GENERATION
     for _ in range(random.randint(2, 5)):
@@ -444,10 +450,8 @@ def main(mytimer):
         elif r >= GOOD_RATIO + BAD_CONTEXT_RATIO:
             output_text = random.choice(BAD_ANSWERS)
 
-        trace_no = get_next_trace_number(counter_container)
-
         trace = make_trace(
-            trace_no=trace_no,
+            trace_id=next_trace_id(),
             session_id=f"session-{random.randint(1, 200)}",
             user_id=random.choice(USERS),
             trace_name=random.choice(TRACE_NAMES),
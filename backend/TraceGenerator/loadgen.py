@@ -0,0 +1,264 @@
+"""
+Synthetic load generator for capacity testing the trace pipeline.
+
+Runs inside the TraceGenerator timer (LOADGEN_RATE set) or standalone:
+
+    cd backend
+    python -m TraceGenerator.loadgen --rate 500 --duration 60 --profile burst \\
+        --zipf 1.1 --payload-mix small=0.6,medium=0.3,large=0.1 --target memory
+
+--target cosmos writes to the real `traces` container (so EvaluatorRunner
+and Aggregator see the load); --target memory writes to an in-process
+stand-in with simulated latency. Reports achieved throughput and write
+latency percentiles.
+"""
+
+import argparse
+import bisect
+import itertools
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from TraceGenerator import (
+    ALL_CONTEXTS,
+    BAD_ANSWERS,
+    BAD_CONTEXT_RATIO,
+    DATA,
+    GOOD_RATIO,
+    TRACE_NAMES,
+    make_trace,
+)
+from shared.ids import new_ulid
+from shared.stats import percentile
+
+
+# ============================================================
+# RATE PROFILES (multiplier of the target rate at time t)
+# ============================================================
+def _constant(t, duration):
+    return 1.0
+
+
+def _burst(t, duration):
+    # 2s at 3x every 10s, 0.5x otherwise -> same mean rate as constant
+    return 3.0 if t % 10 < 2 else 0.5
+
+
+def _ramp(t, duration):
+    return 2.0 * t / duration if duration else 1.0
+
+
+def _sine(t, duration):
+    return 1.0 + 0.8 * math.sin(2 * math.pi * t / 30)
+
+
+PROFILES = {
+    "constant": _constant,
+    "burst": _burst,
+    "ramp": _ramp,
+    "sine": _sine,
+}
+
+
+# ============================================================
+# ZIPF SKEW (a few sessions / users get most of the traffic)
+# ============================================================
+class ZipfSampler:
+    """Sample ranks 1..n with P(k) ∝ 1/k^s (s=0 → uniform)."""
+
+    def __init__(self, n: int, s: float):
+        weights = [1.0 / (k ** s) for k in range(1, n + 1)]
+        self._cdf = list(itertools.accumulate(weights))
+
+    def sample(self) -> int:
+        return bisect.bisect_left(self._cdf, random.random() * self._cdf[-1]) + 1
+
+
+# ============================================================
+# PAYLOAD SIZES
+# ============================================================
+PAYLOAD_BYTES = {
+    "small": 0,          # the dataset context as-is (~300 B)
+    "medium": 8_000,
+    "large": 32_000,
+}
+
+
+def parse_mix(spec: str) -> list:
+    mix = []
+    for part in spec.split(","):
+        name, weight = part.split("=")
+        mix.append((name.strip(), float(weight)))
+    return mix
+
+
+def pad_context(context: str, size: int) -> str:
+    """Grow a context to ~size bytes with other retrieved passages."""
+    parts = [context]
+    length = len(context)
+    while length < size:
+        passage = random.choice(ALL_CONTEXTS)
+        parts.append(passage)
+        length += len(passage) + 1
+    return "\n".join(parts)
+
+
+# ============================================================
+# TRACE FACTORY
+# ============================================================
+class TraceFactory:
+    def __init__(self, sessions: int, users: int, zipf: float, mix: list):
+        self._sessions = ZipfSampler(sessions, zipf)
+        self._users = ZipfSampler(users, zipf)
+        self._sizes = [name for name, _ in mix]
+        self._size_weights = [w for _, w in mix]
+
+    def __call__(self) -> dict:
+        base = random.choice(DATA)
+        context_text = base["context"]
+        output_text = random.choice(base["outputs"])
+
+        r = random.random()
+        if GOOD_RATIO <= r < GOOD_RATIO + BAD_CONTEXT_RATIO:
+            context_text = random.choice(
+                [c for c in ALL_CONTEXTS if c != context_text]
+            )
+        elif r >= GOOD_RATIO + BAD_CONTEXT_RATIO:
+            output_text = random.choice(BAD_ANSWERS)
+
+        size = random.choices(self._sizes, self._size_weights)[0]
+        context_text = pad_context(context_text, PAYLOAD_BYTES[size])
+
+        session_rank = self._sessions.sample()
+        return make_trace(
+            trace_id=f"trace-{new_ulid()}",
+            session_id=f"session-{session_rank}",
+            user_id=f"user-{str(self._users.sample()).zfill(4)}",
+            trace_name=random.choice(TRACE_NAMES),
+            input_text=base["input"],
+            context_text=context_text,
+            output_text=output_text,
+        )
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+def run_load(
+    container,
+    rate: float,
+    duration: float,
+    profile: str = "constant",
+    concurrency: int = 64,
+    sessions: int = 200,
+    users: int = 500,
+    zipf: float = 1.1,
+    payload_mix: str = "small=0.7,medium=0.25,large=0.05",
+) -> dict:
+    """
+    Open-loop generator: traces are scheduled on a clock at
+    rate * profile(t), independent of how fast writes complete, so
+    a saturated sink shows up as falling throughput and rising latency.
+    """
+    factory = TraceFactory(sessions, users, zipf, parse_mix(payload_mix))
+    shape = PROFILES[profile]
+
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def write(doc):
+        t0 = time.perf_counter()
+        try:
+            container.create_item(doc)
+        except Exception:
+            with lock:
+                errors[0] += 1
+            return
+        with lock:
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    sent = 0
+    budget = 0.0
+    started = time.perf_counter()
+    last = started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            now = time.perf_counter()
+            elapsed = now - started
+            if elapsed >= duration:
+                break
+
+            budget += rate * shape(elapsed, duration) * (now - last)
+            last = now
+
+            while budget >= 1:
+                pool.submit(write, factory())
+                sent += 1
+                budget -= 1
+
+            time.sleep(0.001)
+
+    wall = time.perf_counter() - started
+
+    def pct(q):
+        value = percentile(latencies, q)
+        return round(value, 1) if value is not None else None
+
+    return {
+        "profile": profile,
+        "target_rate": rate,
+        "sent": sent,
+        "written": len(latencies),
+        "errors": errors[0],
+        "throughput": round(len(latencies) / wall, 1),
+        "write_ms_p50": pct(50),
+        "write_ms_p95": pct(95),
+        "write_ms_p99": pct(99),
+    }
+
+
+def _target(name: str, latency_ms: float):
+    if name == "memory":
+        from benchmarks.fakes import InMemoryContainer
+        return InMemoryContainer(latency_ms=latency_ms)
+
+    from shared.cosmos import traces_container
+    return traces_container
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic trace load generator")
+    parser.add_argument("--rate", type=float, default=100, help="traces per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="constant")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--zipf", type=float, default=1.1, help="0 = uniform")
+    parser.add_argument("--payload-mix", default="small=0.7,medium=0.25,large=0.05")
+    parser.add_argument("--target", choices=["cosmos", "memory"], default="memory")
+    parser.add_argument("--latency-ms", type=float, default=6.0, help="memory target RTT")
+    args = parser.parse_args(argv)
+
+    report = run_load(
+        _target(args.target, args.latency_ms),
+        rate=args.rate,
+        duration=args.duration,
+        profile=args.profile,
+        concurrency=args.concurrency,
+        sessions=args.sessions,
+        users=args.users,
+        zipf=args.zipf,
+        payload_mix=args.payload_mix,
+    )
+    for key, value in report.items():
+        print(f"{key:<14} {value}")
+
+
+if __name__ == "__main__":
+    main()
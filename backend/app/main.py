@@ -11,11 +11,17 @@ from app.routers.templates import router as templates_router
 from app.routers.sessions import router as sessions_router
 from app.routers.metrics import router as metrics_router
 from app.routers.audit import router as audit_router
+from app.routers.otlp import router as otlp_router
+from app.routers.analytics import router as analytics_router
+from app.routers.prompts import router as prompts_router
+from app.routers.alerts import router as alerts_router
 
 # --------------------------------------------------
 # App initialization
 # --------------------------------------------------
-from routers.prompts import router as prompts_router
+from services.ingest import trace_buffer
+from services.prompts import prompt_service
+from shared.audit import audit_writer
 
 from dotenv import load_dotenv
 from pathlib import Path
@@ -41,6 +47,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 # --------------------------------------------------
@@ -52,7 +59,28 @@ app.include_router(evaluators_router, prefix="/evaluators", tags=["Evaluators"])
 app.include_router(templates_router, prefix="/templates", tags=["Templates"])
 app.include_router(sessions_router, prefix="/sessions", tags=["Sessions"])
 app.include_router(metrics_router, prefix="/dashboard", tags=["Dashboard"])
+app.include_router(alerts_router, prefix="/alerts", tags=["Alerts"])
 app.include_router(audit_router)  # prefix already defined in router
+app.include_router(otlp_router)  # OTLP/HTTP: POST /v1/traces
+app.include_router(analytics_router)  # prefix already defined in router
+app.include_router(prompts_router)  # /api/v1/prompts...
+
+# --------------------------------------------------
+# Startup: prompt catalog refresher and cross-worker change feed
+# --------------------------------------------------
+@app.on_event("startup")
+def start_background_sync():
+    prompt_service.start()
+
+
+# --------------------------------------------------
+# Shutdown: drain buffered trace and audit writes
+# --------------------------------------------------
+@app.on_event("shutdown")
+def drain_buffers():
+    trace_buffer.close()
+    audit_writer.close()
+
 
 # --------------------------------------------------
 # Root endpoint
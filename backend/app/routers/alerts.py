@@ -0,0 +1,157 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from azure.cosmos.exceptions import CosmosResourceExistsError, CosmosResourceNotFoundError
+
+from shared.alerts import InvalidRule, validate_rule
+from shared.audit import audit_log
+from shared.cosmos import alert_rules_container, alerts_container_read
+
+router = APIRouter()
+
+
+class AlertRuleIn(BaseModel):
+    name: str
+    metric: str                        # latency_ms | cost | tokens | tokens_in | tokens_out | score
+    aggregate: str = "avg"             # avg | sum | count | min | max | p50 | p90 | p95 | p99
+    op: str                            # > | >= | < | <=
+    threshold: float
+    window_seconds: Optional[int] = None
+    window_count: Optional[int] = None
+    filters: Dict[str, str] = {}       # model / trace_name / evaluator_name
+    min_samples: Optional[int] = None
+    cooldown_seconds: Optional[int] = None
+    severity: str = "warning"
+    enabled: bool = True
+
+
+def _rule_doc(payload: AlertRuleIn, rule_id: Optional[str] = None) -> dict:
+    data = payload.model_dump(exclude_none=True)
+    if rule_id:
+        data["id"] = rule_id
+    try:
+        return validate_rule(data)
+    except InvalidRule as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# ---------------------------------------------------------
+# RULES
+# ---------------------------------------------------------
+@router.get("/rules")
+def get_rules():
+    try:
+        items = list(
+            alert_rules_container.query_items(
+                query="SELECT * FROM c ORDER BY c.created_at DESC",
+                enable_cross_partition_query=True,
+            )
+        )
+        return {"rules": items}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/rules")
+def create_rule(payload: AlertRuleIn):
+    doc = _rule_doc(payload)
+    now = datetime.utcnow().isoformat()
+    doc.update(created_at=now, updated_at=now)
+
+    try:
+        alert_rules_container.create_item(doc)
+    except CosmosResourceExistsError:
+        raise HTTPException(status_code=409, detail="Alert rule with this name already exists")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    audit_log(
+        action="Alert Rule Created",
+        type="alert_rule",
+        user="system",
+        details=f"Created alert rule '{doc['name']}'",
+    )
+    return {"status": "ok", "rule": doc}
+
+
+@router.put("/rules/{rule_id}")
+def update_rule(rule_id: str, payload: AlertRuleIn):
+    try:
+        current = alert_rules_container.read_item(item=rule_id, partition_key=rule_id)
+    except CosmosResourceNotFoundError:
+        raise HTTPException(status_code=404, detail="Alert rule not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    doc = _rule_doc(payload, rule_id)
+    # a new updated_at resets the rule's window in the engine
+    doc.update(created_at=current.get("created_at"), updated_at=datetime.utcnow().isoformat())
+
+    try:
+        alert_rules_container.replace_item(item=rule_id, body=doc)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    audit_log(
+        action="Alert Rule Updated",
+        type="alert_rule",
+        user="system",
+        details=f"Updated alert rule '{doc['name']}'",
+    )
+    return {"status": "ok", "rule": doc}
+
+
+@router.delete("/rules/{rule_id}")
+def delete_rule(rule_id: str):
+    try:
+        alert_rules_container.delete_item(item=rule_id, partition_key=rule_id)
+    except CosmosResourceNotFoundError:
+        raise HTTPException(status_code=404, detail="Alert rule not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    audit_log(
+        action="Alert Rule Deleted",
+        type="alert_rule",
+        user="system",
+        details=f"Deleted alert rule '{rule_id}'",
+    )
+    return {"status": "ok"}
+
+
+# ---------------------------------------------------------
+# ALERTS
+# ---------------------------------------------------------
+@router.get("")
+def get_alerts(
+    status: Optional[str] = Query(None, description="firing | resolved"),
+    rule_id: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """Alerts raised by the AlertMonitor functions, newest first."""
+    filters, params = [], [{"name": "@n", "value": limit}]
+    if status:
+        filters.append("c.status = @status")
+        params.append({"name": "@status", "value": status})
+
+    query = "SELECT TOP @n * FROM c"
+    if filters:
+        query += " WHERE " + " AND ".join(filters)
+    query += " ORDER BY c.started_at DESC"
+
+    try:
+        items = list(
+            alerts_container_read.query_items(
+                query=query,
+                parameters=params,
+                # one rule = one partition
+                **({"partition_key": rule_id} if rule_id else {"enable_cross_partition_query": True}),
+            )
+        )
+        return {"alerts": items}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,83 @@
+import math
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from services.analytics import (
+    MAX_ROWS,
+    NAMED_QUERIES,
+    QueryRejected,
+    analytics_engine,
+)
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+class SqlQuery(BaseModel):
+    sql: str
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    limit: int = MAX_ROWS
+
+
+# ---------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------
+def scrub(obj):
+    if isinstance(obj, float) and (math.isnan(obj) or math.isinf(obj)):
+        return None
+    if isinstance(obj, dict):
+        return {k: scrub(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [scrub(i) for i in obj]
+    return obj
+
+
+# ---------------------------------------------------------
+# NAMED QUERIES (dashboard presets)
+# ---------------------------------------------------------
+@router.get("/queries")
+def list_queries():
+    return {name: " ".join(sql.split()) for name, sql in NAMED_QUERIES.items()}
+
+
+@router.get("/queries/{name}")
+def run_named_query(
+    name: str,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    limit: int = Query(MAX_ROWS, ge=1, le=MAX_ROWS),
+):
+    if name not in NAMED_QUERIES:
+        raise HTTPException(status_code=404, detail=f"Unknown query '{name}'")
+
+    try:
+        return scrub(analytics_engine.run_named(name, date_from, date_to, limit))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ---------------------------------------------------------
+# AD-HOC SQL (read-only, archive views only)
+# ---------------------------------------------------------
+@router.post("/sql")
+def run_sql(body: SqlQuery):
+    """
+    Run one SELECT over the `traces` / `evaluations` archive views,
+    restricted to the from/to date partitions (default: last 90 days).
+    """
+    try:
+        return scrub(
+            analytics_engine.run_sql(body.sql, body.date_from, body.date_to, body.limit)
+        )
+    except QueryRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        # binder / parser errors from the engine are the caller's SQL
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException, Query
+from datetime import date
+
+from fastapi import APIRouter, HTTPException, Query, Response
 
 # ✅ Correct shared import (Key Vault already handled there)
-from shared.cosmos import audit_container_read
+from shared.cosmos import audit_by_day_container_read
+from shared.audit import audit_writer, query_audit
 
 router = APIRouter(prefix="/audit", tags=["Audit"])
 
@@ -11,43 +14,45 @@ router = APIRouter(prefix="/audit", tags=["Audit"])
 # ---------------------------------------------------------
 @router.get("")
 def get_audit_logs(
+    response: Response,
     type: str | None = Query(None, description="Filter by type (evaluator, template)"),
     action: str | None = Query(None, description="Filter by action"),
     user: str | None = Query(None, description="Filter by user"),
+    date_from: date | None = Query(None, alias="from", description="First day (default: 90 days back)"),
+    date_to: date | None = Query(None, alias="to", description="Last day (default: today)"),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the previous page"),
     limit: int = Query(200, ge=1, le=1000),
 ):
+    """
+    Newest entries first, one day partition at a time; only the days
+    needed to fill the page are queried. When more entries exist in the
+    range, the X-Next-Cursor header carries the cursor for the next page.
+    """
     try:
-        query = "SELECT * FROM c"
-        filters = []
-        params = []
-
-        if type:
-            filters.append("c.type = @type")
-            params.append({"name": "@type", "value": type})
-
-        if action:
-            filters.append("c.action = @action")
-            params.append({"name": "@action", "value": action})
-
-        if user:
-            filters.append("c.user = @user")
-            params.append({"name": "@user", "value": user})
-
-        if filters:
-            query += " WHERE " + " AND ".join(filters)
-
-        query += " ORDER BY c.timestamp DESC"
-
-        items = list(
-            audit_container_read.query_items(
-                query=query,
-                parameters=params,
-                enable_cross_partition_query=True,
-            )
+        items, next_cursor = query_audit(
+            audit_by_day_container_read,
+            date_from=date_from,
+            date_to=date_to,
+            type=type,
+            action=action,
+            user=user,
+            limit=limit,
+            cursor=cursor,
         )
-
-        # Limit after query (Cosmos ORDER BY + LIMIT is costly)
-        return items[:limit]
-
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+
+# ---------------------------------------------------------
+# AUDIT WRITER STATS
+# ---------------------------------------------------------
+@router.get("/stats")
+def get_audit_stats():
+    """Queue depth, batch / spill / drop counters of the async audit writer."""
+    return audit_writer.stats()
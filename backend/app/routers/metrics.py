@@ -1,13 +1,18 @@
 import math
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
 
 # ✅ Correct shared import (Key Vault handled internally)
 from shared.cosmos import metrics_container_read as metrics_container
+from shared.drift import DRIFT_PK, ScoreDrift
+from shared.histograms import BASE_BINS, GROUP_BY, rebin
 
 router = APIRouter()
 
 METRICS_ID = "metrics_snapshot"
 METRICS_PK = "metrics_snapshot"
+HISTOGRAMS_ID = "histograms_snapshot"
 
 
 # -----------------------------
@@ -48,3 +53,97 @@ def get_metrics():
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/histograms")
+def get_histograms(
+    metric: str = Query("latency_ms", description="latency_ms | cost | tokens | score"),
+    evaluator: Optional[str] = Query(None, description="Evaluator name (metric=score)"),
+    group_by: Optional[str] = Query(None, description="model | trace_name"),
+    bins: int = Query(20, ge=1, le=200),
+    range_min: Optional[float] = Query(None, alias="min"),
+    range_max: Optional[float] = Query(None, alias="max"),
+):
+    """
+    Distribution of a trace metric or an evaluator's scores, re-binned
+    from the Aggregator's pre-binned counters (one point read; size and
+    time don't depend on the number of traces).
+    """
+    if metric not in BASE_BINS:
+        raise HTTPException(status_code=400, detail=f"Unknown metric '{metric}'")
+    if group_by and group_by not in GROUP_BY:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {', '.join(GROUP_BY)}")
+    if metric == "score" and not evaluator:
+        raise HTTPException(status_code=400, detail="metric=score needs an evaluator")
+
+    try:
+        snapshot = metrics_container.read_item(item=HISTOGRAMS_ID, partition_key=HISTOGRAMS_ID)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    source = (
+        snapshot.get("scores", {}).get(evaluator)
+        if metric == "score"
+        else snapshot.get("metrics", {}).get(metric)
+    )
+    if source is None:
+        raise HTTPException(status_code=404, detail=f"No histogram for '{evaluator or metric}'")
+
+    hists = source.get(group_by, {}) if group_by else {"all": source["all"]}
+
+    return scrub({
+        "metric": metric,
+        "evaluator": evaluator,
+        "group_by": group_by,
+        "generated_at": snapshot.get("generated_at"),
+        **rebin(metric, hists, bins, range_min, range_max),
+    })
+
+
+@router.get("/drift")
+def get_drift(
+    evaluator: Optional[str] = Query(None, description="Evaluator name"),
+    model: Optional[str] = Query(None, description="Model ('*' = all models)"),
+    status: Optional[str] = Query(None, description="stable | warming_up | drift_up | drift_down"),
+):
+    """
+    Online drift state per evaluator / model / trace_name, with recent
+    change points. Maintained by the DriftMonitor function as scores are
+    written; this is one single-partition query.
+    """
+    filters, params = [], []
+    for field, value in (("evaluator_name", evaluator), ("model", model), ("status", status)):
+        if value:
+            filters.append(f"c.{field} = @{field}")
+            params.append({"name": f"@{field}", "value": value})
+
+    query = "SELECT * FROM c"
+    if filters:
+        query += " WHERE " + " AND ".join(filters)
+
+    try:
+        docs = list(
+            metrics_container.query_items(
+                query=query,
+                parameters=params,
+                partition_key=DRIFT_PK,
+            )
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    items = []
+    for doc in docs:
+        detector = ScoreDrift(doc.get("state"))
+        items.append({
+            "evaluator_name": doc.get("evaluator_name"),
+            "model": doc.get("model"),
+            "trace_name": doc.get("trace_name"),
+            "updated_at": doc.get("updated_at"),
+            **detector.summary(),
+        })
+
+    # drifting keys first, most recent change first
+    items.sort(key=lambda i: (i["change_points"][-1]["at"] or "") if i["change_points"] else "", reverse=True)
+    items.sort(key=lambda i: not i["status"].startswith("drift"))
+    return scrub(items)
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from services.ingest import BufferFull, build_trace_doc, trace_buffer
+from services.otlp import UnsupportedPayload, decode_export, encode_response
+
+# OTLP/HTTP default path; exporters point OTEL_EXPORTER_OTLP_ENDPOINT at the API root
+router = APIRouter(tags=["OTLP"])
+
+
+# ---------------------------------------------------------
+# OTLP/HTTP TRACE EXPORT
+# ---------------------------------------------------------
+@router.post("/v1/traces")
+async def export_traces(request: Request):
+    """
+    Accepts ExportTraceServiceRequest as application/x-protobuf or
+    application/json, optionally Content-Encoding: gzip. GenAI spans are
+    mapped to trace documents and handed to the ingest write buffer.
+    """
+    content_type = request.headers.get("content-type")
+    body = await request.body()
+
+    try:
+        # decoding a large batch is CPU work — keep it off the event loop
+        traces, rejected = await run_in_threadpool(
+            decode_export,
+            body,
+            content_type,
+            request.headers.get("content-encoding"),
+        )
+    except UnsupportedPayload as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid OTLP payload: {e}")
+
+    if traces:
+        try:
+            trace_buffer.submit([build_trace_doc(t) for t in traces])
+        except BufferFull as e:
+            # OTLP exporters retry 429 / 503 and honour Retry-After
+            raise HTTPException(
+                status_code=503 if e.unavailable else 429,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)},
+            )
+
+    payload, media_type = encode_response(content_type, rejected)
+    return Response(content=payload, media_type=media_type)
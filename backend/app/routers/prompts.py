@@ -3,13 +3,20 @@ Prompt API Routes
 All prompt data is fetched from MLflow Prompt Registry.
 """
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import time
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
-from services.prompts import prompt_service
+from services.prompts import MissingVariables, PromptNotFound, prompt_service
+from services.variants import InvalidSplit
 
 router = APIRouter(prefix="/api/v1", tags=["prompts"])
 
+LONG_POLL_INTERVAL_SECONDS = 0.25
+
 
 class PromptCreateRequest(BaseModel):
     name: str
@@ -25,13 +32,69 @@ class PromoteRequest(BaseModel):
     environment: str
 
 
+class RenderRequest(BaseModel):
+    variables: Dict[str, Any] = {}
+    alias: str = "production"
+    version: Optional[int] = None
+    unit: Optional[str] = None  # user / session id for A/B routing
+
+
+class SplitVariant(BaseModel):
+    name: str
+    version: int
+    weight: float = 1
+
+
+class SplitRequest(BaseModel):
+    variants: List[SplitVariant]
+    salt: Optional[str] = None
+
+
+def _if_none_match(request: Request) -> Optional[str]:
+    value = request.headers.get("if-none-match")
+    if not value:
+        return None
+    return value.strip().removeprefix("W/").strip('"')
+
+
 @router.get("/prompts")
-def get_prompts():
+def get_prompts(request: Request):
     """
     Get all prompts (latest version of each).
     Data is fetched from MLflow Prompt Registry.
+    The ETag is the registry change version; If-None-Match gives a 304.
+    """
+    etag = f'"{prompt_service.change_token}"'  # taken before reading: never newer than the data
+    if _if_none_match(request) == etag.strip('"'):
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(prompt_service.list_prompts(), headers={"ETag": etag})
+
+
+@router.get("/prompts/changes")
+async def get_prompt_changes(
+    request: Request,
+    since: Optional[str] = None,
+    timeout: float = Query(30, ge=0, le=60),
+):
+    """
+    Long-poll for registry changes (new versions, alias promotions).
+    Pass the last seen `version` as `since` (or as If-None-Match); the
+    call returns as soon as something changed, or 304 after `timeout`
+    seconds. `reset: true` means drop all cached prompts.
     """
-    return prompt_service.list_prompts()
+    since = since or _if_none_match(request)
+    deadline = time.monotonic() + timeout
+
+    while True:
+        result = prompt_service.changes_since(since)
+        if result["reset"] or result["changes"] or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(LONG_POLL_INTERVAL_SECONDS)
+
+    etag = f'"{result["version"]}"'
+    if not result["reset"] and not result["changes"]:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(result, headers={"ETag": etag})
 
 
 @router.post("/prompts")
@@ -66,6 +129,101 @@ def get_prompt_by_name(name: str, version: Optional[int] = None):
     return prompt
 
 
+@router.get("/prompts/{name}/resolve")
+def resolve_prompt(
+    name: str,
+    request: Request,
+    response: Response,
+    alias: str = "production",
+    version: Optional[int] = None,
+    unit: Optional[str] = None,
+):
+    """
+    Resolve an alias (default 'production') or a pinned version to its
+    template. Served from an in-memory cache for callers' request paths;
+    the ETag identifies the resolved version (If-None-Match gives a 304).
+    With `unit` (user / session id) and an active split, the unit's
+    variant is served and named in `variant`.
+    """
+    try:
+        compiled, variant = prompt_service.route(name, unit, alias, version)
+    except PromptNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if _if_none_match(request) == compiled.etag.strip('"'):
+        return Response(status_code=304, headers={"ETag": compiled.etag})
+
+    response.headers["ETag"] = compiled.etag
+    return {**compiled.payload, "variant": variant} if variant else compiled.payload
+
+
+@router.post("/prompts/{name}/render")
+def render_prompt(name: str, request: RenderRequest, response: Response):
+    """
+    Resolve like /resolve and fill in the template variables.
+    Missing variables are a 400.
+    """
+    try:
+        compiled, rendered, variant = prompt_service.render(
+            name, request.variables, request.alias, request.version, request.unit
+        )
+    except PromptNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except MissingVariables as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    response.headers["ETag"] = compiled.etag
+    return {
+        "id": compiled.payload["id"],
+        "name": compiled.payload["name"],
+        "version": compiled.version,
+        "alias": compiled.payload["alias"],
+        "variant": variant,
+        "rendered": rendered,
+        "model_parameters": compiled.payload["model_parameters"],
+        "etag": compiled.etag,
+    }
+
+
+@router.get("/prompts/{name}/split")
+def get_split(name: str):
+    split = prompt_service.get_split(name)
+    if not split:
+        raise HTTPException(status_code=404, detail=f"No split configured for '{name}'")
+    return split
+
+
+@router.put("/prompts/{name}/split")
+def set_split(name: str, request: SplitRequest):
+    """
+    Weighted A/B split between versions of a prompt. Callers passing a
+    `unit` to /resolve or /render are assigned deterministically by hash.
+    """
+    try:
+        return prompt_service.set_split(name, [v.model_dump() for v in request.variants], request.salt)
+    except PromptNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidSplit as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/prompts/{name}/split")
+def delete_split(name: str):
+    try:
+        removed = prompt_service.remove_split(name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not removed:
+        raise HTTPException(status_code=404, detail=f"No split configured for '{name}'")
+    return {"status": "success"}
+
+
 @router.get("/prompts/{name}/history")
 def get_history(name: str):
     """
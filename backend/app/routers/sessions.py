@@ -1,12 +1,25 @@
 import math
+import os
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, HTTPException
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
 
 # ✅ Correct shared import (read-only container)
-from shared.cosmos import traces_container_read as traces_container
+from shared.cosmos import (
+    traces_container_read as traces_container,
+    traces_by_session_container_read as session_index_container,
+)
+from shared.session_index import session_traces
 
 router = APIRouter()
 
+# The session index trails the traces change feed by a few seconds; a
+# session with a trace this recent may still be missing some refs
+INDEX_LAG_SECONDS = int(os.getenv("SESSION_INDEX_LAG_SECONDS", "120"))
+READ_WORKERS = 16
+
 
 # -----------------------------
 # Helpers
@@ -24,6 +37,29 @@ def scrub(obj):
     return obj
 
 
+def _recent(refs: list) -> bool:
+    newest = max((r.get("timestamp") or "" for r in refs), default="")
+    try:
+        ts = datetime.fromisoformat(newest.replace("Z", "+00:00"))
+    except ValueError:
+        return True  # can't tell: don't trust the index
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - ts < timedelta(seconds=INDEX_LAG_SECONDS)
+
+
+def _read_traces(refs: list) -> list:
+    """Full trace documents for index refs (point reads: id = pk = trace_id)."""
+    def read(ref):
+        try:
+            return traces_container.read_item(item=ref["trace_id"], partition_key=ref["trace_id"])
+        except CosmosResourceNotFoundError:
+            return None  # expired since it was indexed
+
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+        return [t for t in pool.map(read, refs) if t]
+
+
 # -----------------------------
 # Routes
 # -----------------------------
@@ -60,10 +96,10 @@ def list_sessions():
 
             s = sessions[session_id]
             s["session_id"] = session_id
-            s["user_id"] = t.get("user_id", "unknown")
+            s["user_id"] = t.get("user_id") or "unknown"
             s["trace_count"] += 1
-            s["total_tokens"] += t.get("tokens", 0)
-            s["total_cost"] += t.get("cost", 0.0)
+            s["total_tokens"] += t.get("tokens") or 0
+            s["total_cost"] += t.get("cost") or 0.0
 
             ts = t.get("timestamp")
             if ts and (s["created"] is None or ts < s["created"]):
@@ -78,26 +114,35 @@ def list_sessions():
 @router.get("/{session_id}")
 def get_session(session_id: str):
     try:
-        # 🔥 Query all traces of a specific session (read-only)
-        traces = list(
-            traces_container.query_items(
-                query="SELECT * FROM c WHERE c.session_id=@sid",
-                parameters=[{"name": "@sid", "value": session_id}],
-                enable_cross_partition_query=True,
+        # ⚡ Single-partition read from the session index (timestamp order),
+        # then the full documents by point read
+        refs = session_traces(session_index_container, session_id)
+        traces = _read_traces(refs) if refs and not _recent(refs) else []
+
+        if not traces:
+            # Not indexed yet, or still active and possibly partly indexed
+            # (change-feed lag / before backfill): fan out
+            traces = list(
+                traces_container.query_items(
+                    query="SELECT * FROM c WHERE c.session_id=@sid",
+                    parameters=[{"name": "@sid", "value": session_id}],
+                    enable_cross_partition_query=True,
+                )
             )
-        )
+            traces.sort(key=lambda t: t.get("timestamp") or "")
 
         if not traces:
             raise HTTPException(status_code=404, detail="Session not found")
 
         session = {
             "session_id": session_id,
-            "user_id": traces[0].get("user_id", "unknown"),
+            "user_id": traces[0].get("user_id") or "unknown",
             "trace_count": len(traces),
-            "total_tokens": sum(t.get("tokens", 0) for t in traces),
-            "total_cost": sum(t.get("cost", 0.0) for t in traces),
+            "total_tokens": sum(t.get("tokens") or 0 for t in traces),
+            "total_cost": sum(t.get("cost") or 0.0 for t in traces),
             "created": min(
-                t["timestamp"] for t in traces if t.get("timestamp")
+                (t["timestamp"] for t in traces if t.get("timestamp")),
+                default=None,
             ),
             "traces": traces,
         }
@@ -1,12 +1,49 @@
 import math
 from datetime import datetime, timezone
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
 
 # ✅ Correct shared import (read-only container)
-from shared.cosmos import traces_container_read as traces_container
+from shared.cosmos import (
+    traces_container_read as traces_container,
+    traces_by_session_container_read as session_index_container,
+)
+from shared.session_index import session_traces
+from services.ingest import BufferFull, build_trace_doc, trace_buffer
+from shared.blobstore import hydrate_payloads
 
 router = APIRouter()
 
+MAX_BATCH_SIZE = 1000
+
+
+# -----------------------------
+# Ingestion models
+# -----------------------------
+class TraceIn(BaseModel):
+    trace_id: Optional[str] = None
+    session_id: Optional[str] = None
+    user_id: Optional[str] = None
+    trace_name: Optional[str] = None
+    timestamp: Optional[str] = None
+
+    input: Optional[str] = None
+    context: Optional[str] = None
+    output: Optional[str] = None
+    system_prompt: Optional[str] = None
+
+    model: Optional[str] = None
+    latency_ms: Optional[int] = None
+    tokens_in: Optional[int] = None
+    tokens_out: Optional[int] = None
+    cost: Optional[float] = None
+
+    # prompt served for this call (A/B variant when routed by unit)
+    prompt_name: Optional[str] = None
+    prompt_version: Optional[int] = None
+    prompt_variant: Optional[str] = None
+
 
 # -----------------------------
 # Helpers
@@ -54,9 +91,44 @@ def normalize_trace(t: dict) -> dict:
     }
 
 
+def enqueue(traces: List[TraceIn]) -> dict:
+    docs = [build_trace_doc(t.model_dump(exclude_none=True)) for t in traces]
+
+    try:
+        trace_buffer.submit(docs)
+    except BufferFull as e:
+        raise HTTPException(
+            status_code=503 if e.unavailable else 429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    return {"accepted": len(docs), "trace_ids": [d["trace_id"] for d in docs]}
+
+
 # -----------------------------
 # Routes
 # -----------------------------
+@router.post(":batch", status_code=202)
+def ingest_traces_batch(traces: List[TraceIn]):
+    """
+    Accept up to MAX_BATCH_SIZE traces. Writes happen asynchronously
+    through the in-process buffer; 429 / 503 + Retry-After when full.
+    """
+    if len(traces) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {MAX_BATCH_SIZE} traces)",
+        )
+    return enqueue(traces)
+
+
+@router.post("", status_code=202)
+def ingest_trace(trace: TraceIn):
+    """Single-trace fast path (same buffer, no list handling)."""
+    return enqueue([trace])
+
+
 @router.get("")
 def get_all_traces(
     session_id: str | None = Query(None),
@@ -65,6 +137,18 @@ def get_all_traces(
     limit: int = Query(200, ge=1, le=1000),
 ):
     try:
+        if session_id:
+            # ⚡ Single-partition read from the session index
+            refs = session_traces(session_index_container, session_id, newest_first=True)
+            if refs:
+                matched = [
+                    r for r in refs
+                    if (not user_id or r.get("user_id") == user_id)
+                    and (not model or r.get("model") == model)
+                ]
+                return scrub([normalize_trace(r) for r in matched[:limit]])
+            # not indexed yet: fall through to the fan-out query
+
         query = "SELECT * FROM c"
         parameters = []
         filters = []
@@ -119,7 +203,13 @@ def get_trace(trace_id: str):
         if not items:
             raise HTTPException(status_code=404, detail="Trace not found")
 
-        return scrub(normalize_trace(items[0]))
+        # list views keep previews; the detail view loads full text,
+        # including the (offloaded or chunked) retrieval context
+        full = hydrate_payloads(items[0])
+        detail = {**normalize_trace(full), "context": full.get("context")}
+        if full.get("payloads_missing"):
+            detail["payloads_missing"] = full["payloads_missing"]  # still previews
+        return scrub(detail)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
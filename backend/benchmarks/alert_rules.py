@@ -0,0 +1,143 @@
+"""
+Per-event throughput of the alert engine.
+
+Streams synthetic traces (one per ~50 ms of event time) through an
+AlertEngine holding `--rules` rules — p95 / avg latency over time
+windows and avg / max cost over count windows, spread across models
+and trace names — and compares it with a naive evaluator that re-reads
+each matching rule's window from the full event history on every event.
+Alerts go to an in-memory notifier; nothing touches Cosmos.
+
+    cd backend && python -m benchmarks.alert_rules --rules 50 --events 50000
+"""
+
+import argparse
+import bisect
+import math
+import random
+import time
+
+from shared.alerts import OPERATORS, AlertEngine, LogNotifier, validate_rule
+
+
+MODELS = ["gpt-4o", "gpt-4o-mini", "gpt-35-turbo", "o3-mini"]
+TRACE_NAMES = ["chat", "rag_answer", "summarize", "classify", "extract"]
+
+
+class QuietNotifier(LogNotifier):
+    def notify(self, event, alert):
+        self.sent.append((event, alert))
+
+
+def make_rules(n: int, rng: random.Random) -> list:
+    shapes = [
+        {"metric": "latency_ms", "aggregate": "p95", "op": ">", "threshold": 5000, "window_seconds": 300},
+        {"metric": "latency_ms", "aggregate": "avg", "op": ">", "threshold": 3000, "window_seconds": 60},
+        {"metric": "cost", "aggregate": "avg", "op": ">", "threshold": 0.02, "window_count": 100},
+        {"metric": "cost", "aggregate": "max", "op": ">", "threshold": 0.5, "window_count": 500},
+    ]
+    rules = []
+    for i in range(n):
+        filters = {"model": rng.choice(MODELS)}
+        if i % 2:
+            filters["trace_name"] = rng.choice(TRACE_NAMES)
+        rules.append(validate_rule({
+            **shapes[i % len(shapes)],
+            "name": f"rule {i}",
+            "filters": filters,
+            "cooldown_seconds": 600,
+            "created_at": "bench",
+        }))
+    return rules
+
+
+def make_events(n: int, rng: random.Random) -> list:
+    events, t0 = [], 1_760_000_000.0
+    for i in range(n):
+        ts = t0 + i * 0.05
+        incident = 0.4 * n <= i < 0.5 * n  # a slow, expensive stretch
+        latency = rng.lognormvariate(math.log(6000 if incident else 1200), 0.5)
+        events.append({
+            "_ts": ts,
+            "model": rng.choice(MODELS),
+            "trace_name": rng.choice(TRACE_NAMES),
+            "latency_ms": latency,
+            "cost": rng.uniform(0.001, 0.05 if incident else 0.015),
+        })
+    return events
+
+
+def run_engine(rules: list, events: list):
+    notifier = QuietNotifier(keep=100_000)
+    engine = AlertEngine("traces", load_rules=lambda: rules, notifier=notifier)
+    engine.refresh(force=True)
+
+    t0 = time.perf_counter()
+    for event in events:
+        engine.process(event)
+    return time.perf_counter() - t0, sum(1 for e, _ in notifier.sent if e == "firing")
+
+
+def run_rescan(rules: list, events: list):
+    """Same rules, but every matching rule re-derives its window each event."""
+    history = {r["id"]: [] for r in rules}
+    firing = {r["id"]: False for r in rules}
+    last_fired = {r["id"]: float("-inf") for r in rules}
+    fired = 0
+
+    t0 = time.perf_counter()
+    for event in events:
+        ts = event["_ts"]
+        for rule in rules:
+            if any(event.get(k) != v for k, v in rule["filters"].items()):
+                continue
+            values = history[rule["id"]]
+            values.append((ts, event[rule["metric"]]))
+            if rule["window_seconds"]:
+                start = bisect.bisect_right(values, (ts - rule["window_seconds"], math.inf))
+                window = [v for _, v in values[start:]]
+            else:
+                window = [v for _, v in values[-rule["window_count"]:]]
+            if len(window) < rule["min_samples"]:
+                continue
+
+            if rule["aggregate"] == "avg":
+                value = sum(window) / len(window)
+            elif rule["aggregate"] == "max":
+                value = max(window)
+            else:
+                ordered = sorted(window)
+                value = ordered[max(0, math.ceil(int(rule["aggregate"][1:]) / 100 * len(ordered)) - 1)]
+
+            breached = OPERATORS[rule["op"]](value, rule["threshold"])
+            if breached and not firing[rule["id"]] and ts - last_fired[rule["id"]] >= rule["cooldown_seconds"]:
+                firing[rule["id"]], last_fired[rule["id"]] = True, ts
+                fired += 1
+            elif not breached:
+                firing[rule["id"]] = False
+    return time.perf_counter() - t0, fired
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alert rule evaluation throughput")
+    parser.add_argument("--rules", type=int, default=50)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    rules = make_rules(args.rules, rng)
+    events = make_events(args.events, rng)
+
+    print(f"{args.rules} rules, {args.events} events")
+    print(f"{'mode':<12} {'events/s':>10} {'us/event':>9} {'alerts':>7}")
+    for mode, run in (("incremental", run_engine), ("rescan", run_rescan)):
+        elapsed, fired = run(rules, events)
+        print(
+            f"{mode:<12} {args.events / elapsed:>10.0f} "
+            f"{elapsed / args.events * 1e6:>9.1f} {fired:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Analytics latency benchmark over a synthetic Parquet archive.
+
+Writes N trace rows (archive layout: date=YYYY-MM-DD partitions, zstd,
+same columns as shared/archive.py incl. the wide `doc` column) spread
+over a year, then times the dashboard presets through
+services.analytics for a quarter and for a single week.
+
+    cd backend && python -m benchmarks.analytics_query --rows 20000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+import duckdb
+
+from services.analytics import NAMED_QUERIES, AnalyticsEngine
+
+
+def build_archive(root: str, rows: int, days: int):
+    path = os.path.join(root, "traces")
+    os.makedirs(path, exist_ok=True)
+    start = date.today() - timedelta(days=days - 1)
+    duckdb.execute(f"""
+        COPY (
+            SELECT
+                'trace-' || i AS id,
+                'trace-' || i AS trace_id,
+                'session-' || (hash(i) % 5000) AS session_id,
+                'user-' || lpad(CAST(hash(i * 7) % 500 AS VARCHAR), 4, '0') AS user_id,
+                ['simple-qa', 'rag-qa', 'summarize'][CAST(1 + hash(i * 3) % 3 AS BIGINT)] AS trace_name,
+                ['gpt-4o', 'gpt-4o-mini', 'llama-3.3-70b'][CAST(1 + hash(i * 5) % 3 AS BIGINT)] AS model,
+                TIMESTAMPTZ '{start}' + to_seconds(CAST(i * {days * 86400 // rows} AS BIGINT)) AS timestamp,
+                CAST(200 + hash(i * 11) % 7800 AS BIGINT) AS latency_ms,
+                CAST(200 + hash(i * 13) % 3300 AS BIGINT) AS tokens_in,
+                CAST(50 + hash(i * 17) % 1450 AS BIGINT) AS tokens_out,
+                CAST(250 + hash(i * 19) % 4750 AS BIGINT) AS tokens,
+                (hash(i * 23) % 100000) / 1e5 AS cost,
+                'Explain valve shutdown procedure' AS input,
+                'Isolate flow and relieve pressure before maintenance…' AS context,
+                'Isolate flow and relieve pressure.' AS output,
+                '{{"id":"trace-' || i || '","input":"Explain valve shutdown procedure"}}' AS doc,
+                CAST(TIMESTAMPTZ '{start}' + to_seconds(CAST(i * {days * 86400 // rows} AS BIGINT)) AS DATE) AS date
+            FROM range({rows}) t(i)
+        ) TO '{path}' (FORMAT parquet, PARTITION_BY (date), COMPRESSION zstd, OVERWRITE_OR_IGNORE)
+    """)
+
+
+def timed(engine, name, date_from, date_to, repeats=3):
+    best = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = engine.run_sql(NAMED_QUERIES[name], date_from, date_to)
+        elapsed = (time.perf_counter() - t0) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result["row_count"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive analytics benchmark")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as root:
+        t0 = time.perf_counter()
+        build_archive(root, args.rows, args.days)
+        print(f"archive: {args.rows:,} rows over {args.days} days "
+              f"(built in {time.perf_counter() - t0:.1f}s)\n")
+
+        engine = AnalyticsEngine(root)
+        today = date.today()
+        ranges = {
+            "year": (today - timedelta(days=args.days), today),
+            "quarter": (today - timedelta(days=90), today),
+            "week": (today - timedelta(days=7), today),
+        }
+
+        print(f"{'query':<32} " + " ".join(f"{label:>12}" for label in ranges))
+        for name in NAMED_QUERIES:
+            if name.startswith("scores_"):
+                continue  # no evaluations in the synthetic archive
+            cells = []
+            for date_from, date_to in ranges.values():
+                ms, _ = timed(engine, name, date_from, date_to)
+                cells.append(f"{ms:>9.0f} ms")
+            print(f"{name:<32} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
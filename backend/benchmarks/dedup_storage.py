@@ -0,0 +1,122 @@
+"""
+Storage / RU benchmark for payload offloading and chunk deduplication.
+
+Generates a synthetic RAG corpus with the load generator's trace factory
+(contexts built from the shared passage pool, Zipf sessions, mixed
+payload sizes, a few shared system prompts) and stores it three ways:
+
+  inline   full text in every trace document
+  offload  large fields moved to the blob store whole (one blob per trace)
+  chunked  context / system prompt split into content-addressed passages
+
+RU figures are estimates from document size (~1 RU per KB point read,
+~5.5 RU per KB write), not measurements.
+
+    cd backend && python -m benchmarks.dedup_storage --traces 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+
+from TraceGenerator.loadgen import TraceFactory, parse_mix
+from shared.blobstore import LocalBlobStore, hydrate_payloads, offload_payloads
+from shared.chunks import CHUNKED_FIELDS, chunks_field, manifest_field, trace_content_key
+
+
+SYSTEM_PROMPTS = [
+    ("You are the plant operations assistant. " * 40).strip(),
+    ("Answer strictly from the retrieved maintenance manuals. " * 30).strip(),
+    ("You are a safety officer. Refuse unsafe instructions. " * 30).strip(),
+]
+
+
+def read_ru(size: int) -> float:
+    return max(1.0, size / 1024)
+
+
+def write_ru(size: int) -> float:
+    return 5.5 * max(1.0, size / 1024)
+
+
+def make_corpus(n: int, payload_mix: str) -> list:
+    factory = TraceFactory(sessions=500, users=500, zipf=1.1, mix=parse_mix(payload_mix))
+    corpus = []
+    for _ in range(n):
+        doc = hydrate_payloads(factory())  # make_trace already offloads; start from raw
+        doc.pop("payload_refs", None)
+        for field in CHUNKED_FIELDS:
+            doc.pop(chunks_field(field), None)
+            doc.pop(manifest_field(field), None)
+        if random.random() < 0.6:
+            doc["system_prompt"] = random.choice(SYSTEM_PROMPTS)
+        corpus.append(doc)
+    return corpus
+
+
+def store_bytes(root: str) -> int:
+    total = 0
+    for dirpath, _, files in os.walk(root):
+        total += sum(os.path.getsize(os.path.join(dirpath, f)) for f in files)
+    return total
+
+
+def measure(label: str, corpus: list, mode: str) -> dict:
+    with tempfile.TemporaryDirectory() as root:
+        store = LocalBlobStore(root)
+        docs = []
+        for raw in corpus:
+            doc = dict(raw)
+            if mode != "inline":
+                offload_payloads(doc, store=store, chunk=(mode == "chunked"))
+            docs.append(doc)
+
+        sizes = [len(json.dumps(d).encode("utf-8")) for d in docs]
+        blobs = store_bytes(root)
+
+        # round trip must be lossless
+        sample = random.sample(range(len(docs)), min(200, len(docs)))
+        for i in sample:
+            full = hydrate_payloads(docs[i], store=store)
+            assert all(full.get(f) == corpus[i].get(f) for f in ("input", "context", "output", "system_prompt"))
+
+    return {
+        "label": label,
+        "docs_mb": sum(sizes) / 1e6,
+        "blobs_mb": blobs / 1e6,
+        "avg_doc_kb": sum(sizes) / len(sizes) / 1024,
+        "write_ru": sum(write_ru(s) for s in sizes),
+        "read_ru": sum(read_ru(s) for s in sizes),
+        "unique_content": len({trace_content_key(d) for d in docs}),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Payload dedup storage benchmark")
+    parser.add_argument("--traces", type=int, default=20000)
+    parser.add_argument("--payload-mix", default="small=0.5,medium=0.4,large=0.1")
+    args = parser.parse_args(argv)
+
+    corpus = make_corpus(args.traces, args.payload_mix)
+    results = [measure(mode, corpus, mode) for mode in ("inline", "offload", "chunked")]
+    base = results[0]
+
+    print(f"{args.traces} traces, payload mix {args.payload_mix}\n")
+    print(f"{'mode':<8} {'docs MB':>9} {'blobs MB':>9} {'total MB':>9} "
+          f"{'avg doc KB':>10} {'write RU':>11} {'read-all RU':>12}")
+    for r in results:
+        print(f"{r['label']:<8} {r['docs_mb']:>9.1f} {r['blobs_mb']:>9.1f} "
+              f"{r['docs_mb'] + r['blobs_mb']:>9.1f} {r['avg_doc_kb']:>10.2f} "
+              f"{r['write_ru']:>11,.0f} {r['read_ru']:>12,.0f}")
+
+    chunked = results[-1]
+    print(f"\nchunked vs inline: storage {1 - (chunked['docs_mb'] + chunked['blobs_mb']) / base['docs_mb']:.0%} smaller, "
+          f"write RU {1 - chunked['write_ru'] / base['write_ru']:.0%} lower")
+    print(f"distinct (question, context, answer) keys: {chunked['unique_content']} "
+          f"→ eval cache can skip {1 - chunked['unique_content'] / args.traces:.0%} of evaluations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Detection delay of shared.drift on synthetic shifted scores.
+
+Each trial draws `--pre` scores from N(mean, sd) clipped to [0, 1], then
+shifts the mean down by `shift` and counts scores until the detector
+reports a downward change point. Alarms before the shift are false
+alarms. A fixed-window z-test (last `--window` scores vs the warm-up
+mean, 3 sigma) runs on the same data for comparison.
+
+    cd backend && python -m benchmarks.drift_delay --trials 200
+"""
+
+import argparse
+import json
+import math
+import random
+import statistics
+import time
+from collections import deque
+
+from shared import drift
+
+
+class WindowTest:
+    """Baseline: mean of the last `window` scores vs the warm-up mean."""
+
+    def __init__(self, window: int):
+        self.window = deque(maxlen=window)
+        self.reference = None
+        self.sigma = None
+
+    def update(self, score: float):
+        self.window.append(score)
+        if len(self.window) < self.window.maxlen:
+            return None
+        if self.reference is None:
+            self.reference = statistics.fmean(self.window)
+            self.sigma = max(statistics.stdev(self.window), drift.MIN_SIGMA)
+            return None
+        mean = statistics.fmean(self.window)
+        if abs(mean - self.reference) > 3 * self.sigma / math.sqrt(len(self.window)):
+            direction = "down" if mean < self.reference else "up"
+            self.window.clear()
+            self.reference = None
+            return {"direction": direction}
+        return None
+
+
+def trial(make, args, shift: float, rng: random.Random):
+    detector = make()
+    clip = lambda x: min(1.0, max(0.0, x))
+    false_alarms = 0
+    for _ in range(args.pre):
+        if detector.update(clip(rng.gauss(args.mean, args.sd))):
+            false_alarms += 1
+    for i in range(args.post):
+        change = detector.update(clip(rng.gauss(args.mean - shift, args.sd)))
+        if change and change["direction"] == "down":
+            return false_alarms, i + 1
+    return false_alarms, None
+
+
+def run(name: str, make, args, shift: float) -> dict:
+    rng = random.Random(f"{args.seed}:{shift}")  # same data for every detector
+    results = [trial(make, args, shift, rng) for _ in range(args.trials)]
+    delays = sorted(d for _, d in results if d is not None)
+    return {
+        "detector": name,
+        "shift_sd": round(shift / args.sd, 2),
+        "detected": f"{len(delays)}/{args.trials}",
+        "median_delay": statistics.median(delays) if delays else None,
+        "p90_delay": delays[int(0.9 * (len(delays) - 1))] if delays else None,
+        "false_alarms_per_10k": round(
+            sum(f for f, _ in results) / (args.trials * args.pre) * 10000, 2
+        ),
+    }
+
+
+def update_cost(n: int = 200_000) -> dict:
+    detector = drift.ScoreDrift()
+    scores = [random.random() for _ in range(n)]
+    t0 = time.perf_counter()
+    for s in scores:
+        detector.update(s)
+    elapsed = time.perf_counter() - t0
+    return {
+        "us_per_update": round(elapsed / n * 1e6, 2),
+        "state_bytes": len(json.dumps(detector.to_state())),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drift detection delay benchmark")
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--pre", type=int, default=2000)
+    parser.add_argument("--post", type=int, default=1000)
+    parser.add_argument("--mean", type=float, default=0.8)
+    parser.add_argument("--sd", type=float, default=0.1)
+    parser.add_argument("--window", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    detectors = {
+        "page_hinkley": drift.ScoreDrift,
+        f"window_{args.window}": lambda: WindowTest(args.window),
+    }
+
+    print(f"{'detector':<14} {'shift':>6} {'found':>9} {'median':>7} {'p90':>6} {'FA/10k':>7}")
+    for shift in (0.25 * args.sd, 0.5 * args.sd, args.sd, 2 * args.sd):
+        for name, make in detectors.items():
+            r = run(name, make, args, shift)
+            print(
+                f"{r['detector']:<14} {r['shift_sd']:>5}σ {r['detected']:>9} "
+                f"{r['median_delay'] if r['median_delay'] is not None else '-':>7} "
+                f"{r['p90_delay'] if r['p90_delay'] is not None else '-':>6} "
+                f"{r['false_alarms_per_10k']:>7}"
+            )
+
+    print("update:", update_cost())
+
+
+if __name__ == "__main__":
+    main()
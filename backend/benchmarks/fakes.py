@@ -0,0 +1,163 @@
+"""
+In-memory stand-ins for the Cosmos container client used by benchmarks.
+
+Only the calls the backend makes on the hot paths are supported
+(point reads/writes with ETag checks). Exceptions are the real
+azure.cosmos ones so production error handling is exercised.
+"""
+
+import copy
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+
+from azure.core import MatchConditions
+from azure.cosmos import exceptions
+
+
+class InMemoryContainer:
+    """
+    Dict-backed container with optional simulated round-trip latency
+    (`latency_ms`, lognormal jitter around it) and per-operation counters.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self._items = {}
+        self._lock = threading.Lock()
+        self.latency_ms = latency_ms
+        self.ops = Counter()
+
+    def _rtt(self, op: str):
+        self.ops[op] += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms * random.lognormvariate(0, 0.25) / 1000)
+
+    def _stamp(self, body: dict) -> dict:
+        doc = copy.deepcopy(body)
+        doc["_etag"] = uuid.uuid4().hex
+        doc["_ts"] = int(time.time())
+        return doc
+
+    def __len__(self):
+        return len(self._items)
+
+    def items(self) -> list:
+        with self._lock:
+            return [copy.deepcopy(d) for d in self._items.values()]
+
+    def read_item(self, item, partition_key=None, **kwargs):
+        self._rtt("read")
+        with self._lock:
+            if item not in self._items:
+                raise exceptions.CosmosResourceNotFoundError(
+                    status_code=404, message=f"{item} not found"
+                )
+            return copy.deepcopy(self._items[item])
+
+    def create_item(self, body, **kwargs):
+        self._rtt("create")
+        with self._lock:
+            if body["id"] in self._items:
+                raise exceptions.CosmosResourceExistsError(
+                    status_code=409, message=f"{body['id']} exists"
+                )
+            self._items[body["id"]] = self._stamp(body)
+            return copy.deepcopy(self._items[body["id"]])
+
+    def upsert_item(self, body, **kwargs):
+        self._rtt("upsert")
+        with self._lock:
+            self._items[body["id"]] = self._stamp(body)
+            return copy.deepcopy(self._items[body["id"]])
+
+    def replace_item(self, item, body, etag=None, match_condition=None, **kwargs):
+        self._rtt("replace")
+        with self._lock:
+            current = self._items.get(item)
+            if current is None:
+                raise exceptions.CosmosResourceNotFoundError(
+                    status_code=404, message=f"{item} not found"
+                )
+            if (
+                match_condition == MatchConditions.IfNotModified
+                and current["_etag"] != etag
+            ):
+                raise exceptions.CosmosAccessConditionFailedError(
+                    status_code=412, message="ETag mismatch"
+                )
+            self._items[item] = self._stamp(body)
+            return copy.deepcopy(self._items[item])
+
+    def delete_item(self, item, partition_key=None, **kwargs):
+        self._rtt("delete")
+        with self._lock:
+            if self._items.pop(item, None) is None:
+                raise exceptions.CosmosResourceNotFoundError(
+                    status_code=404, message=f"{item} not found"
+                )
+
+
+class InMemoryPromptRegistry:
+    """
+    Stand-in for the mlflow.genai prompt registry calls PromptService
+    makes, with simulated round-trip latency. `install()` patches them
+    onto the mlflow.genai module.
+    """
+
+    class _Obj:
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+
+    def __init__(self, latency_ms: float = 0.0):
+        self._prompts = {}  # name -> [(template, tags)]
+        self._aliases = {}  # name -> {alias: version}
+        self.latency_ms = latency_ms
+        self.ops = Counter()
+
+    def _rtt(self, op: str):
+        self.ops[op] += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms * random.lognormvariate(0, 0.25) / 1000)
+
+    def install(self):
+        import mlflow
+
+        for name in ("search_prompts", "load_prompt", "register_prompt", "set_prompt_alias"):
+            setattr(mlflow.genai, name, getattr(self, name))
+        return self
+
+    def search_prompts(self, filter_string=None, **kwargs):
+        self._rtt("search")
+        return [
+            self._Obj(name=name, latest_version=len(versions), tags={},
+                      aliases=dict(self._aliases.get(name, {})),
+                      description="", creation_timestamp=None)
+            for name, versions in self._prompts.items()
+            if not filter_string or f"'{name}'" in filter_string
+        ]
+
+    def load_prompt(self, uri, **kwargs):
+        self._rtt("load")
+        ref = uri[len("prompts:/"):]
+        if "@" in ref:
+            name, alias = ref.split("@", 1)
+            version = self._aliases.get(name, {}).get(alias)
+        else:
+            name, version = ref.rsplit("/", 1)
+            version = int(version)
+        versions = self._prompts.get(name, [])
+        if not version or not 1 <= version <= len(versions):
+            raise KeyError(f"{uri} not found")
+        template, tags = versions[version - 1]
+        return self._Obj(name=name, version=version, template=template, tags=dict(tags))
+
+    def register_prompt(self, name, template, tags=None, **kwargs):
+        self._rtt("register")
+        self._prompts.setdefault(name, []).append((template, dict(tags or {})))
+        return self._Obj(name=name, version=len(self._prompts[name]))
+
+    def set_prompt_alias(self, name, alias, version, **kwargs):
+        self._rtt("alias")
+        self._aliases.setdefault(name, {})[alias] = int(version)
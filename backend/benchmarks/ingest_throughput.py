@@ -0,0 +1,101 @@
+"""
+Ingestion throughput benchmark for the trace write buffer.
+
+Producers push batches into services.ingest.TraceWriteBuffer as fast as
+they can (backing off on BufferFull like an HTTP client honouring
+Retry-After). Writes go to an in-memory container with simulated Cosmos
+latency. A sequential one-write-per-trace baseline is shown for contrast.
+
+    cd backend && python -m benchmarks.ingest_throughput --traces 50000 --latency-ms 6
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.fakes import InMemoryContainer
+from services.ingest import BufferFull, TraceWriteBuffer, build_trace_doc
+
+
+def make_batch(n: int) -> list:
+    return [
+        build_trace_doc({
+            "session_id": f"session-{random.randint(1, 500)}",
+            "trace_name": "simple-qa",
+            "input": "Explain valve shutdown procedure",
+            "output": "Isolate flow and relieve pressure.",
+            "model": "gpt-4o-mini",
+            "latency_ms": random.randint(200, 4000),
+            "tokens_in": random.randint(200, 3500),
+            "tokens_out": random.randint(50, 1500),
+        })
+        for _ in range(n)
+    ]
+
+
+def buffered(args) -> dict:
+    container = InMemoryContainer(latency_ms=args.latency_ms)
+    buffer = TraceWriteBuffer(container, capacity=args.capacity, workers=args.workers)
+    per_producer = args.traces // args.producers
+    throttled = [0]
+
+    def produce():
+        sent = 0
+        while sent < per_producer:
+            batch = make_batch(min(args.batch_size, per_producer - sent))
+            try:
+                buffer.submit(batch)
+                sent += len(batch)
+            except BufferFull as e:
+                throttled[0] += 1
+                time.sleep(min(e.retry_after, 1) / 20)  # scaled-down Retry-After
+
+    t0 = time.perf_counter()
+    producers = [threading.Thread(target=produce) for _ in range(args.producers)]
+    for p in producers:
+        p.start()
+    for p in producers:
+        p.join()
+    accepted_at = time.perf_counter() - t0
+    buffer.flush(timeout=600)
+    written_at = time.perf_counter() - t0
+    buffer.close()
+
+    return {
+        "written": len(container),
+        "accept_rate": len(container) / accepted_at,
+        "write_rate": len(container) / written_at,
+        "throttled": throttled[0],
+        **{k: v for k, v in buffer.stats().items() if k == "write_p95_ms"},
+    }
+
+
+def sequential(args, n: int) -> float:
+    container = InMemoryContainer(latency_ms=args.latency_ms)
+    docs = make_batch(n)
+    t0 = time.perf_counter()
+    for doc in docs:
+        container.create_item(doc)
+    return n / (time.perf_counter() - t0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trace ingestion benchmark")
+    parser.add_argument("--traces", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--capacity", type=int, default=20000)
+    parser.add_argument("--latency-ms", type=float, default=6.0)
+    args = parser.parse_args(argv)
+
+    result = buffered(args)
+    print(f"buffered:   {result['write_rate']:>10,.0f} traces/s written "
+          f"({result['accept_rate']:,.0f}/s accepted, {result['throttled']} throttled "
+          f"responses, write p95 {result['write_p95_ms']} ms)")
+    print(f"sequential: {sequential(args, 500):>10,.0f} traces/s (one create_item per request)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Tail-latency benchmark for hedged LLM calls against a local mock.
+
+The mock answers in ~150 ms (lognormal) but a share of calls hang for
+several seconds, like a stuck Azure OpenAI request. The same workload
+runs with hedging off and on through shared.llm.hedged_call.
+
+    cd backend && python -m benchmarks.llm_hedging --calls 400 --slow-rate 0.04
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from shared import llm
+from shared.stats import percentile
+
+
+def mock_llm(slow_rate: float, slow_seconds: float):
+    def attempt(timeout_s):
+        latency = random.lognormvariate(-1.9, 0.35)  # median ~150 ms
+        if random.random() < slow_rate:
+            latency = slow_seconds
+        if latency > timeout_s:
+            time.sleep(timeout_s)
+            raise TimeoutError("mock read timeout")
+        time.sleep(latency)
+        return "ok", {}
+    return attempt
+
+
+def run(key: str, hedge: bool, args) -> list:
+    attempt = mock_llm(args.slow_rate, args.slow_seconds)
+
+    def one(_):
+        t0 = time.monotonic()
+        try:
+            llm.hedged_call(attempt, key=key, deadline_s=args.deadline, hedge=hedge)
+        except TimeoutError:
+            pass
+        return (time.monotonic() - t0) * 1000
+
+    # warm the latency window so p95 is known before measuring
+    for _ in range(llm.HEDGE_MIN_SAMPLES):
+        one(None)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        return list(pool.map(one, range(args.calls)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hedged LLM call benchmark")
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--slow-rate", type=float, default=0.04)
+    parser.add_argument("--slow-seconds", type=float, default=3.0)
+    parser.add_argument("--deadline", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    llm.MAX_WORKERS = max(llm.MAX_WORKERS, args.concurrency * 2)
+
+    print(f"{'mode':<10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for mode, hedge in (("baseline", False), ("hedged", True)):
+        latencies = run(f"bench-{mode}", hedge, args)
+        print(
+            f"{mode:<10} "
+            f"{percentile(latencies, 50):>8.0f} "
+            f"{percentile(latencies, 95):>8.0f} "
+            f"{percentile(latencies, 99):>8.0f} "
+            f"{max(latencies):>8.0f}"
+        )
+
+    print("hedges:", {k: v for k, v in llm.hedge_stats().items() if k.startswith("bench-")})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+OTLP decode throughput benchmark.
+
+Builds an ExportTraceServiceRequest with GenAI spans (plus non-GenAI
+parent spans, which are dropped) and times services.otlp.decode_export
+for JSON and — when opentelemetry-proto is installed — protobuf, each
+with and without gzip.
+
+    cd backend && python -m benchmarks.otlp_decode --spans 20000 --batch 512
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import time
+
+from services.otlp import JSON, PROTOBUF, ExportTraceServiceRequest, decode_export
+
+
+MODELS = ["gpt-4o", "gpt-4o-mini", "gpt-35-turbo"]
+
+
+def _attr(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": value}}
+
+
+def make_request(spans: int, genai_share: float = 0.5) -> dict:
+    now = time.time_ns()
+    out = []
+    for i in range(spans):
+        start = now + i * 1_000_000
+        attrs = [_attr("http.route", "/chat")]
+        if random.random() < genai_share:
+            attrs = [
+                _attr("gen_ai.operation.name", "chat"),
+                _attr("gen_ai.request.model", random.choice(MODELS)),
+                _attr("gen_ai.usage.input_tokens", random.randint(200, 3500)),
+                _attr("gen_ai.usage.output_tokens", random.randint(50, 1500)),
+                _attr("session.id", f"session-{random.randint(1, 500)}"),
+                _attr("user.id", f"user-{random.randint(1, 500):04d}"),
+                _attr("gen_ai.prompt", "Explain valve shutdown procedure"),
+                _attr("gen_ai.completion", "Isolate flow and relieve pressure."),
+            ]
+        out.append({
+            "traceId": os.urandom(16).hex(),
+            "spanId": os.urandom(8).hex(),
+            "name": "chat gpt-4o",
+            "kind": 3,
+            "startTimeUnixNano": str(start),
+            "endTimeUnixNano": str(start + random.randint(200, 4000) * 1_000_000),
+            "attributes": attrs,
+        })
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_attr("service.name", "factory-assistant")]},
+            "scopeSpans": [{"scope": {"name": "openai-instrumentation"}, "spans": out}],
+        }]
+    }
+
+
+def to_protobuf(payload: dict) -> bytes:
+    from google.protobuf.json_format import ParseDict
+    return ParseDict(payload, ExportTraceServiceRequest()).SerializeToString()
+
+
+def bench(label, bodies, content_type, encoding, total_spans):
+    size = sum(len(b) for b in bodies)
+    t0 = time.perf_counter()
+    mapped = 0
+    for body in bodies:
+        traces, _ = decode_export(body, content_type, encoding)
+        mapped += len(traces)
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<16} {total_spans / elapsed:>10,.0f} spans/s  "
+          f"{size / elapsed / 1e6:>7.1f} MB/s wire  "
+          f"{size / 1e6:>6.1f} MB  ({mapped} traces)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OTLP decode benchmark")
+    parser.add_argument("--spans", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=512, help="spans per export request")
+    args = parser.parse_args(argv)
+
+    requests = [
+        make_request(min(args.batch, args.spans - i))
+        for i in range(0, args.spans, args.batch)
+    ]
+
+    json_bodies = [json.dumps(r).encode() for r in requests]
+    bench("json", json_bodies, JSON, None, args.spans)
+    bench("json+gzip", [gzip.compress(b) for b in json_bodies], JSON, "gzip", args.spans)
+
+    if ExportTraceServiceRequest is None:
+        print("protobuf         skipped (opentelemetry-proto not installed)")
+        return
+
+    pb_bodies = [to_protobuf(r) for r in requests]
+    bench("protobuf", pb_bodies, PROTOBUF, None, args.spans)
+    bench("protobuf+gzip", [gzip.compress(b) for b in pb_bodies], PROTOBUF, "gzip", args.spans)
+
+
+if __name__ == "__main__":
+    main()
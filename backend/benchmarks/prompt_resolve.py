@@ -0,0 +1,91 @@
+"""
+Prompt resolve / render latency benchmark.
+
+Fills an in-memory prompt registry (simulated MLflow round trips), then
+compares what an application had to do before — get_prompt_by_name and
+substituting variables itself — with PromptService.resolve / render,
+which serve the production alias from compiled, cached templates.
+
+    cd backend && python -m benchmarks.prompt_resolve --prompts 200 --latency-ms 40
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.fakes import InMemoryPromptRegistry
+from services.prompts import VARIABLE_PATTERN, PromptService
+from shared.stats import percentile
+
+
+TEMPLATE = (
+    "You are a maintenance assistant for {{plant}}.\n"
+    "Answer the operator's question using only the context.\n"
+    "Context: {{context}}\nQuestion: {{question}}\n"
+)
+VARIABLES = {"plant": "Plant 7", "context": "Valve V-12 is isolated.", "question": "Is V-12 safe?"}
+
+
+def build_registry(registry, prompts: int, versions: int):
+    for i in range(prompts):
+        for v in range(versions):
+            registry.register_prompt(f"prompt-{i}", TEMPLATE + f"# rev {v}\n", {"model": "gpt-4o"})
+        registry.set_prompt_alias(f"prompt-{i}", "production", random.randint(1, versions))
+    registry.ops.clear()
+
+
+def old_path(service, name):
+    prompt = service.get_prompt_by_name(name)
+    return VARIABLE_PATTERN.sub(lambda m: VARIABLES[m.group(1)], prompt["content"])
+
+
+def new_path(service, name):
+    return service.render(name, VARIABLES)[1]
+
+
+def measure(fn, service, names, calls):
+    samples = []
+    for _ in range(calls):
+        name = random.choice(names)
+        t0 = time.perf_counter()
+        fn(service, name)
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prompt resolve / render benchmark")
+    parser.add_argument("--prompts", type=int, default=200)
+    parser.add_argument("--versions", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--calls", type=int, default=50, help="calls on the old path")
+    parser.add_argument("--hot-calls", type=int, default=100000, help="calls on the cached path")
+    args = parser.parse_args(argv)
+
+    registry = InMemoryPromptRegistry(latency_ms=0).install()
+    build_registry(registry, args.prompts, args.versions)
+    registry.latency_ms = args.latency_ms
+    names = [f"prompt-{i}" for i in range(args.prompts)]
+
+    print(f"{'path':<22} {'p50 us':>10} {'p99 us':>10} {'mlflow calls/req':>17}")
+    for label, fn, calls, warm in (
+        ("get_prompt_by_name", old_path, args.calls, False),
+        ("render (cached)", new_path, args.hot_calls, True),
+    ):
+        service = PromptService()
+        if warm:
+            for name in names:
+                service.resolve(name)
+        registry.ops.clear()
+
+        samples = measure(fn, service, names, calls)
+        print(
+            f"{label:<22} "
+            f"{percentile(samples, 50):>10.1f} "
+            f"{percentile(samples, 99):>10.1f} "
+            f"{sum(registry.ops.values()) / calls:>17.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Cold-start import benchmark for the API and each Azure Function.
+
+Each module is imported in a fresh interpreter so nothing is shared
+between runs. Also reports how many Key Vault secrets were fetched at
+import time (should be 0 now that secrets / clients are lazy).
+
+    cd backend && python -m benchmarks.startup --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+MODULES = [
+    "app.main",
+    "TraceGenerator",
+    "EvaluatorRunner",
+    "EvaluatorRetry",
+    "Aggregator",
+]
+
+_PROBE = """
+import importlib, json, sys, time
+t0 = time.perf_counter()
+importlib.import_module(sys.argv[1])
+elapsed = (time.perf_counter() - t0) * 1000
+from shared import secrets
+print(json.dumps({"ms": elapsed, "secrets": len(secrets._cache)}))
+"""
+
+
+def measure(module: str) -> dict:
+    env = {
+        **os.environ,
+        # app.main mixes `app.routers.*` and `routers.*` imports
+        "PYTHONPATH": os.pathsep.join([str(BACKEND), str(BACKEND / "app")]),
+    }
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE, module],
+        cwd=BACKEND,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args(argv)
+
+    print(f"{'module':<18} {'median ms':>10} {'min ms':>8} {'secrets':>8}")
+    for module in args.modules:
+        runs = [measure(module) for _ in range(args.repeat)]
+        errors = [r["error"] for r in runs if "error" in r]
+        if errors:
+            print(f"{module:<18} failed: {errors[0]}")
+            continue
+
+        times = [r["ms"] for r in runs]
+        print(
+            f"{module:<18} {statistics.median(times):>10.1f} "
+            f"{min(times):>8.1f} {runs[0]['secrets']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
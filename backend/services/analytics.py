@@ -0,0 +1,253 @@
+"""
+Analytics Service
+Ad-hoc SQL over the Parquet cold archive (shared/archive.py) with an
+embedded DuckDB engine — no Cosmos involved.
+
+Queries see two views, `traces` and `evaluations`, each with a `date`
+column taken from the hive-style `date=YYYY-MM-DD` directories. The
+request's from/to range is applied inside the views, so DuckDB prunes
+whole partitions before opening files; column selection and WHERE
+clauses are pushed down into the Parquet scan (row-group min/max
+statistics), and the wide `doc` column is never read unless selected.
+
+Only a single SELECT statement is accepted (checked by DuckDB's own
+parser). The connection itself is the security boundary: external
+access is disabled except for the archive directory, extensions are
+never installed or loaded on demand, and the configuration is locked
+before any user SQL runs, so file / URL literals and table functions
+outside the archive fail with a permission error. The function denylist
+below only gives friendlier errors. Needs the `duckdb` package.
+"""
+
+import os
+import re
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from shared.archive import ARCHIVE_PATH, DATASETS
+
+
+MAX_ROWS = 10000
+RESULT_TTL_SECONDS = 60
+DEFAULT_RANGE_DAYS = 90
+QUERY_THREADS = int(os.getenv("ANALYTICS_THREADS", "4"))
+PARTITION_DIR = re.compile(r"^date=\d{4}-\d{2}-\d{2}$")
+
+# friendlier errors for calls the locked connection would refuse anyway
+FORBIDDEN = re.compile(
+    r"\b(read_\w+|\w+_scan|parquet_\w+|glob|getenv|current_setting|"
+    r"duckdb_\w+|sniff_\w+|query_table|query|which_secret)\s*\(",
+    re.IGNORECASE,
+)
+
+
+class QueryRejected(ValueError):
+    """The SQL is not a single read-only SELECT over the archive views."""
+
+
+# =====================================================
+# Named queries (dashboard presets)
+# =====================================================
+
+NAMED_QUERIES = {
+    "p95_latency_by_model_per_day": """
+        SELECT date, model,
+               quantile_cont(latency_ms, 0.95) AS p95_latency_ms,
+               count(*) AS traces
+        FROM traces
+        GROUP BY date, model
+        ORDER BY date, model
+    """,
+    "cost_by_user": """
+        SELECT user_id,
+               round(sum(cost), 4) AS total_cost,
+               count(*) AS traces,
+               sum(tokens) AS tokens
+        FROM traces
+        GROUP BY user_id
+        ORDER BY total_cost DESC
+    """,
+    "tokens_by_model_per_day": """
+        SELECT date, model,
+               sum(tokens_in) AS tokens_in,
+               sum(tokens_out) AS tokens_out
+        FROM traces
+        GROUP BY date, model
+        ORDER BY date, model
+    """,
+    "scores_by_evaluator_per_day": """
+        SELECT date, evaluator_name,
+               avg(score) AS avg_score,
+               count(*) FILTER (WHERE status = 'failed') AS failed,
+               count(*) AS evaluations
+        FROM evaluations
+        GROUP BY date, evaluator_name
+        ORDER BY date, evaluator_name
+    """,
+}
+
+
+def check_sql(sql: str) -> str:
+    """Light pre-check; the statement type is verified by DuckDB itself."""
+    stripped = sql.strip().rstrip(";").strip()
+    if not stripped:
+        raise QueryRejected("Empty query")
+    if ";" in stripped:
+        raise QueryRejected("Only a single statement is allowed")
+    if not re.match(r"^(select|with)\b", stripped, re.IGNORECASE):
+        raise QueryRejected("Only SELECT / WITH queries are allowed")
+    match = FORBIDDEN.search(stripped)
+    if match:
+        raise QueryRejected(f"'{match.group(1)}' is not allowed in analytics queries")
+    return stripped
+
+
+class AnalyticsEngine:
+    def __init__(self, root: str = ARCHIVE_PATH):
+        self.root = root
+        self._local = threading.local()
+        self._results = {}
+        self._results_lock = threading.Lock()
+
+    # -------------------------------------------------
+    # Connection (one per thread; DuckDB connections are not shared)
+    # -------------------------------------------------
+    def _connection(self):
+        con = getattr(self._local, "con", None)
+        if con is None:
+            try:
+                import duckdb
+            except ImportError:
+                raise RuntimeError("Analytics needs the 'duckdb' package")
+            os.makedirs(self.root, exist_ok=True)
+            archive_dir = os.path.join(os.path.realpath(self.root), "").replace("'", "''")
+
+            con = duckdb.connect(database=":memory:")
+            # order matters: allowed_directories can't change once access is off
+            for setting in (
+                f"SET threads = {QUERY_THREADS}",
+                f"SET allowed_directories = ['{archive_dir}']",
+                "SET autoinstall_known_extensions = false",
+                "SET autoload_known_extensions = false",
+                "SET enable_external_access = false",
+                "SET lock_configuration = true",
+            ):
+                con.execute(setting)
+            self._local.con = con
+        return con
+
+    def _define_views(self, con, date_from: date, date_to: date):
+        for dataset in DATASETS:
+            # only date=YYYY-MM-DD directories, so `date` is always typed DATE
+            path = os.path.join(
+                os.path.realpath(self.root), dataset, "date=????-??-??", "*.parquet"
+            ).replace("'", "''")
+            if not _partitions(self.root, dataset):
+                # empty archive: keep the schema so queries still bind
+                columns = ", ".join(
+                    f"NULL::{_SQL_TYPES[kind]} AS {name}"
+                    for name, kind in DATASETS[dataset]["columns"].items()
+                )
+                con.execute(
+                    f"CREATE OR REPLACE TEMP VIEW {dataset} AS "
+                    f"SELECT {columns}, NULL::VARCHAR AS doc, NULL::DATE AS date LIMIT 0"
+                )
+                continue
+
+            con.execute(
+                f"CREATE OR REPLACE TEMP VIEW {dataset} AS "
+                f"SELECT * FROM read_parquet('{path}', hive_partitioning = true, union_by_name = true) "
+                f"WHERE date BETWEEN DATE '{date_from.isoformat()}' AND DATE '{date_to.isoformat()}'"
+            )
+
+    # -------------------------------------------------
+    # Queries
+    # -------------------------------------------------
+    def run_sql(
+        self,
+        sql: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        limit: int = MAX_ROWS,
+    ) -> Dict:
+        sql = check_sql(sql)
+        date_to = date_to or date.today()
+        date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS)
+        limit = max(1, min(limit, MAX_ROWS))
+
+        con = self._connection()
+
+        statements = con.extract_statements(sql)
+        if len(statements) != 1 or statements[0].type.name != "SELECT":
+            raise QueryRejected("Only a single SELECT statement is allowed")
+
+        started = time.perf_counter()
+        self._define_views(con, date_from, date_to)
+        cursor = con.execute(f"SELECT * FROM ({sql}) AS q LIMIT {limit + 1}")
+        columns = [d[0] for d in cursor.description]
+        rows = cursor.fetchall()
+
+        return {
+            "columns": columns,
+            "rows": [[_jsonable(v) for v in row] for row in rows[:limit]],
+            "row_count": min(len(rows), limit),
+            "truncated": len(rows) > limit,
+            "from": date_from.isoformat(),
+            "to": date_to.isoformat(),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def run_named(
+        self,
+        name: str,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        limit: int = MAX_ROWS,
+    ) -> Dict:
+        """Preset query; results are cached briefly for dashboard polling."""
+        if name not in NAMED_QUERIES:
+            raise KeyError(name)
+
+        key = (name, date_from, date_to, limit)
+        now = time.monotonic()
+        with self._results_lock:
+            cached = self._results.get(key)
+            if cached and now - cached[0] < RESULT_TTL_SECONDS:
+                return {**cached[1], "cached": True}
+
+        result = self.run_sql(NAMED_QUERIES[name], date_from, date_to, limit)
+        with self._results_lock:
+            self._results[key] = (now, result)
+        return {**result, "cached": False}
+
+
+_SQL_TYPES = {
+    "string": "VARCHAR",
+    "int64": "BIGINT",
+    "float64": "DOUBLE",
+    "timestamp": "TIMESTAMPTZ",
+}
+
+
+def _partitions(root: str, dataset: str) -> List[str]:
+    base = os.path.join(root, dataset)
+    if not os.path.isdir(base):
+        return []
+    return [d for d in os.listdir(base) if PARTITION_DIR.match(d)]
+
+
+def _jsonable(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (int, float, str, bool)) or value is None:
+        return value
+    return str(value)
+
+
+# Singleton instance
+analytics_engine = AnalyticsEngine()
@@ -0,0 +1,202 @@
+"""
+Trace Ingestion Service
+In-process write buffer between the ingestion API and Cosmos DB.
+
+Requests only enqueue; a pool of writer threads drains the queue with
+concurrent create_item calls (create, not upsert, so the EvaluatorRunner
+change feed still fires). When the buffer is full, or Cosmos keeps
+failing, submit() raises BufferFull so the API can answer 429 / 503 with
+a Retry-After hint instead of piling up memory.
+"""
+
+import logging
+import math
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from azure.cosmos import exceptions
+
+from shared.blobstore import offload_payloads
+from shared.cosmos import traces_container
+from shared.ids import new_ulid
+from shared.stats import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+
+BUFFER_CAPACITY = 20000
+WRITER_THREADS = 32
+MAX_WRITE_RETRIES = 3
+UNHEALTHY_AFTER_FAILURES = 50
+UNHEALTHY_COOLDOWN_SECONDS = 5
+
+
+class BufferFull(Exception):
+    """Raised when the buffer cannot take more traces right now."""
+
+    def __init__(self, retry_after: int, unavailable: bool = False):
+        super().__init__("Trace write buffer unavailable" if unavailable else "Trace write buffer full")
+        self.retry_after = retry_after
+        self.unavailable = unavailable
+
+
+def build_trace_doc(data: Dict) -> Dict:
+    """
+    Turn an ingested trace into the document shape TraceGenerator writes.
+    Missing ids get a time-ordered ULID; missing timestamps get now().
+    """
+    trace_id = data.get("trace_id") or f"trace-{new_ulid()}"
+    tokens_in = data.get("tokens_in") or 0
+    tokens_out = data.get("tokens_out") or 0
+
+    doc = {k: v for k, v in data.items() if v is not None}
+    doc.update({
+        "id": trace_id,
+        "partitionKey": trace_id,
+        "trace_id": trace_id,
+        "timestamp": data.get("timestamp") or datetime.now(timezone.utc).isoformat(),
+        "tokens_in": tokens_in,
+        "tokens_out": tokens_out,
+        "tokens": data.get("tokens") or tokens_in + tokens_out,
+    })
+    return doc
+
+
+class TraceWriteBuffer:
+    """Bounded queue + writer pool for trace documents."""
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        container=None,
+        capacity: int = BUFFER_CAPACITY,
+        workers: int = WRITER_THREADS,
+    ):
+        self._container = container if container is not None else traces_container
+        self._capacity = capacity
+        self._workers = workers
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = 0  # queued + in flight
+        self._threads: List[threading.Thread] = []
+        self._consecutive_failures = 0
+        self._unhealthy_until = 0.0
+        self._write_latency = LatencyWindow(size=1000)
+        self.counters = {"accepted": 0, "written": 0, "failed": 0, "rejected": 0}
+
+    # -------------------------------------------------
+    # Producer side
+    # -------------------------------------------------
+    def submit(self, docs: List[Dict]):
+        self._ensure_started()
+
+        with self._lock:
+            if time.monotonic() < self._unhealthy_until:
+                self.counters["rejected"] += len(docs)
+                raise BufferFull(UNHEALTHY_COOLDOWN_SECONDS, unavailable=True)
+
+            if self._pending + len(docs) > self._capacity:
+                self.counters["rejected"] += len(docs)
+                raise BufferFull(self._retry_after())
+
+            self._pending += len(docs)
+            self.counters["accepted"] += len(docs)
+
+        for doc in docs:
+            self._queue.put(doc)
+
+    def _retry_after(self) -> int:
+        """Seconds until the current backlog should have drained."""
+        median = self._write_latency.percentile(50) or 0.05
+        rate = self._workers / median  # docs/s
+        return max(1, min(30, math.ceil(self._pending / rate)))
+
+    def depth(self) -> int:
+        return self._pending
+
+    def stats(self) -> Dict:
+        p95 = self._write_latency.percentile(95)
+        return {
+            **self.counters,
+            "depth": self._pending,
+            "capacity": self._capacity,
+            "write_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until everything accepted so far is written (or failed)."""
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self._pending == 0
+
+    def close(self, timeout: float = 10.0):
+        self.flush(timeout)
+        for _ in self._threads:
+            self._queue.put(self._STOP)
+        self._threads = []
+
+    # -------------------------------------------------
+    # Writer side
+    # -------------------------------------------------
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self._workers):
+                t = threading.Thread(target=self._run, name=f"trace-writer-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def _run(self):
+        while True:
+            doc = self._queue.get()
+            if doc is self._STOP:
+                return
+            ok = self._write(doc)
+            with self._lock:
+                self._pending -= 1
+                self.counters["written" if ok else "failed"] += 1
+                if ok:
+                    self._consecutive_failures = 0
+                else:
+                    self._consecutive_failures += 1
+                    if self._consecutive_failures >= UNHEALTHY_AFTER_FAILURES:
+                        self._unhealthy_until = time.monotonic() + UNHEALTHY_COOLDOWN_SECONDS
+
+    def _write(self, doc: Dict) -> bool:
+        try:
+            offload_payloads(doc)  # large text → blob store, off the request path
+        except Exception as e:
+            logger.error(f"Payload offload failed for {doc.get('id')}: {e}")
+            return False
+
+        for attempt in range(MAX_WRITE_RETRIES + 1):
+            t0 = time.monotonic()
+            try:
+                self._container.create_item(doc)
+                self._write_latency.add(time.monotonic() - t0)
+                return True
+            except exceptions.CosmosResourceExistsError:
+                return True  # client retried a batch we already stored
+            except exceptions.CosmosHttpResponseError as e:
+                if e.status_code == 429 and attempt < MAX_WRITE_RETRIES:
+                    time.sleep(random.uniform(0.05, 0.1) * (2 ** attempt))
+                    continue
+                logger.error(f"Trace write failed for {doc.get('id')}: {e}")
+                return False
+            except Exception as e:
+                logger.error(f"Trace write failed for {doc.get('id')}: {e}")
+                return False
+        return False
+
+
+# Singleton instance
+trace_buffer = TraceWriteBuffer()
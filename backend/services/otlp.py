@@ -0,0 +1,262 @@
+"""
+OTLP Trace Decoding Service
+Maps OpenTelemetry GenAI spans (OTLP/HTTP, protobuf or JSON, optionally
+gzip-compressed) onto the trace document fields used everywhere else.
+
+Only spans carrying `gen_ai.*` attributes become traces; the rest of an
+instrumented request tree (HTTP server spans, DB spans, ...) is counted
+as rejected in the OTLP partial-success response.
+
+Protobuf support needs `opentelemetry-proto`; without it only JSON
+(`application/json`) is accepted.
+"""
+
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+        ExportTraceServiceRequest,
+        ExportTraceServiceResponse,
+    )
+except ImportError:  # optional dependency
+    ExportTraceServiceRequest = None
+    ExportTraceServiceResponse = None
+
+
+PROTOBUF = "application/x-protobuf"
+JSON = "application/json"
+
+MAX_DECOMPRESSED_BYTES = 32 * 1024 * 1024
+
+
+class UnsupportedPayload(Exception):
+    """Content type / encoding this endpoint cannot decode (HTTP 415)."""
+
+
+# =====================================================
+# Attribute → trace field mapping (GenAI semconv first, legacy after)
+# =====================================================
+
+FIELD_ATTRIBUTES = {
+    "model": ("gen_ai.response.model", "gen_ai.request.model"),
+    "tokens_in": ("gen_ai.usage.input_tokens", "gen_ai.usage.prompt_tokens"),
+    "tokens_out": ("gen_ai.usage.output_tokens", "gen_ai.usage.completion_tokens"),
+    "session_id": ("session.id", "gen_ai.conversation.id"),
+    "user_id": ("user.id", "enduser.id"),
+    "input": ("gen_ai.prompt", "gen_ai.input.messages"),
+    "output": ("gen_ai.completion", "gen_ai.output.messages"),
+    "context": ("llmops.context",),
+    "system_prompt": ("gen_ai.system_instructions",),
+    "cost": ("llmops.cost",),
+    "operation": ("gen_ai.operation.name",),
+}
+
+INT_FIELDS = {"tokens_in", "tokens_out"}
+
+
+def _first(attrs: Dict, keys: Tuple[str, ...]):
+    for key in keys:
+        value = attrs.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def _iso(unix_nano: int) -> Optional[str]:
+    if not unix_nano:
+        return None
+    return datetime.fromtimestamp(unix_nano / 1e9, tz=timezone.utc).isoformat()
+
+
+def span_to_trace(
+    name: str,
+    trace_id: str,
+    span_id: str,
+    start_ns: int,
+    end_ns: int,
+    attrs: Dict,
+) -> Optional[Dict]:
+    """One GenAI span → trace dict (input for build_trace_doc), else None."""
+    if not any(key.startswith("gen_ai.") for key in attrs):
+        return None
+
+    trace = {
+        "trace_id": f"otel-{trace_id}-{span_id}",
+        "otel_trace_id": trace_id,
+        "otel_span_id": span_id,
+        # the span name identifies the call site; the operation ("chat",
+        # "embeddings", ...) is shared by every span and kept in `operation`
+        "trace_name": name or attrs.get("gen_ai.operation.name"),
+        "timestamp": _iso(start_ns),
+        "latency_ms": round((end_ns - start_ns) / 1e6) if end_ns > start_ns else 0,
+    }
+
+    for field, keys in FIELD_ATTRIBUTES.items():
+        value = _first(attrs, keys)
+        if value is None:
+            continue
+        if field in INT_FIELDS:
+            value = int(value)
+        elif isinstance(value, (list, dict)):
+            value = json.dumps(value)
+        trace[field] = value
+
+    return trace
+
+
+# =====================================================
+# OTLP/JSON
+# =====================================================
+
+def _json_value(v: Dict):
+    if "stringValue" in v:
+        return v["stringValue"]
+    if "intValue" in v:
+        return int(v["intValue"])  # int64 is a string in OTLP/JSON
+    if "doubleValue" in v:
+        return float(v["doubleValue"])
+    if "boolValue" in v:
+        return v["boolValue"]
+    if "arrayValue" in v:
+        return [_json_value(i) for i in v["arrayValue"].get("values", [])]
+    if "kvlistValue" in v:
+        return _json_attrs(v["kvlistValue"].get("values", []))
+    return None
+
+
+def _json_attrs(kvs: List[Dict]) -> Dict:
+    return {kv["key"]: _json_value(kv.get("value", {})) for kv in kvs}
+
+
+def _json_spans(payload: Dict) -> Iterator[tuple]:
+    for rs in payload.get("resourceSpans", []):
+        resource = _json_attrs(rs.get("resource", {}).get("attributes", []))
+        for ss in rs.get("scopeSpans", []):
+            for span in ss.get("spans", []):
+                attrs = {**resource, **_json_attrs(span.get("attributes", []))}
+                yield (
+                    span.get("name"),
+                    span.get("traceId", ""),
+                    span.get("spanId", ""),
+                    int(span.get("startTimeUnixNano") or 0),
+                    int(span.get("endTimeUnixNano") or 0),
+                    attrs,
+                )
+
+
+# =====================================================
+# OTLP/protobuf
+# =====================================================
+
+def _pb_value(v):
+    kind = v.WhichOneof("value")
+    if kind == "array_value":
+        return [_pb_value(i) for i in v.array_value.values]
+    if kind == "kvlist_value":
+        return _pb_attrs(v.kvlist_value.values)
+    if kind is None:
+        return None
+    return getattr(v, kind)
+
+
+def _pb_attrs(kvs) -> Dict:
+    return {kv.key: _pb_value(kv.value) for kv in kvs}
+
+
+def _pb_spans(request) -> Iterator[tuple]:
+    for rs in request.resource_spans:
+        resource = _pb_attrs(rs.resource.attributes)
+        for ss in rs.scope_spans:
+            for span in ss.spans:
+                attrs = {**resource, **_pb_attrs(span.attributes)}
+                yield (
+                    span.name,
+                    span.trace_id.hex(),
+                    span.span_id.hex(),
+                    span.start_time_unix_nano,
+                    span.end_time_unix_nano,
+                    attrs,
+                )
+
+
+# =====================================================
+# Request decoding
+# =====================================================
+
+def _decompress(body: bytes, content_encoding: Optional[str]) -> bytes:
+    encoding = (content_encoding or "identity").lower()
+    if encoding == "identity":
+        return body
+    if encoding != "gzip":
+        raise UnsupportedPayload(f"Unsupported Content-Encoding '{content_encoding}'")
+
+    # bounded inflate: a small gzip body must not expand without limit
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        data = inflater.decompress(body, MAX_DECOMPRESSED_BYTES)
+    except zlib.error as e:
+        raise ValueError(f"Invalid gzip body: {e}")
+    if inflater.unconsumed_tail:
+        raise ValueError(f"Decompressed body exceeds {MAX_DECOMPRESSED_BYTES} bytes")
+    return data
+
+
+def media_type(content_type: Optional[str]) -> str:
+    return (content_type or JSON).split(";")[0].strip().lower()
+
+
+def decode_export(
+    body: bytes,
+    content_type: Optional[str],
+    content_encoding: Optional[str] = None,
+) -> Tuple[List[Dict], int]:
+    """
+    Decode an ExportTraceServiceRequest body.
+    Returns (traces, rejected_spans).
+    """
+    data = _decompress(body, content_encoding)
+    kind = media_type(content_type)
+
+    if kind == PROTOBUF:
+        if ExportTraceServiceRequest is None:
+            raise UnsupportedPayload(
+                "Protobuf OTLP needs the 'opentelemetry-proto' package; send application/json"
+            )
+        request = ExportTraceServiceRequest()
+        request.ParseFromString(data)
+        spans = _pb_spans(request)
+    elif kind == JSON:
+        spans = _json_spans(json.loads(data))
+    else:
+        raise UnsupportedPayload(f"Unsupported Content-Type '{content_type}'")
+
+    traces = []
+    rejected = 0
+    for span in spans:
+        trace = span_to_trace(*span)
+        if trace is None:
+            rejected += 1
+        else:
+            traces.append(trace)
+
+    return traces, rejected
+
+
+def encode_response(content_type: Optional[str], rejected: int) -> Tuple[bytes, str]:
+    """ExportTraceServiceResponse in the request's encoding."""
+    message = f"{rejected} span(s) without gen_ai attributes dropped" if rejected else ""
+
+    if media_type(content_type) == PROTOBUF:
+        response = ExportTraceServiceResponse()
+        if rejected:
+            response.partial_success.rejected_spans = rejected
+            response.partial_success.error_message = message
+        return response.SerializeToString(), PROTOBUF
+
+    body = {}
+    if rejected:
+        body["partialSuccess"] = {"rejectedSpans": str(rejected), "errorMessage": message}
+    return json.dumps(body).encode(), JSON
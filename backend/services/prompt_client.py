@@ -0,0 +1,138 @@
+"""
+Prompt Client
+Minimal helper for applications that cache prompts locally and keep the
+cache in sync with the registry API:
+
+    client = PromptClient("https://<api-host>")
+    client.start()                                   # background long-poll
+    text = client.render("rag-qa", {"question": q})  # served from memory
+
+Prompts are fetched once through /api/v1/prompts/{name}/resolve. A
+background thread long-polls /api/v1/prompts/changes and marks changed
+prompts stale; a stale prompt is revalidated with If-None-Match on its
+next use, so an unchanged version costs a 304 and no body.
+
+Only needs `requests`; no backend modules are imported, so the file can
+be copied into an application as is.
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# same syntax the registry extracts: {{variable}} and {variable}
+VARIABLE_PATTERN = re.compile(r'\{\{?\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\}?\}')
+
+
+class PromptClient:
+    def __init__(
+        self,
+        base_url: str,
+        alias: str = "production",
+        poll_timeout: int = 30,
+        session: Optional[requests.Session] = None,
+    ):
+        self.base_url = base_url.rstrip("/") + "/api/v1/prompts"
+        self.alias = alias
+        self.poll_timeout = poll_timeout
+        self.session = session or requests.Session()
+
+        self._cache: Dict[tuple, Dict] = {}  # (name, alias) -> {"payload", "etag", "stale"}
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._reset = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -------------------------------------------------
+    # Reads (memory first)
+    # -------------------------------------------------
+    def get(self, name: str, alias: Optional[str] = None) -> Dict:
+        """The resolved prompt (content, version, variables, ...)."""
+        key = (name.lower(), alias or self.alias)
+        entry = self._cache.get(key)
+        if entry and not entry["stale"]:
+            return entry["payload"]
+
+        headers = {"If-None-Match": entry["etag"]} if entry else {}
+        response = self.session.get(
+            f"{self.base_url}/{name}/resolve",
+            params={"alias": key[1]},
+            headers=headers,
+            timeout=10,
+        )
+        if response.status_code == 304 and entry:
+            entry["stale"] = False
+            return entry["payload"]
+        response.raise_for_status()
+
+        payload = response.json()
+        with self._lock:
+            self._cache[key] = {"payload": payload, "etag": response.headers.get("ETag"), "stale": False}
+        return payload
+
+    def render(self, name: str, variables: Dict[str, Any], alias: Optional[str] = None) -> str:
+        content = self.get(name, alias)["content"]
+        return VARIABLE_PATTERN.sub(lambda m: str(variables[m.group(1)]), content)
+
+    # -------------------------------------------------
+    # Sync (long-poll)
+    # -------------------------------------------------
+    def sync(self) -> bool:
+        """One long-poll round; True if any cached prompt was marked stale."""
+        params = {"timeout": self.poll_timeout}
+        if self._version:
+            params["since"] = self._version
+
+        response = self.session.get(
+            f"{self.base_url}/changes",
+            params=params,
+            timeout=self.poll_timeout + 10,
+        )
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+
+        result = response.json()
+        self._version = result["version"]
+        self._reset = result["reset"]
+        changed = {n.lower() for n in result["names"]}
+
+        with self._lock:
+            stale = [
+                entry for (name, _), entry in self._cache.items()
+                if result["reset"] or name in changed
+                or entry["payload"]["id"].rsplit("-v", 1)[0].lower() in changed
+            ]
+            for entry in stale:
+                entry["stale"] = True
+        return bool(stale)
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                self.sync()
+                backoff = 1
+                if self._reset:
+                    # token from another API instance: don't spin behind a load balancer
+                    self._stop.wait(1)
+            except Exception as e:
+                logger.warning(f"Prompt change poll failed: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="prompt-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
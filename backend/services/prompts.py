@@ -6,18 +6,44 @@ Supports both local MLflow and Azure ML MLflow.
 
 import os
 import re
+import threading
+import time
+import uuid
+import random
 import mlflow
 from mlflow import MlflowClient
+from azure.core import MatchConditions
+from azure.cosmos import exceptions
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import logging
 
+from services.variants import SPLIT_TAG, VariantRouter, VariantSplit
+from shared.cosmos import metrics_container
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+CATALOG_TTL_SECONDS = int(os.getenv("PROMPT_CATALOG_TTL_SECONDS", "60"))
+FETCH_WORKERS = int(os.getenv("PROMPT_FETCH_WORKERS", "8"))
+CHANGE_LOG_SIZE = 1000
+
+# Registry changes are shared between API workers through one document in
+# the metrics container; "local" keeps the log per process (single worker)
+CHANGE_FEED = os.getenv("PROMPT_CHANGE_FEED", "cosmos")
+CHANGE_FEED_ID = "prompt_changes"
+CHANGE_POLL_SECONDS = float(os.getenv("PROMPT_CHANGE_POLL_SECONDS", "1"))
+SHARED_CHANGE_LOG_SIZE = 200
+MAX_PUBLISH_ATTEMPTS = 10
+
+# {{variable}} and {variable}
+VARIABLE_PATTERN = re.compile(r'\{\{?\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\}?\}')
+
 
 def setup_azure_ml_auth():
     """
@@ -72,13 +98,71 @@ class PromptVersion(BaseModel):
     mlflow_run_id: Optional[str] = None
 
 
+class PromptNotFound(LookupError):
+    """No such prompt, alias or version in the registry."""
+
+
+class MissingVariables(ValueError):
+    def __init__(self, missing: List[str]):
+        self.missing = missing
+        super().__init__(f"Missing variables: {', '.join(missing)}")
+
+
+class CompiledPrompt:
+    """
+    One resolved prompt version, ready to serve: the template is split
+    once into literal / variable parts, so rendering is a join.
+    """
+
+    def __init__(self, mlflow_name: str, name: str, version: int, alias: Optional[str],
+                 template: str, model_parameters: Dict):
+        self.mlflow_name = mlflow_name
+        self.version = version
+        self.parts = VARIABLE_PATTERN.split(template)  # literal, var, literal, ...
+        self.variables = sorted(set(self.parts[1::2]))
+        self.etag = f'"{mlflow_name}-v{version}"'
+        self.loaded_at = time.monotonic()
+        self.payload = {
+            "id": f"{mlflow_name}-v{version}",
+            "name": name,
+            "version": version,
+            "alias": alias,
+            "content": template,
+            "variables": self.variables,
+            "model_parameters": model_parameters,
+            "etag": self.etag,
+        }
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        missing = [v for v in self.variables if v not in variables]
+        if missing:
+            raise MissingVariables(missing)
+
+        parts = list(self.parts)
+        for i in range(1, len(parts), 2):
+            parts[i] = str(variables[parts[i]])
+        return "".join(parts)
+
+
 class PromptService:
     """
     Service for managing prompts using MLflow Prompt Registry.
     Single source of truth - no DuckDB mirroring.
+
+    The prompt list is served from an in-process catalog (latest version
+    of each prompt, keyed by lowercase MLflow name). It is rebuilt in a
+    background thread every CATALOG_TTL_SECONDS, and the affected entry
+    is refreshed right away when this service registers or promotes a
+    version.
+
+    Change notifications (change_token / changes_since) come from a log
+    shared by all API workers in Cosmos. Each worker polls it every
+    PROMPT_CHANGE_POLL_SECONDS, so a change made through one worker
+    reaches long polls and caches on the others up to that much later;
+    changes made outside this service show up on the next catalog refresh.
     """
 
-    def __init__(self):
+    def __init__(self, change_store=None):
         self.mlflow_tracking_uri = os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000")
 
         if self.mlflow_tracking_uri.startswith("azureml://"):
@@ -94,6 +178,39 @@ class PromptService:
         self.client = MlflowClient(tracking_uri=self.mlflow_tracking_uri)
         logger.info(f"MLflow tracking URI set to: {self.mlflow_tracking_uri}")
 
+        self._catalog: Dict[str, Dict] = {}
+        self._catalog_loaded_at = 0.0
+        self._catalog_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+        # (mlflow_name, version) -> (template, version, tags); registered
+        # versions are immutable, so entries never expire
+        self._versions: Dict[tuple, tuple] = {}
+
+        # mlflow_name -> {"latest", "aliases", "synced_at"}; updated by this
+        # service's own writes and reconciled from every search_prompts result
+        self._index: Dict[str, Dict] = {}
+        self._index_lock = threading.Lock()
+
+        # (sanitized name, alias, version) -> CompiledPrompt
+        self._resolved: Dict[tuple, CompiledPrompt] = {}
+        self._revalidating: set = set()
+
+        # registry change log for client-side caches, mirrored from the
+        # shared feed document; tokens carry the feed's epoch (or this
+        # instance's own while the feed is unavailable)
+        self._change_store = change_store
+        self._epoch = uuid.uuid4().hex[:8]
+        self._epoch_shared = False
+        self._change_seq = 0
+        self._change_log = deque(maxlen=CHANGE_LOG_SIZE)
+        self._change_lock = threading.Lock()
+        self._watch_thread: Optional[threading.Thread] = None
+        self._applying = threading.local()
+
+        # A/B splits, persisted as a prompt tag and synced on every search
+        self.variants = VariantRouter()
+
     def _sanitize_name_for_mlflow(self, name: str) -> str:
         """
         Sanitize prompt name for MLflow (only alphanumeric, hyphens, underscores, dots).
@@ -111,6 +228,10 @@ class PromptService:
         """
         sanitized = self._sanitize_name_for_mlflow(name)
 
+        entry = self._catalog.get(sanitized)
+        if entry:
+            return entry["mlflow_name"]
+
         try:
             all_prompts = mlflow.genai.search_prompts()
             for prompt in all_prompts:
@@ -151,33 +272,105 @@ class PromptService:
         logger.warning(f"Could not find template in prompt version object. Type: {type(prompt_version)}")
         return ""
 
+    # -------------------------------------------------
+    # Version index (latest version + alias -> version)
+    # -------------------------------------------------
+    def _index_entry(self, name: str) -> Dict:
+        entry = self._index.get(name)
+        if entry is None:
+            entry = self._index.setdefault(name, {"latest": None, "aliases": {}, "synced_at": 0.0})
+        return entry
+
+    def _index_metadata(self, prompt) -> Optional[int]:
+        """Reconcile the index with a search_prompts result (MLflow wins)."""
+        latest = None
+        if getattr(prompt, 'latest_version', None):
+            latest = int(prompt.latest_version)
+        elif getattr(prompt, 'version', None):
+            latest = int(prompt.version)
+
+        with self._index_lock:
+            entry = self._index_entry(prompt.name)
+            aliases = getattr(prompt, 'aliases', None)
+            if isinstance(aliases, dict):
+                entry["aliases"] = {alias: int(v) for alias, v in aliases.items()}
+            if latest:
+                entry["latest"] = latest
+                entry["synced_at"] = time.monotonic()
+
+        tags = self._get_prompt_tags(prompt) or {}
+        if self.variants.sync(prompt.name, tags.get(SPLIT_TAG)):
+            self._record_change(prompt.name, latest, alias="split")
+        return latest
+
+    def _note_version(self, name: str, version: int, alias: Optional[str] = None):
+        """Record a version this service registered or promoted."""
+        with self._index_lock:
+            entry = self._index_entry(name)
+            if alias:
+                entry["aliases"][alias] = version
+            elif version > (entry["latest"] or 0):
+                entry["latest"] = version
+
+    def _version_exists(self, name: str, version: int) -> bool:
+        try:
+            prompt_obj = mlflow.genai.load_prompt(f"prompts:/{name}/{version}")
+        except Exception:
+            return False
+        self._versions[(name, version)] = (
+            self._get_prompt_template(prompt_obj), version, self._get_prompt_tags(prompt_obj)
+        )
+        return True
+
+    def _probe_latest(self, name: str, known: int = 1) -> int:
+        """
+        Find the latest version by probing load_prompt: double the step
+        past the last known version until a probe misses, then binary
+        search the gap — O(log n) calls instead of one per version.
+        """
+        if known > 1 and not self._version_exists(name, known):
+            known = 1  # index was ahead of MLflow
+
+        lo, step = known, 1
+        hi = lo + step
+        while self._version_exists(name, hi):
+            lo, step = hi, step * 2
+            hi = lo + step
+
+        # lo exists, hi does not
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self._version_exists(name, mid):
+                lo = mid
+            else:
+                hi = mid
+        return lo
+
     def _get_latest_version(self, name: str) -> int:
         """Get the latest version number for a prompt."""
+        entry = self._index.get(name)
+        if entry and entry["latest"] and time.monotonic() - entry["synced_at"] < CATALOG_TTL_SECONDS:
+            return entry["latest"]
+
         try:
             prompts = mlflow.genai.search_prompts(filter_string=f"name='{name}'")
             if prompts:
-                prompt = prompts[0]
-                if hasattr(prompt, 'latest_version'):
-                    return int(prompt.latest_version)
-                if hasattr(prompt, 'version'):
-                    return int(prompt.version)
+                latest = self._index_metadata(prompts[0])
+                if latest:
+                    return latest
         except Exception as e:
             logger.debug(f"Could not get version from search: {e}")
 
-        version = 1
-        while True:
-            try:
-                mlflow.genai.load_prompt(f"prompts:/{name}/{version + 1}")
-                version += 1
-            except:
-                break
-            if version > 100:
-                break
-
+        version = self._probe_latest(name, (entry or {}).get("latest") or 1)
+        with self._index_lock:
+            self._index_entry(name).update(latest=version, synced_at=time.monotonic())
         return version
 
     def _fetch_prompt_with_template(self, name: str, version: int = None) -> tuple:
         """Fetch a prompt with its template using mlflow.genai.load_prompt()."""
+        if version is not None and (name, int(version)) in self._versions:
+            return self._versions[(name, int(version))]
+
         try:
             if version is None:
                 version = self._get_latest_version(name)
@@ -191,6 +384,7 @@ class PromptService:
             if hasattr(prompt_obj, 'version'):
                 ver = int(prompt_obj.version)
 
+            self._versions[(name, ver)] = (template, ver, tags)
             return template, ver, tags
         except Exception as e:
             logger.error(f"Failed to fetch prompt '{name}' version {version} with template: {e}")
@@ -208,8 +402,7 @@ class PromptService:
 
     def _extract_variables(self, content: str) -> List[str]:
         """Extract variables from prompt content (supports {{variable}} and {variable} formats)"""
-        pattern = r'\{\{?\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\}?\}'
-        variables = re.findall(pattern, content)
+        variables = VARIABLE_PATTERN.findall(content)
         return list(set(variables))
 
     def _format_tags_for_mlflow(self, tags: List[str], model_parameters: Dict, description: str = "", display_name: str = "") -> Dict[str, str]:
@@ -297,8 +490,12 @@ class PromptService:
             )
 
             version = self._get_prompt_version(info)
+            self._versions[(mlflow_name, version)] = (content, version, mlflow_tags)
+            self._note_version(mlflow_name, version)
 
             logger.info(f"Registered prompt '{mlflow_name}' (display: '{display_name}') version {version} in MLflow")
+            self.invalidate(mlflow_name)
+            self._record_change(mlflow_name, version)
 
             return {
                 "id": f"{mlflow_name}-v{version}",
@@ -313,60 +510,431 @@ class PromptService:
             logger.error(f"MLflow prompt registration failed: {e}")
             raise Exception(f"Failed to register prompt in MLflow: {str(e)}")
 
-    def list_prompts(self) -> List[Dict]:
-        """Returns the latest version of each distinct prompt from MLflow."""
-        try:
-            all_prompts = mlflow.genai.search_prompts()
+    # -------------------------------------------------
+    # Prompt catalog (cached list of latest versions)
+    # -------------------------------------------------
+    def _catalog_entry(self, mlflow_name: str, prompt_metadata) -> Dict:
+        """Latest-version list entry for one prompt (one load_prompt call)."""
+        version = None
+        if prompt_metadata is not None and getattr(prompt_metadata, 'latest_version', None):
+            version = int(prompt_metadata.latest_version)
+
+        template, version, version_tags = self._fetch_prompt_with_template(mlflow_name, version)
+
+        metadata_tags = self._get_prompt_tags(prompt_metadata) if prompt_metadata else {}
+        all_tags = {**metadata_tags, **version_tags}
+
+        user_tags, model_params, description, display_name = self._parse_mlflow_tags(all_tags)
+
+        name = display_name if display_name else mlflow_name
+
+        if not description and prompt_metadata and hasattr(prompt_metadata, 'description'):
+            description = prompt_metadata.description or ""
+
+        environment = "dev"
+        if prompt_metadata and hasattr(prompt_metadata, 'aliases') and prompt_metadata.aliases:
+            if 'production' in prompt_metadata.aliases or 'prod' in prompt_metadata.aliases:
+                environment = "production"
+
+        return {
+            "id": f"{mlflow_name}-v{version}",
+            "name": name,
+            "mlflow_name": mlflow_name,
+            "description": description,
+            "tags": [environment] + user_tags,
+            "latest_version": version,
+            "version": version,
+            "content": template,
+            "model_parameters": model_params,
+            "variables": self._extract_variables(template)
+        }
+
+    def refresh_catalog(self) -> int:
+        """Rebuild the catalog: one search_prompts plus one load per prompt."""
+        all_prompts = mlflow.genai.search_prompts()
+        by_name = {prompt.name: prompt for prompt in all_prompts}
+        for prompt in all_prompts:
+            self._index_metadata(prompt)
+
+        def build(item):
+            mlflow_name, prompt_metadata = item
+            try:
+                return self._catalog_entry(mlflow_name, prompt_metadata)
+            except Exception as e:
+                logger.error(f"Failed to fetch prompt '{mlflow_name}': {e}")
+                return None
 
-            prompt_names = set()
-            for prompt in all_prompts:
-                prompt_names.add(prompt.name)
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            entries = [e for e in pool.map(build, by_name.items()) if e]
 
-            prompts_list = []
+        with self._catalog_lock:
+            previous, had_catalog = self._catalog, bool(self._catalog_loaded_at)
+            self._catalog = {e["mlflow_name"].lower(): e for e in entries}
+            self._catalog_loaded_at = time.monotonic()
 
-            for mlflow_name in prompt_names:
-                try:
-                    template, version, version_tags = self._fetch_prompt_with_template(mlflow_name)
+        if had_catalog:
+            # new versions registered outside this service
+            for key, entry in self._catalog.items():
+                if key not in previous or previous[key]["version"] != entry["version"]:
+                    self._record_change(entry["mlflow_name"], entry["version"])
 
-                    prompt_metadata = next((p for p in all_prompts if p.name == mlflow_name), None)
-                    metadata_tags = self._get_prompt_tags(prompt_metadata) if prompt_metadata else {}
+        logger.info(f"Prompt catalog refreshed: {len(entries)} prompts")
+        return len(entries)
 
-                    all_tags = {**metadata_tags, **version_tags}
+    def invalidate(self, mlflow_name: Optional[str] = None):
+        """
+        Re-read one prompt's catalog entry after a change made through this
+        service; without a name (or if the re-read fails) the whole catalog
+        is marked stale and rebuilt on the next read.
+        """
+        if mlflow_name:
+            # alias resolutions may now point elsewhere; pinned versions can't
+            for key in [k for k in self._resolved if k[0] == mlflow_name.lower() and k[2] is None]:
+                self._resolved.pop(key, None)
+            try:
+                found = mlflow.genai.search_prompts(filter_string=f"name='{mlflow_name}'")
+                if found:
+                    self._index_metadata(found[0])
+                entry = self._catalog_entry(mlflow_name, found[0] if found else None)
+                with self._catalog_lock:
+                    self._catalog[mlflow_name.lower()] = entry
+                return
+            except Exception as e:
+                logger.warning(f"Catalog refresh for '{mlflow_name}' failed: {e}")
+
+        with self._catalog_lock:
+            self._catalog_loaded_at = 0.0
+
+    def _refresh_loop(self):
+        # refresh right away: a worker that only serves resolve / render
+        # learns about splits (and the catalog) from here, never on the
+        # request path
+        while True:
+            try:
+                self.refresh_catalog()
+            except Exception as e:
+                logger.error(f"Background prompt catalog refresh failed: {e}")
+            time.sleep(CATALOG_TTL_SECONDS)
+
+    def _ensure_refresher(self):
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        with self._catalog_lock:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(
+                target=self._refresh_loop, name="prompt-catalog", daemon=True
+            )
+            self._refresh_thread.start()
 
-                    user_tags, model_params, description, display_name = self._parse_mlflow_tags(all_tags)
+    def start(self):
+        """Start the catalog refresher and the change feed watcher (app startup)."""
+        self._ensure_refresher()
+        self._ensure_watcher()
+
+    def list_prompts(self) -> List[Dict]:
+        """Returns the latest version of each distinct prompt (from the catalog)."""
+        self._ensure_refresher()
+        try:
+            if not self._catalog_loaded_at:
+                self.refresh_catalog()  # first call, or invalidated
+        except Exception as e:
+            logger.error(f"Failed to fetch prompts from MLflow: {e}")
+            if not self._catalog:
+                return []
 
-                    name = display_name if display_name else mlflow_name
+        return [dict(entry) for entry in self._catalog.values()]
 
-                    if not description and prompt_metadata and hasattr(prompt_metadata, 'description'):
-                        description = prompt_metadata.description or ""
+    # -------------------------------------------------
+    # Resolve / render (served from memory on the caller's request path)
+    # -------------------------------------------------
+    def _compile(self, mlflow_name: str, alias: Optional[str], version: Optional[int]) -> CompiledPrompt:
+        if version is None and alias == "latest":
+            version = self._get_latest_version(mlflow_name)
 
-                    environment = "dev"
-                    if prompt_metadata and hasattr(prompt_metadata, 'aliases') and prompt_metadata.aliases:
-                        if 'production' in prompt_metadata.aliases or 'prod' in prompt_metadata.aliases:
-                            environment = "production"
+        if version is None:
+            try:
+                prompt_obj = mlflow.genai.load_prompt(f"prompts:/{mlflow_name}@{alias}")
+            except Exception as e:
+                raise PromptNotFound(f"Prompt '{mlflow_name}' has no alias '{alias}'") from e
+            version = self._get_prompt_version(prompt_obj)
+            self._versions[(mlflow_name, version)] = (
+                self._get_prompt_template(prompt_obj), version, self._get_prompt_tags(prompt_obj)
+            )
+            self._note_version(mlflow_name, version, alias=alias)
 
-                    prompts_list.append({
-                        "id": f"{mlflow_name}-v{version}",
-                        "name": name,
-                        "description": description,
-                        "tags": [environment] + user_tags,
-                        "latest_version": version,
-                        "version": version,
-                        "content": template,
-                        "model_parameters": model_params,
-                        "variables": self._extract_variables(template)
-                    })
+        version = int(version)
+        if (mlflow_name, version) not in self._versions and not self._version_exists(mlflow_name, version):
+            raise PromptNotFound(f"Prompt '{mlflow_name}' has no version {version}")
 
-                except Exception as e:
-                    logger.error(f"Failed to fetch prompt '{mlflow_name}': {e}")
-                    continue
+        template, version, tags = self._versions[(mlflow_name, version)]
+        _, model_params, _, display_name = self._parse_mlflow_tags(tags)
+        return CompiledPrompt(mlflow_name, display_name or mlflow_name, version, alias, template, model_params)
 
-            logger.info(f"Retrieved {len(prompts_list)} prompts from MLflow")
-            return prompts_list
+    def _revalidate(self, key: tuple, mlflow_name: str):
+        """Reload an aged alias resolution in the background (single flight)."""
+        with self._catalog_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
 
-        except Exception as e:
-            logger.error(f"Failed to fetch prompts from MLflow: {e}")
-            return []
+        def run():
+            try:
+                compiled = self._compile(mlflow_name, key[1], None)
+                previous = self._resolved.get(key)
+                self._resolved[key] = compiled
+                if previous and previous.version != compiled.version:
+                    self._record_change(mlflow_name, compiled.version, alias=key[1])
+            except PromptNotFound:
+                self._resolved.pop(key, None)
+            except Exception as e:
+                logger.warning(f"Revalidating '{mlflow_name}@{key[1]}' failed: {e}")
+            finally:
+                self._revalidating.discard(key)
+
+        threading.Thread(target=run, name="prompt-revalidate", daemon=True).start()
+
+    def resolve(self, name: str, alias: str = "production", version: Optional[int] = None) -> CompiledPrompt:
+        """
+        The version `alias` points to (or a pinned `version`). Hits are
+        served from memory; alias resolutions older than the catalog TTL
+        are still served while a background reload picks up changes made
+        outside this service.
+        """
+        key = (self._sanitize_name_for_mlflow(name), None if version else alias, version)
+        compiled = self._resolved.get(key)
+        if compiled is not None:
+            if version is None and time.monotonic() - compiled.loaded_at > CATALOG_TTL_SECONDS:
+                self._revalidate(key, compiled.mlflow_name)
+            return compiled
+
+        mlflow_name = self._find_actual_mlflow_name(name)
+        if not mlflow_name:
+            raise PromptNotFound(f"Prompt '{name}' not found")
+
+        compiled = self._compile(mlflow_name, key[1], version)
+        self._resolved[key] = compiled
+        return compiled
+
+    def route(self, name: str, unit_id: Optional[str] = None, alias: str = "production",
+              version: Optional[int] = None) -> tuple:
+        """
+        Like resolve, but a unit (user / session id) on a prompt with an
+        active split gets its variant's version. Returns
+        (CompiledPrompt, variant name or None).
+        """
+        if unit_id and version is None:
+            variant = self.variants.assign(self._sanitize_name_for_mlflow(name), unit_id)
+            if variant:
+                return self.resolve(name, version=variant["version"]), variant["name"]
+        return self.resolve(name, alias, version), None
+
+    def render(self, name: str, variables: Dict[str, Any], alias: str = "production",
+               version: Optional[int] = None, unit_id: Optional[str] = None) -> tuple:
+        """Route and fill in variables; returns (CompiledPrompt, text, variant)."""
+        compiled, variant = self.route(name, unit_id, alias, version)
+        return compiled, compiled.render(variables), variant
+
+    # -------------------------------------------------
+    # A/B splits
+    # -------------------------------------------------
+    def get_split(self, name: str) -> Optional[Dict]:
+        split = self.variants.get(self._sanitize_name_for_mlflow(name))
+        return split.to_dict() if split else None
+
+    def set_split(self, name: str, variants: List[Dict], salt: Optional[str] = None) -> Dict:
+        """Start (or change) a weighted split between versions of a prompt."""
+        mlflow_name = self._find_actual_mlflow_name(name)
+        if not mlflow_name:
+            raise PromptNotFound(f"Prompt '{name}' not found")
+
+        split = VariantSplit(mlflow_name, variants, salt)
+        for variant in split.variants:
+            key = (mlflow_name, variant["version"])
+            if key not in self._versions and not self._version_exists(*key):
+                raise PromptNotFound(f"Prompt '{mlflow_name}' has no version {variant['version']}")
+
+        self.client.set_prompt_tag(mlflow_name, SPLIT_TAG, split.to_json())
+        self.variants.set(split)
+        self._record_change(mlflow_name, None, alias="split")
+        logger.info(f"Split for '{mlflow_name}': {[(v['name'], v['version'], v['weight']) for v in split.variants]}")
+        return split.to_dict()
+
+    def remove_split(self, name: str) -> bool:
+        mlflow_name = self._find_actual_mlflow_name(name) or self._sanitize_name_for_mlflow(name)
+        if not self.variants.get(mlflow_name):
+            return False
+
+        self.client.delete_prompt_tag(mlflow_name, SPLIT_TAG)
+        self.variants.remove(mlflow_name)
+        self._record_change(mlflow_name, None, alias="split")
+        return True
+
+    # -------------------------------------------------
+    # Change notifications (client-side cache sync)
+    # -------------------------------------------------
+    @property
+    def change_token(self) -> str:
+        with self._change_lock:
+            return f"{self._epoch}-{self._change_seq}"
+
+    def _record_change(self, mlflow_name: str, version: int, alias: Optional[str] = None):
+        if getattr(self._applying, "active", False):
+            return  # replaying a change that is already in the shared feed
+
+        change = {
+            "name": mlflow_name,
+            "version": version,
+            "alias": alias,
+            "at": datetime.utcnow().isoformat(),
+        }
+        if self._change_store is not None:
+            try:
+                self._mirror(self._publish(change))
+                return
+            except Exception as e:
+                logger.warning(f"Publishing prompt change for '{mlflow_name}' failed: {e}")
+
+        with self._change_lock:
+            if self._epoch_shared:
+                # our numbers would collide with the shared feed's: start a
+                # local epoch (clients reset) until the feed is reachable again
+                self._epoch, self._epoch_shared = uuid.uuid4().hex[:8], False
+                self._change_seq = 0
+                self._change_log.clear()
+            self._change_seq += 1
+            self._change_log.append({"seq": self._change_seq, **change})
+
+    def _publish(self, change: Dict) -> Dict:
+        """Append a change to the shared feed document (ETag if-match); returns the document."""
+        for attempt in range(MAX_PUBLISH_ATTEMPTS):
+            try:
+                doc = self._change_store.read_item(item=CHANGE_FEED_ID, partition_key=CHANGE_FEED_ID)
+            except exceptions.CosmosResourceNotFoundError:
+                doc = None
+
+            if doc is None:
+                doc = {
+                    "id": CHANGE_FEED_ID,
+                    "partitionKey": CHANGE_FEED_ID,
+                    "epoch": uuid.uuid4().hex[:8],
+                    "seq": 0,
+                    "changes": [],
+                }
+
+            # several workers notice the same outside change on their catalog
+            # refresh; keep one entry per name/alias state
+            if change["alias"] != "split":
+                last = next(
+                    (c for c in reversed(doc["changes"])
+                     if c["name"] == change["name"] and c["alias"] == change["alias"]),
+                    None,
+                )
+                if last and last["version"] == change["version"]:
+                    return doc
+
+            doc["seq"] += 1
+            doc["changes"] = (doc["changes"] + [{"seq": doc["seq"], **change}])[-SHARED_CHANGE_LOG_SIZE:]
+            try:
+                if "_etag" not in doc:
+                    return self._change_store.create_item(doc)
+                return self._change_store.replace_item(
+                    item=CHANGE_FEED_ID,
+                    body=doc,
+                    etag=doc["_etag"],
+                    match_condition=MatchConditions.IfNotModified,
+                )
+            except (
+                exceptions.CosmosAccessConditionFailedError,
+                exceptions.CosmosResourceExistsError,
+            ):
+                time.sleep(random.uniform(0, 0.005 * (2 ** min(attempt, 6))))
+
+        raise RuntimeError(f"Could not append to '{CHANGE_FEED_ID}' after {MAX_PUBLISH_ATTEMPTS} attempts")
+
+    def _mirror(self, doc: Dict) -> Optional[List[Dict]]:
+        """
+        Adopt the shared feed's state. Returns the changes not seen yet, or
+        None when the epoch changed and everything cached is suspect.
+        """
+        with self._change_lock:
+            if doc["epoch"] == self._epoch:
+                if doc["seq"] <= self._change_seq:
+                    return []
+                fresh = [c for c in doc["changes"] if c["seq"] > self._change_seq]
+            else:
+                fresh = None
+            self._epoch, self._change_seq = doc["epoch"], doc["seq"]
+            self._epoch_shared = True
+            self._change_log = deque(doc["changes"], maxlen=CHANGE_LOG_SIZE)
+        return fresh
+
+    def _apply_changes(self, changes: Optional[List[Dict]]):
+        """Drop what this worker cached for prompts changed through another worker."""
+        self._applying.active = True
+        try:
+            if changes is None:
+                self._resolved.clear()
+                self.invalidate()
+                return
+            for name in dict.fromkeys(c["name"] for c in changes):
+                self.invalidate(name)
+        finally:
+            self._applying.active = False
+
+    def _watch_loop(self):
+        failing = False
+        while True:
+            try:
+                doc = self._change_store.read_item(item=CHANGE_FEED_ID, partition_key=CHANGE_FEED_ID)
+                self._apply_changes(self._mirror(doc))
+                failing = False
+            except exceptions.CosmosResourceNotFoundError:
+                pass  # nothing published yet
+            except Exception as e:
+                if not failing:
+                    logger.warning(f"Reading the prompt change feed failed: {e}")
+                failing = True
+            time.sleep(CHANGE_POLL_SECONDS)
+
+    def _ensure_watcher(self):
+        if self._change_store is None:
+            return
+        with self._change_lock:
+            if self._watch_thread and self._watch_thread.is_alive():
+                return
+            self._watch_thread = threading.Thread(
+                target=self._watch_loop, name="prompt-changes", daemon=True
+            )
+            self._watch_thread.start()
+
+    def changes_since(self, since: Optional[str]) -> Dict:
+        """
+        Registry changes after the `since` token. `reset` is set when the
+        token is missing, from another feed epoch or older than the
+        retained log — the caller should then drop its whole cache.
+        """
+        with self._change_lock:
+            current, seq = self._epoch, self._change_seq
+            log = list(self._change_log)
+
+        epoch, _, number = (since or "").rpartition("-")
+        try:
+            number = int(number)
+        except ValueError:
+            number = -1
+
+        oldest = log[0]["seq"] if log else seq + 1
+        reset = epoch != current or number > seq or number < oldest - 1
+        changes = [] if reset else [c for c in log if c["seq"] > number]
+
+        return {
+            "version": f"{current}-{seq}",
+            "reset": reset,
+            "names": sorted({c["name"] for c in changes}),
+            "aliases": sorted({f"{c['name']}@{c['alias']}" for c in changes if c["alias"]}),
+            "changes": changes,
+        }
 
     def get_prompt_by_name(self, name: str, version: Optional[int] = None) -> Optional[Dict]:
         """Get a specific prompt by name and optionally version."""
@@ -382,6 +950,8 @@ class PromptService:
 
             all_prompts = mlflow.genai.search_prompts(filter_string=f"name='{mlflow_name}'")
             prompt_metadata = all_prompts[0] if all_prompts else None
+            if prompt_metadata:
+                self._index_metadata(prompt_metadata)
 
             metadata_tags = self._get_prompt_tags(prompt_metadata) if prompt_metadata else {}
             all_tags = {**metadata_tags, **version_tags}
@@ -434,15 +1004,21 @@ class PromptService:
                 return []
 
             prompt_metadata = prompt_metadata_list[0]
+            self._index_metadata(prompt_metadata)
 
             latest_version = self._get_latest_version(mlflow_name)
 
             history = []
 
-            for ver_num in range(1, latest_version + 1):
-                try:
-                    template, version, version_tags = self._fetch_prompt_with_template(mlflow_name, ver_num)
+            # only versions not seen before hit MLflow; those load in parallel
+            with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+                fetched = list(pool.map(
+                    lambda ver_num: self._fetch_prompt_with_template(mlflow_name, ver_num),
+                    range(1, latest_version + 1),
+                ))
 
+            for ver_num, (template, version, version_tags) in enumerate(fetched, start=1):
+                try:
                     metadata_tags = self._get_prompt_tags(prompt_metadata)
                     all_tags = {**metadata_tags, **version_tags}
 
@@ -501,6 +1077,9 @@ class PromptService:
             )
 
             logger.info(f"Promoted '{mlflow_name}' v{version} to '{target_env}'")
+            self._note_version(mlflow_name, version, alias=target_env)
+            self.invalidate(mlflow_name)
+            self._record_change(mlflow_name, version, alias=target_env)
             return True
 
         except Exception as e:
@@ -509,4 +1088,4 @@ class PromptService:
 
 
 # Singleton instance
-prompt_service = PromptService()
+prompt_service = PromptService(metrics_container if CHANGE_FEED == "cosmos" else None)
@@ -0,0 +1,108 @@
+"""
+Prompt Variant Routing
+Weighted A/B splits between versions of one prompt, held in memory.
+
+A unit (user or session id) is hashed together with the split's salt
+into one of BUCKETS buckets; a precomputed bucket -> variant table makes
+every assignment a hash plus a list lookup, and the same unit always
+lands on the same variant while the split is unchanged. Changing the
+salt reshuffles units; changing weights only moves the units whose
+buckets changed owner.
+"""
+
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+
+BUCKETS = 10000
+SPLIT_TAG = "ab_split"  # MLflow prompt tag holding the split as JSON
+
+
+class InvalidSplit(ValueError):
+    """Weights / versions that can't form a split."""
+
+
+class VariantSplit:
+    def __init__(self, prompt: str, variants: List[Dict], salt: Optional[str] = None):
+        if len(variants) < 2:
+            raise InvalidSplit("A split needs at least two variants")
+
+        names = [v["name"] for v in variants]
+        if len(set(names)) != len(names):
+            raise InvalidSplit("Variant names must be unique")
+
+        weights = [float(v.get("weight", 1)) for v in variants]
+        if any(w < 0 for w in weights) or sum(weights) <= 0:
+            raise InvalidSplit("Weights must be non-negative with a positive total")
+
+        self.prompt = prompt
+        self.salt = salt or prompt
+        self.variants = [
+            {"name": v["name"], "version": int(v["version"]), "weight": w}
+            for v, w in zip(variants, weights)
+        ]
+
+        # bucket -> variant index, laid out in order of cumulative weight
+        total = sum(weights)
+        table, edge = [], 0.0
+        for i, w in enumerate(weights):
+            edge += w / total * BUCKETS
+            table.extend([i] * (round(edge) - len(table)))
+        table.extend([len(weights) - 1] * (BUCKETS - len(table)))
+        self._table = table
+
+    def bucket(self, unit_id: str) -> int:
+        digest = hashlib.blake2b(f"{self.salt}:{unit_id}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % BUCKETS
+
+    def assign(self, unit_id: str) -> Dict:
+        return self.variants[self._table[self.bucket(unit_id)]]
+
+    def to_dict(self) -> Dict:
+        return {"prompt": self.prompt, "salt": self.salt, "variants": self.variants}
+
+    def to_json(self) -> str:
+        return json.dumps({"salt": self.salt, "variants": self.variants}, sort_keys=True)
+
+    @classmethod
+    def from_json(cls, prompt: str, value: str) -> "VariantSplit":
+        data = json.loads(value)
+        return cls(prompt, data["variants"], data.get("salt"))
+
+
+class VariantRouter:
+    """Active splits by (lowercase) prompt name."""
+
+    def __init__(self):
+        self._splits: Dict[str, VariantSplit] = {}
+
+    def get(self, prompt: str) -> Optional[VariantSplit]:
+        return self._splits.get(prompt.lower())
+
+    def set(self, split: VariantSplit):
+        self._splits[split.prompt.lower()] = split
+
+    def remove(self, prompt: str) -> bool:
+        return self._splits.pop(prompt.lower(), None) is not None
+
+    def sync(self, prompt: str, value: Optional[str]) -> bool:
+        """
+        Align with the persisted tag value (None = no split).
+        Returns True if the active split changed.
+        """
+        current = self.get(prompt)
+        if value is None:
+            return self.remove(prompt)
+        if current is not None and current.to_json() == value:
+            return False
+        try:
+            self.set(VariantSplit.from_json(prompt, value))
+        except (InvalidSplit, ValueError, KeyError, TypeError):
+            return False
+        return True
+
+    def assign(self, prompt: str, unit_id: str) -> Optional[Dict]:
+        """The variant for a unit, or None when the prompt has no split."""
+        split = self._splits.get(prompt.lower())
+        return split.assign(unit_id) if split else None
@@ -0,0 +1,502 @@
+"""
+Threshold alerts evaluated incrementally on the change feeds.
+
+A rule is a condition over a rolling window of one metric, e.g.
+
+    p95(latency_ms) > 5000 over 300 s      where model = gpt-4o
+    avg(score)      < 0.6  over 100 scores where evaluator_name = hallucination
+
+Each rule keeps its window in memory (a deque plus a sorted copy when a
+quantile / min / max is needed), so an event costs O(log n) search and
+a short memmove per matching rule instead of a rescan. Time windows run
+on event time (the document's timestamp).
+
+A breach opens one alert (status "firing") and notifies once; further
+breaching events are deduplicated into it. It resolves (and notifies)
+when the condition clears. A rule that re-breaches within
+`cooldown_seconds` of its last alert stays quiet.
+
+Storage:
+    alert_rules   pk /id       — rule definitions (API)
+    alerts        pk /rule_id  — alert documents (engine)
+
+Windows are per process: they refill after a cold start (open alerts are
+restored from Cosmos), and the AlertMonitor functions should run on a
+single instance so every event reaches the same windows.
+"""
+
+import bisect
+import logging
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from shared.cosmos import alert_rules_container_read, alerts_container, alerts_container_read
+
+
+RULES_TTL_SECONDS = int(os.getenv("ALERT_RULES_TTL_SECONDS", "60"))
+MAX_WINDOW_SAMPLES = int(os.getenv("ALERT_MAX_WINDOW_SAMPLES", "10000"))
+WEBHOOK_URL = os.getenv("ALERT_WEBHOOK_URL")
+WEBHOOK_TIMEOUT_SECONDS = 5
+
+# metric -> change feed it comes from
+METRICS = {
+    "latency_ms": "traces",
+    "cost": "traces",
+    "tokens": "traces",
+    "tokens_in": "traces",
+    "tokens_out": "traces",
+    "score": "evaluations",
+}
+AGGREGATES = ("avg", "sum", "count", "min", "max", "p50", "p90", "p95", "p99")
+OPERATORS = {
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+FILTER_FIELDS = ("model", "trace_name", "evaluator_name")
+SEVERITIES = ("info", "warning", "critical")
+
+DEFAULT_COOLDOWN_SECONDS = 900
+DEFAULT_MIN_SAMPLES = 5
+
+
+class InvalidRule(ValueError):
+    """A rule definition the engine can't evaluate."""
+
+
+def rule_id_for(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def validate_rule(rule: Dict) -> Dict:
+    """Normalized copy of a rule definition; raises InvalidRule."""
+    name = (rule.get("name") or "").strip()
+    if not name:
+        raise InvalidRule("name is required")
+
+    metric = rule.get("metric")
+    if metric not in METRICS:
+        raise InvalidRule(f"metric must be one of {', '.join(METRICS)}")
+    aggregate = rule.get("aggregate", "avg")
+    if aggregate not in AGGREGATES:
+        raise InvalidRule(f"aggregate must be one of {', '.join(AGGREGATES)}")
+    op = rule.get("op")
+    if op not in OPERATORS:
+        raise InvalidRule(f"op must be one of {', '.join(OPERATORS)}")
+    try:
+        threshold = float(rule["threshold"])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidRule("threshold must be a number")
+
+    window_seconds = rule.get("window_seconds")
+    window_count = rule.get("window_count")
+    if (window_seconds is None) == (window_count is None):
+        raise InvalidRule("set exactly one of window_seconds / window_count")
+    window = window_seconds if window_seconds is not None else window_count
+    if not isinstance(window, int) or isinstance(window, bool) or window <= 0:
+        raise InvalidRule("the window must be a positive integer")
+    if window_count is not None and window_count > MAX_WINDOW_SAMPLES:
+        raise InvalidRule(f"window_count is capped at {MAX_WINDOW_SAMPLES}")
+
+    filters = {k: v for k, v in (rule.get("filters") or {}).items() if v}
+    unknown = set(filters) - set(FILTER_FIELDS)
+    if unknown:
+        raise InvalidRule(f"unknown filters: {', '.join(sorted(unknown))}")
+    if metric == "score" and "evaluator_name" not in filters:
+        raise InvalidRule("score rules need an evaluator_name filter")
+
+    severity = rule.get("severity", "warning")
+    if severity not in SEVERITIES:
+        raise InvalidRule(f"severity must be one of {', '.join(SEVERITIES)}")
+
+    return {
+        "id": rule.get("id") or rule_id_for(name),
+        "name": name,
+        "metric": metric,
+        "source": METRICS[metric],
+        "aggregate": aggregate,
+        "op": op,
+        "threshold": threshold,
+        "window_seconds": window_seconds,
+        "window_count": window_count,
+        "filters": filters,
+        "min_samples": max(1, int(rule.get("min_samples") or DEFAULT_MIN_SAMPLES)),
+        "cooldown_seconds": max(0, int(rule.get("cooldown_seconds", DEFAULT_COOLDOWN_SECONDS))),
+        "severity": severity,
+        "enabled": bool(rule.get("enabled", True)),
+    }
+
+
+def describe(rule: Dict) -> str:
+    window = (
+        f"{rule['window_seconds']} s" if rule.get("window_seconds")
+        else f"{rule['window_count']} events"
+    )
+    where = " AND ".join(f"{k} = {v}" for k, v in rule.get("filters", {}).items())
+    text = f"{rule['aggregate']}({rule['metric']}) {rule['op']} {rule['threshold']:g} over {window}"
+    return f"{text} where {where}" if where else text
+
+
+# =====================================================
+# Rolling window
+# =====================================================
+
+class RollingWindow:
+    """Last `count` values or values from the last `seconds` of event time."""
+
+    def __init__(self, seconds: Optional[int] = None, count: Optional[int] = None, ordered: bool = False):
+        self.seconds = seconds
+        self.count = min(count, MAX_WINDOW_SAMPLES) if count else None
+        self._events = deque()                       # (ts, value), arrival order
+        self._sorted = [] if ordered else None       # for quantiles / min / max
+        self._sum = 0.0
+        self._latest = float("-inf")
+
+    def __len__(self):
+        return len(self._events)
+
+    def add(self, value: float, ts: float) -> bool:
+        """False for a value that is already outside a time window."""
+        if self.seconds and ts <= self._latest - self.seconds:
+            return False
+        self._events.append((ts, value))
+        self._sum += value
+        if self._sorted is not None:
+            bisect.insort(self._sorted, value)
+        self._latest = max(self._latest, ts)
+        self._evict()
+        return True
+
+    def _evict(self):
+        events = self._events
+        cutoff = self._latest - self.seconds if self.seconds else None
+        while events and (
+            len(events) > (self.count or MAX_WINDOW_SAMPLES)
+            or (cutoff is not None and events[0][0] <= cutoff)
+        ):
+            _, value = events.popleft()
+            self._sum -= value
+            if self._sorted is not None:
+                del self._sorted[bisect.bisect_left(self._sorted, value)]
+        if not events:
+            self._sum = 0.0  # drop accumulated rounding
+
+    def value(self, aggregate: str) -> Optional[float]:
+        n = len(self._events)
+        if aggregate == "count":
+            return float(n)
+        if not n:
+            return None
+        if aggregate == "sum":
+            return self._sum
+        if aggregate == "avg":
+            return self._sum / n
+        if aggregate == "min":
+            return self._sorted[0]
+        if aggregate == "max":
+            return self._sorted[-1]
+        # nearest-rank percentile
+        q = int(aggregate[1:])
+        return self._sorted[max(0, math.ceil(q / 100 * n) - 1)]
+
+
+# =====================================================
+# Notifiers
+# =====================================================
+
+class Notifier:
+    """Delivers alert transitions ("firing" / "resolved")."""
+
+    def notify(self, event: str, alert: Dict):
+        raise NotImplementedError
+
+
+class LogNotifier(Notifier):
+    """Local stand-in: writes to the function log and keeps the last few."""
+
+    def __init__(self, keep: int = 100):
+        self.sent = deque(maxlen=keep)
+
+    def notify(self, event: str, alert: Dict):
+        self.sent.append((event, alert))
+        logging.warning(
+            f"[Alert] {event.upper()} [{alert['severity']}] {alert['rule_name']}: "
+            f"{alert['condition']} (value {alert['value']:g})"
+        )
+
+
+class WebhookNotifier(Notifier):
+    """POSTs a JSON payload; `text` makes it render in Slack / Teams webhooks."""
+
+    def __init__(self, url: str, timeout: float = WEBHOOK_TIMEOUT_SECONDS):
+        self.url = url
+        self.timeout = timeout
+
+    def notify(self, event: str, alert: Dict):
+        text = (
+            f"{'🔴' if event == 'firing' else '✅'} [{alert['severity']}] "
+            f"{alert['rule_name']} {event}: {alert['condition']} (value {alert['value']:g})"
+        )
+        response = requests.post(
+            self.url,
+            json={"text": text, "event": event, "alert": alert},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+
+
+def notifier_from_env() -> Notifier:
+    return WebhookNotifier(WEBHOOK_URL) if WEBHOOK_URL else LogNotifier()
+
+
+# =====================================================
+# Engine
+# =====================================================
+
+def _event_time(doc: Dict) -> float:
+    value = doc.get("timestamp")
+    if isinstance(value, str):
+        try:
+            ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if ts.tzinfo is None:
+                ts = ts.replace(tzinfo=timezone.utc)
+            return ts.timestamp()
+        except ValueError:
+            pass
+    return float(doc.get("_ts") or time.time())
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+class _RuleState:
+    def __init__(self, rule: Dict):
+        self.rule = rule
+        self.version = rule.get("updated_at") or rule.get("created_at")
+        self.window = RollingWindow(
+            seconds=rule.get("window_seconds"),
+            count=rule.get("window_count"),
+            ordered=rule["aggregate"] not in ("avg", "sum", "count"),
+        )
+        self.compare = OPERATORS[rule["op"]]
+        self.filters = list(rule.get("filters", {}).items())
+        self.alert: Optional[Dict] = None    # open alert while firing
+        self.last_fired = float("-inf")      # event time of the last alert
+        self.suppressed = 0                  # breaches swallowed by the cool-down
+
+
+class AlertEngine:
+    """
+    Rules for one source ("traces" | "evaluations"), refreshed from
+    `load_rules` every RULES_TTL_SECONDS. Windows of rules whose
+    definition did not change survive a refresh.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        load_rules: Callable[[], List[Dict]],
+        alerts_container=None,
+        notifier: Optional[Notifier] = None,
+        load_open_alerts: Optional[Callable[[], List[Dict]]] = None,
+    ):
+        self.source = source
+        self._load_rules = load_rules
+        self._load_open_alerts = load_open_alerts
+        self._alerts = alerts_container
+        self.notifier = notifier or notifier_from_env()
+        self._states: Dict[str, _RuleState] = {}
+        self._by_model: Dict[Optional[str], List[_RuleState]] = {}  # None = any model
+        self._loaded_at = float("-inf")
+        self._restored = False
+        self._lock = threading.Lock()
+        self.counters = {"events": 0, "fired": 0, "resolved": 0, "suppressed": 0, "archived": 0}
+
+    # -------------------------------------------------
+    # Rules
+    # -------------------------------------------------
+    def refresh(self, force: bool = False):
+        if not force and time.monotonic() - self._loaded_at < RULES_TTL_SECONDS:
+            return
+        try:
+            rules = self._load_rules()
+        except Exception:
+            logging.exception("[Alert] Failed to load rules; keeping the current set")
+            self._loaded_at = time.monotonic()
+            return
+
+        states = {}
+        for raw in rules:
+            try:
+                rule = {**raw, **validate_rule(raw)}
+            except InvalidRule as e:
+                logging.warning(f"[Alert] Skipping rule {raw.get('id')}: {e}")
+                continue
+            if not rule["enabled"] or rule["source"] != self.source:
+                continue
+            current = self._states.get(rule["id"])
+            version = rule.get("updated_at") or rule.get("created_at")
+            if current is not None and current.version == version:
+                states[rule["id"]] = current
+            else:
+                states[rule["id"]] = _RuleState(rule)
+                if current is not None:
+                    states[rule["id"]].alert = current.alert
+                    states[rule["id"]].last_fired = current.last_fired
+        # alerts of rules that were deleted / disabled would never resolve
+        dropped = [
+            s for rule_id, s in self._states.items()
+            if rule_id not in states and s.alert is not None
+        ]
+        self._states = states
+        by_model = {None: []}
+        for state in states.values():
+            by_model.setdefault(state.rule["filters"].get("model"), []).append(state)
+        self._by_model = by_model
+        self._loaded_at = time.monotonic()
+        for state in dropped:
+            self._emit("resolved", {
+                **state.alert,
+                "status": "resolved",
+                "resolved_at": datetime.now(timezone.utc).isoformat(),
+                "resolution": "rule removed",
+            })
+
+        if not self._restored:
+            self._restore_open_alerts()
+
+    def _restore_open_alerts(self):
+        """Pick up alerts left firing by a previous process (dedup / cool-down)."""
+        self._restored = True
+        if not self._load_open_alerts:
+            return
+        try:
+            open_alerts = self._load_open_alerts()
+        except Exception:
+            logging.exception("[Alert] Failed to load open alerts")
+            return
+        for alert in open_alerts:
+            state = self._states.get(alert.get("rule_id"))
+            if state is not None and state.alert is None:
+                state.alert = alert
+                state.last_fired = _event_time({"timestamp": alert.get("started_at")})
+
+    @property
+    def rules(self) -> List[Dict]:
+        return [s.rule for s in self._states.values()]
+
+    # -------------------------------------------------
+    # Events
+    # -------------------------------------------------
+    def process(self, doc: Dict) -> List[Dict]:
+        """Feed one trace / evaluation; returns the alert transitions it caused."""
+        transitions = []
+        with self._lock:
+            self.counters["events"] += 1
+            ts = None
+            candidates = self._by_model.get(doc.get("model"), [])
+            for state in (*candidates, *self._by_model.get(None, [])):
+                rule = state.rule
+                value = doc.get(rule["metric"])
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    continue
+                if any(doc.get(field) != expected for field, expected in state.filters):
+                    continue
+                if ts is None:
+                    ts = _event_time(doc)
+                if state.window.add(float(value), ts):
+                    transition = self._evaluate(state, ts)
+                    if transition:
+                        transitions.append(transition)
+        for event, alert in transitions:
+            self._emit(event, alert)
+        return [alert for _, alert in transitions]
+
+    def process_batch(self, docs: List[Dict]) -> List[Dict]:
+        self.refresh()
+        # RetentionArchiver's `ttl` patch re-emits archived (up to 30-day-old)
+        # docs on the change feed; time windows would drop them, count
+        # windows would not
+        live = [d for d in docs if "ttl" not in d]
+        self.counters["archived"] += len(docs) - len(live)
+        docs = sorted(live, key=lambda d: d.get("timestamp") or "")
+        return [t for doc in docs for t in self.process(doc)]
+
+    def _evaluate(self, state: _RuleState, ts: float):
+        rule = state.rule
+        if len(state.window) < rule["min_samples"]:
+            return None
+        value = state.window.value(rule["aggregate"])
+        breached = value is not None and state.compare(value, rule["threshold"])
+
+        if breached:
+            if state.alert is not None:
+                state.alert["value"] = value  # dedup: same incident, no new alert
+                return None
+            if ts - state.last_fired < rule["cooldown_seconds"]:
+                state.suppressed += 1
+                self.counters["suppressed"] += 1
+                return None
+            state.alert = {
+                "id": f"{rule['id']}:{uuid.uuid4().hex[:12]}",
+                "rule_id": rule["id"],
+                "rule_name": rule["name"],
+                "severity": rule["severity"],
+                "condition": describe(rule),
+                "status": "firing",
+                "value": value,
+                "threshold": rule["threshold"],
+                "samples": len(state.window),
+                "started_at": _iso(ts),
+                "resolved_at": None,
+            }
+            state.last_fired = ts
+            self.counters["fired"] += 1
+            return "firing", dict(state.alert)
+
+        if state.alert is not None:
+            alert = {**state.alert, "status": "resolved", "value": value, "resolved_at": _iso(ts)}
+            state.alert = None
+            self.counters["resolved"] += 1
+            return "resolved", alert
+        return None
+
+    def _emit(self, event: str, alert: Dict):
+        alert["updated_at"] = datetime.now(timezone.utc).isoformat()
+        if self._alerts is not None:
+            try:
+                self._alerts.upsert_item(alert)
+            except Exception:
+                logging.exception(f"[Alert] Failed to persist alert {alert['id']}")
+        try:
+            self.notifier.notify(event, alert)
+        except Exception:
+            # 🚨 a broken notifier must not stop evaluation
+            logging.exception(f"[Alert] Notifier failed for alert {alert['id']}")
+
+
+def cosmos_engine(source: str) -> AlertEngine:
+    """Engine wired to the alert_rules / alerts containers and the env notifier."""
+    return AlertEngine(
+        source,
+        load_rules=lambda: list(alert_rules_container_read.query_items(
+            query="SELECT * FROM c",
+            enable_cross_partition_query=True,
+        )),
+        alerts_container=alerts_container,
+        load_open_alerts=lambda: list(alerts_container_read.query_items(
+            query="SELECT * FROM c WHERE c.status = 'firing'",
+            enable_cross_partition_query=True,
+        )),
+    )
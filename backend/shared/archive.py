@@ -0,0 +1,295 @@
+"""
+Cold archive for traces and evaluations: date-partitioned Parquet.
+
+    <ARCHIVE_PATH>/<dataset>/date=YYYY-MM-DD/<part>.parquet
+    <ARCHIVE_PATH>/<dataset>/date=YYYY-MM-DD/<part>.manifest.json
+    <ARCHIVE_PATH>/_checkpoints/<dataset>.json
+
+Each row has typed columns for analytics plus `doc`, the full Cosmos
+document as canonical JSON, so the archive is lossless. The manifest
+records a sha256 per archived id; verification re-reads the Parquet file
+and compares. ARCHIVE_PATH is a filesystem path; hive-style `date=`
+directories let query engines prune partitions.
+
+Archiving lets Cosmos purge the originals, so the archiver refuses to
+run unless ARCHIVE_PATH is set explicitly, lies outside the temp dir and
+the operator confirms (ARCHIVE_DURABLE=true) that it is durable storage
+shared by every host, e.g. an Azure Files / blobfuse mount.
+
+Needs pyarrow (imported on first use).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+
+
+ARCHIVE_PATH = os.getenv(
+    "ARCHIVE_PATH",
+    os.path.join(tempfile.gettempdir(), "llmops-archive"),
+)
+ARCHIVE_DURABLE = os.getenv("ARCHIVE_DURABLE", "").lower() in ("1", "true", "yes")
+COMPRESSION = "zstd"
+
+# Cosmos system properties are not part of the archived document
+SYSTEM_PROPERTIES = ("_rid", "_self", "_etag", "_attachments", "ttl")
+
+
+# =====================================================
+# Dataset schemas
+# =====================================================
+
+DATASETS = {
+    "traces": {
+        "partition_key": "partitionKey",
+        "columns": {
+            "id": "string",
+            "trace_id": "string",
+            "session_id": "string",
+            "user_id": "string",
+            "trace_name": "string",
+            "model": "string",
+            "timestamp": "timestamp",
+            "latency_ms": "int64",
+            "tokens_in": "int64",
+            "tokens_out": "int64",
+            "tokens": "int64",
+            "cost": "float64",
+            "input": "string",
+            "context": "string",
+            "output": "string",
+            "prompt_name": "string",
+            "prompt_version": "int64",
+            "prompt_variant": "string",
+        },
+    },
+    "evaluations": {
+        "partition_key": "trace_id",
+        "columns": {
+            "id": "string",
+            "trace_id": "string",
+            "evaluator_name": "string",
+            "score": "float64",
+            "status": "string",
+            "method": "string",
+            "duration_ms": "int64",
+            "timestamp": "timestamp",
+            "prompt_tokens": "int64",
+            "completion_tokens": "int64",
+            "explanation": "string",
+        },
+    },
+}
+
+
+class ArchiveNotDurable(RuntimeError):
+    """ARCHIVE_PATH is not confirmed durable, shared storage."""
+
+
+def require_durable(root: str = ARCHIVE_PATH):
+    """Raise unless `root` may hold the only copy of purged documents."""
+    if "ARCHIVE_PATH" not in os.environ or not ARCHIVE_DURABLE:
+        raise ArchiveNotDurable(
+            "Set ARCHIVE_PATH to durable shared storage and ARCHIVE_DURABLE=true "
+            "before archiving (Cosmos purges archived documents)"
+        )
+    tmp = os.path.realpath(tempfile.gettempdir())
+    if os.path.commonpath([os.path.realpath(root), tmp]) == tmp:
+        raise ArchiveNotDurable(f"ARCHIVE_PATH {root} is inside the temp dir {tmp}")
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("The Parquet archive needs the 'pyarrow' package")
+    return pa, pq
+
+
+def schema(dataset: str):
+    pa, _ = _arrow()
+    types = {
+        "string": pa.string(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    fields = [
+        pa.field(name, types[kind])
+        for name, kind in DATASETS[dataset]["columns"].items()
+    ]
+    fields.append(pa.field("doc", pa.string()))
+    return pa.schema(fields)
+
+
+# =====================================================
+# Rows
+# =====================================================
+
+def parse_timestamp(value):
+    if not isinstance(value, str):
+        return None
+    try:
+        ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _coerce(value, kind: str):
+    if value is None:
+        return None
+    try:
+        if kind == "int64":
+            return int(value)
+        if kind == "float64":
+            return float(value)
+        if kind == "timestamp":
+            return parse_timestamp(value)
+    except (TypeError, ValueError):
+        return None
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def canonical(doc: dict) -> str:
+    clean = {k: v for k, v in doc.items() if k not in SYSTEM_PROPERTIES}
+    return json.dumps(clean, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def to_row(dataset: str, doc: dict) -> dict:
+    row = {
+        name: _coerce(doc.get(name), kind)
+        for name, kind in DATASETS[dataset]["columns"].items()
+    }
+    row["doc"] = canonical(doc)
+    return row
+
+
+def partition_date(doc: dict):
+    """YYYY-MM-DD from `timestamp` (or Cosmos `_ts`); None if the doc has neither."""
+    ts = parse_timestamp(doc.get("timestamp"))
+    if ts is None and doc.get("_ts"):
+        ts = datetime.fromtimestamp(doc["_ts"], tz=timezone.utc)
+    # never write a non-date partition: hive inference would type `date` as VARCHAR
+    return ts.strftime("%Y-%m-%d") if ts else None
+
+
+# =====================================================
+# Files
+# =====================================================
+
+def partition_dir(dataset: str, date: str, root: str = ARCHIVE_PATH) -> str:
+    return os.path.join(root, dataset, f"date={date}")
+
+
+def _atomic_write(path: str, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def write_part(dataset: str, date: str, part: str, docs: list, root: str = ARCHIVE_PATH) -> dict:
+    """Write one Parquet part + manifest. Returns the manifest."""
+    pa, pq = _arrow()
+
+    rows = [to_row(dataset, d) for d in docs]
+    table = pa.Table.from_pylist(rows, schema=schema(dataset))
+
+    directory = partition_dir(dataset, date, root)
+    path = os.path.join(directory, f"{part}.parquet")
+    _atomic_write(path, lambda tmp: pq.write_table(table, tmp, compression=COMPRESSION))
+
+    manifest = {
+        "dataset": dataset,
+        "date": date,
+        "part": part,
+        "file": path,
+        "rows": len(rows),
+        "digests": {r["id"]: digest(r["doc"]) for r in rows},
+        "partition_keys": {
+            d["id"]: d.get(DATASETS[dataset]["partition_key"]) or d["id"] for d in docs
+        },
+        # Cosmos _ts at archive time: expiry only applies to unchanged docs
+        "versions": {d["id"]: d.get("_ts") for d in docs},
+        "written_at": datetime.now(timezone.utc).isoformat(),
+    }
+    manifest_path = os.path.join(directory, f"{part}.manifest.json")
+    _atomic_write(manifest_path, lambda tmp: _dump(tmp, manifest))
+    return manifest
+
+
+def _dump(path: str, obj):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f)
+
+
+def load_manifest(dataset: str, date: str, part: str, root: str = ARCHIVE_PATH) -> dict:
+    path = os.path.join(partition_dir(dataset, date, root), f"{part}.manifest.json")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_part(manifest: dict) -> list:
+    """
+    Re-read the Parquet file and compare every row with the manifest.
+    Returns a list of problems (empty = verified).
+    """
+    _, pq = _arrow()
+
+    try:
+        table = pq.read_table(manifest["file"], columns=["id", "doc"])
+    except Exception as e:
+        return [f"unreadable: {e}"]
+
+    data = table.to_pydict()
+    found = {i: digest(d) for i, d in zip(data["id"], data["doc"])}
+    expected = manifest["digests"]
+
+    problems = []
+    if len(data["id"]) != manifest["rows"]:
+        problems.append(f"row count {len(data['id'])} != {manifest['rows']}")
+    missing = expected.keys() - found.keys()
+    if missing:
+        problems.append(f"{len(missing)} ids missing")
+    changed = [i for i in expected.keys() & found.keys() if expected[i] != found[i]]
+    if changed:
+        problems.append(f"{len(changed)} rows differ")
+    return problems
+
+
+def quarantine_part(manifest: dict):
+    """Take a bad part out of the dataset (readers only glob *.parquet)."""
+    if os.path.exists(manifest["file"]):
+        os.replace(manifest["file"], manifest["file"] + ".failed")
+
+
+# =====================================================
+# Checkpoints
+# =====================================================
+
+def checkpoint_path(dataset: str, root: str = ARCHIVE_PATH) -> str:
+    return os.path.join(root, "_checkpoints", f"{dataset}.json")
+
+
+def load_checkpoint(dataset: str, root: str = ARCHIVE_PATH) -> dict:
+    try:
+        with open(checkpoint_path(dataset, root), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"dataset": dataset, "parts": {}}
+
+
+def save_checkpoint(checkpoint: dict, root: str = ARCHIVE_PATH):
+    checkpoint["updated_at"] = datetime.now(timezone.utc).isoformat()
+    _atomic_write(
+        checkpoint_path(checkpoint["dataset"], root),
+        lambda tmp: _dump(tmp, checkpoint),
+    )
@@ -1,13 +1,336 @@
-from datetime import datetime, timezone
-import uuid
+"""
+Audit log.
+
+audit_log() only enqueues: a background writer drains the bounded queue
+in batches into the audit_logs container, so no request or evaluator
+loop waits on a Cosmos round trip. While Cosmos is failing, batches are
+appended to a local JSON-lines spill file (one per process, named by
+pid, so gunicorn workers never share one) and replayed once writes
+succeed again; spill files left by dead processes are adopted by the
+next replay. Ids are assigned at enqueue time, so a replay after a
+partial write is idempotent. When the queue is full, events are dropped
+and counted — audit must never break (or block) the main flow.
+
+Entries live in `audit_by_day` (partition key /day = "YYYY-MM-DD"), so a
+page of recent entries is a few single-partition queries walked newest
+day first instead of a cross-partition ORDER BY over the whole history.
+"""
+
+import atexit
+import base64
+import glob
+import json
 import logging
-from shared.cosmos import audit_container
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from azure.cosmos import exceptions
+
+from shared.cosmos import audit_by_day_container
+
+
+QUEUE_CAPACITY = int(os.getenv("AUDIT_QUEUE_CAPACITY", "10000"))
+BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))
+FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0"))
+SPILL_PATH = os.getenv("AUDIT_SPILL_PATH", os.path.join(tempfile.gettempdir(), "audit_spill.jsonl"))  # + pid
+MAX_WRITE_RETRIES = 3
+BACKOFF_SECONDS = (5, 60)  # first pause after a failed batch, cap
+
+PARTITION_KEY_PATH = "/day"
+DEFAULT_RANGE_DAYS = 90
+
+# equality filters first, then the ORDER BY (timestamp, id tie-break)
+_ORDER = [{"path": "/timestamp", "order": "descending"}, {"path": "/id", "order": "descending"}]
+COMPOSITE_INDEXES = [
+    _ORDER,
+    [{"path": "/type", "order": "ascending"}, *_ORDER],
+    [{"path": "/action", "order": "ascending"}, *_ORDER],
+    [{"path": "/user", "order": "ascending"}, *_ORDER],
+    [{"path": "/type", "order": "ascending"}, {"path": "/action", "order": "ascending"}, *_ORDER],
+]
+
+
+class AuditWriter:
+    """Bounded queue + single batching writer thread with a disk spill."""
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        container=None,
+        capacity: int = QUEUE_CAPACITY,
+        batch_size: int = BATCH_SIZE,
+        spill_path: str = SPILL_PATH,
+    ):
+        self._container = container if container is not None else audit_by_day_container
+        self._queue = queue.Queue(maxsize=capacity)
+        self._batch_size = batch_size
+        self._spill_base = spill_path
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._pending = 0  # queued + in flight
+        self._thread = None
+        self._unhealthy_until = 0.0
+        self._backoff = BACKOFF_SECONDS[0]
+        self.counters = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "dropped": 0,
+        }
+
+    # -------------------------------------------------
+    # Producer side
+    # -------------------------------------------------
+    def submit(self, event: dict) -> bool:
+        self._ensure_started()
+        with self._lock:
+            self._pending += 1
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self._pending -= 1
+                self.counters["dropped"] += 1
+            return False
+
+        with self._lock:
+            self.counters["enqueued"] += 1
+        return True
+
+    def stats(self) -> dict:
+        spill_bytes = 0
+        for path in (self._spill_path, self._replay_path):
+            if os.path.exists(path):
+                spill_bytes += os.path.getsize(path)
+        return {
+            **self.counters,
+            "depth": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "spill_bytes": spill_bytes,
+            "writer_alive": self._thread is not None and self._thread.is_alive(),
+            "healthy": self._healthy() and (self._thread is None or self._thread.is_alive()),
+        }
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until everything enqueued so far is written or spilled."""
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self._pending == 0
+
+    def close(self, timeout: float = 10.0):
+        if self._thread is None:
+            return
+        self._ensure_started()  # a dead writer can't drain the queue
+        self.flush(timeout)
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # -------------------------------------------------
+    # Writer side
+    # -------------------------------------------------
+    def _ensure_started(self):
+        # also restarts a writer that died (or didn't survive a fork)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._thread is not None:
+                logging.error("Audit writer thread was not running; restarting it")
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> list:
+        try:
+            first = self._queue.get(timeout=FLUSH_INTERVAL_SECONDS)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stop = self._STOP in batch
+            batch = [e for e in batch if e is not self._STOP]
+
+            # one bad iteration must not kill the writer (events would pile up unseen)
+            try:
+                if batch:
+                    self._write_batch(batch)
+            except Exception:
+                logging.exception("Audit batch write failed")
+            finally:
+                with self._lock:
+                    self._pending -= len(batch)
+            try:
+                if self._healthy():
+                    self._replay()  # Cosmos is back: catch up on spilled events
+            except Exception:
+                logging.exception("Audit spill replay failed")
+
+            if stop:
+                return
+
+    def _healthy(self) -> bool:
+        return time.monotonic() >= self._unhealthy_until
+
+    def _create(self, event: dict):
+        for attempt in range(MAX_WRITE_RETRIES + 1):
+            try:
+                self._container.create_item(event)
+                return
+            except exceptions.CosmosResourceExistsError:
+                return  # replay of an event that did land
+            except exceptions.CosmosHttpResponseError as e:
+                if e.status_code == 429 and attempt < MAX_WRITE_RETRIES:
+                    time.sleep(0.1 * (2 ** attempt))
+                    continue
+                raise
+
+    def _write_events(self, events: list) -> int:
+        """Write in order; returns how many landed before the first failure."""
+        for i, event in enumerate(events):
+            try:
+                self._create(event)
+            except Exception:
+                logging.exception("Audit log write failed")
+                self._unhealthy_until = time.monotonic() + self._backoff
+                self._backoff = min(self._backoff * 2, BACKOFF_SECONDS[1])
+                return i
+        self._backoff = BACKOFF_SECONDS[0]
+        return len(events)
+
+    def _write_batch(self, batch: list):
+        written = self._write_events(batch) if self._healthy() else 0
+        with self._lock:
+            self.counters["written"] += written
+            self.counters["batches"] += 1
+        if written < len(batch):
+            self._spill(batch[written:])
+
+    # -------------------------------------------------
+    # Spill file
+    # -------------------------------------------------
+    def _spill_file(self, pid: int) -> str:
+        root, ext = os.path.splitext(self._spill_base)
+        return f"{root}.{pid}{ext}"
+
+    @property
+    def _spill_path(self) -> str:
+        # resolved per call: a writer created before a fork spills under the child's pid
+        return self._spill_file(os.getpid())
+
+    @property
+    def _replay_path(self) -> str:
+        return self._spill_path + ".replay"
+
+    def _claim_orphan(self) -> bool:
+        """Take over one spill file of a process that no longer exists."""
+        root, ext = os.path.splitext(self._spill_base)
+        for path in glob.glob(f"{glob.escape(root)}.*{ext}*"):
+            pid = path[len(root) + 1:].split(".", 1)[0]
+            if not pid.isdigit() or int(pid) == os.getpid() or _pid_alive(int(pid)):
+                continue
+            try:
+                os.replace(path, self._replay_path)  # atomic: one claimant wins
+                return True
+            except FileNotFoundError:
+                continue  # another worker claimed it first
+        return False
+
+    def _spill(self, events: list):
+        try:
+            with self._spill_lock, open(self._spill_path, "a", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+            with self._lock:
+                self.counters["spilled"] += len(events)
+        except OSError:
+            logging.exception("Audit spill failed; events dropped")
+            with self._lock:
+                self.counters["dropped"] += len(events)
+
+    def _replay(self):
+        replay_path = self._replay_path
+        with self._spill_lock:
+            if not os.path.exists(replay_path):
+                if os.path.exists(self._spill_path):
+                    os.replace(self._spill_path, replay_path)  # new spills start a fresh file
+                elif not self._claim_orphan():
+                    return
+
+        events = []
+        try:
+            with open(replay_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        self.counters["dropped"] += 1  # torn write from a crash
+        except FileNotFoundError:
+            return
+
+        for start in range(0, len(events), self._batch_size):
+            chunk = events[start:start + self._batch_size]
+            written = self._write_events(chunk)
+            with self._lock:
+                self.counters["written"] += written
+                self.counters["replayed"] += written
+            if written < len(chunk):
+                self._spill(events[start + written:])
+                break
+
+        try:
+            os.remove(replay_path)
+        except FileNotFoundError:
+            pass
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by someone else
+    return True
+
+
+# Singleton writer (drained on interpreter exit; the API also closes it on shutdown)
+audit_writer = AuditWriter()
+atexit.register(audit_writer.close)
+
+
+def day_of(timestamp: str) -> str:
+    """Partition key for an ISO timestamp (UTC day)."""
+    return timestamp[:10]
+
 
 def audit_log(action: str, type: str, user: str, details: str):
     try:
-        audit_container.create_item({
+        now = datetime.now(timezone.utc).isoformat()
+        audit_writer.submit({
             "id": f"audit_{uuid.uuid4().hex}",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "day": day_of(now),
+            "timestamp": now,
             "action": action,
             "type": type,      # evaluator | template
             "user": user,      # email or "system"
@@ -15,4 +338,84 @@ def audit_log(action: str, type: str, user: str, details: str):
         })
     except Exception:
         # 🚨 audit must NEVER break the main flow
-        logging.exception("Audit log write failed")
+        logging.exception("Audit log enqueue failed")
+
+
+# =====================================================
+# Queries (newest first, one day partition at a time)
+# =====================================================
+
+def encode_cursor(item: dict) -> str:
+    raw = json.dumps({"d": item["day"], "t": item["timestamp"], "i": item["id"]})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Raises ValueError for anything that isn't one of our cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        date.fromisoformat(data["d"])
+        return {"day": data["d"], "timestamp": data["t"], "id": data["i"]}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid audit cursor") from e
+
+
+def query_audit(
+    container,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    type: Optional[str] = None,
+    action: Optional[str] = None,
+    user: Optional[str] = None,
+    limit: int = 200,
+    cursor: Optional[str] = None,
+) -> tuple:
+    """
+    One page of entries, newest first, from the day partitions between
+    date_from and date_to (default: the last DEFAULT_RANGE_DAYS days).
+    Stops as soon as the page is full. Returns (items, next_cursor);
+    next_cursor is None once the range is exhausted.
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS)
+
+    after = decode_cursor(cursor) if cursor else None
+    day = date.fromisoformat(after["day"]) if after else date_to
+    day = min(day, date_to)
+
+    filters, params = [], []
+    for field, value in (("type", type), ("action", action), ("user", user)):
+        if value:
+            filters.append(f"c.{field} = @{field}")
+            params.append({"name": f"@{field}", "value": value})
+
+    items = []
+    while day >= date_from and len(items) < limit:
+        day_key = day.isoformat()
+        day_filters, day_params = list(filters), list(params)
+        if after and after["day"] == day_key:
+            # keyset: strictly after the last entry of the previous page
+            day_filters.append("(c.timestamp < @ts OR (c.timestamp = @ts AND c.id < @id))")
+            day_params += [
+                {"name": "@ts", "value": after["timestamp"]},
+                {"name": "@id", "value": after["id"]},
+            ]
+
+        query = "SELECT TOP @n * FROM c"
+        if day_filters:
+            query += " WHERE " + " AND ".join(day_filters)
+        query += " ORDER BY c.timestamp DESC, c.id DESC"
+
+        items += list(
+            container.query_items(
+                query=query,
+                parameters=[{"name": "@n", "value": limit - len(items)}, *day_params],
+                partition_key=day_key,
+            )
+        )
+        if len(items) < limit:
+            day -= timedelta(days=1)
+
+    next_cursor = encode_cursor(items[-1]) if len(items) >= limit else None
+    return items, next_cursor
@@ -0,0 +1,110 @@
+"""
+Set up and backfill the day-partitioned audit container.
+
+    python -m shared.audit_cli setup       # once per environment
+    python -m shared.audit_cli migrate     # copy audit_logs → audit_by_day (resumable)
+
+Run from the backend/ directory with KEY_VAULT_URI set.
+"""
+
+import argparse
+import json
+import logging
+import os
+
+from azure.cosmos import PartitionKey
+
+from shared.audit import COMPOSITE_INDEXES, PARTITION_KEY_PATH, day_of
+from shared.cosmos import COSMOS_DB, audit_container_read, audit_by_day_container, get_client
+
+
+CONTAINER = "audit_by_day"
+STATE_FILE = ".audit_migrate.json"
+
+INDEXING_POLICY = {
+    "indexingMode": "consistent",
+    "includedPaths": [{"path": "/*"}],
+    "excludedPaths": [{"path": "/details/?"}, {"path": '/"_etag"/?'}],
+    "compositeIndexes": COMPOSITE_INDEXES,
+}
+
+
+def setup() -> dict:
+    """Create the container (pk /day) or bring its indexing policy up to date."""
+    database = get_client("write").get_database_client(COSMOS_DB)
+    database.create_container_if_not_exists(
+        id=CONTAINER,
+        partition_key=PartitionKey(path=PARTITION_KEY_PATH),
+        indexing_policy=INDEXING_POLICY,
+    )
+    props = database.get_container_client(CONTAINER).read()
+    if props.get("indexingPolicy", {}).get("compositeIndexes") != COMPOSITE_INDEXES:
+        database.replace_container(
+            CONTAINER,
+            partition_key=PartitionKey(path=PARTITION_KEY_PATH),
+            indexing_policy=INDEXING_POLICY,
+        )
+        return {CONTAINER: "indexing policy updated"}
+    return {CONTAINER: "ready"}
+
+
+def migrate(page_size: int = 1000, restart: bool = False) -> dict:
+    """
+    Copy every legacy audit_logs entry, adding its day. Progress is saved
+    after each page; re-copying a page is harmless (upserts, same ids).
+    """
+    state = {"continuation": None, "copied": 0, "skipped": 0}
+    if not restart and os.path.exists(STATE_FILE):
+        with open(STATE_FILE) as f:
+            state = json.load(f)
+
+    pages = audit_container_read.query_items(
+        query="SELECT c.id, c.timestamp, c.action, c.type, c.user, c.details FROM c",
+        enable_cross_partition_query=True,
+        max_item_count=page_size,
+    ).by_page(state["continuation"])
+
+    for page in pages:
+        for entry in page:
+            if not isinstance(entry.get("timestamp"), str):
+                state["skipped"] += 1
+                continue
+            audit_by_day_container.upsert_item({**entry, "day": day_of(entry["timestamp"])})
+            state["copied"] += 1
+
+        state["continuation"] = pages.continuation_token
+        with open(STATE_FILE, "w") as f:
+            json.dump(state, f)
+        logging.info(f"[audit] migrated {state['copied']} entries")
+
+        if not state["continuation"]:
+            break
+
+    if os.path.exists(STATE_FILE):
+        os.remove(STATE_FILE)
+    return {"copied": state["copied"], "skipped": state["skipped"]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("setup", help="create audit_by_day with its composite indexes")
+
+    copy = commands.add_parser("migrate", help="copy legacy audit_logs entries")
+    copy.add_argument("--page-size", type=int, default=1000)
+    copy.add_argument("--restart", action="store_true", help="ignore saved progress")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "setup":
+        result = setup()
+    else:
+        result = migrate(args.page_size, args.restart)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Payload offloading for large trace text fields.
+
+`input` / `context` / `output` above OFFLOAD_THRESHOLD_BYTES are written
+to a content-addressed blob store (key = truncated sha256 of the UTF-8
+text, see shared/chunks.py) and the
+trace document keeps only a short preview plus a reference:
+
+    "context": "first 200 chars…",
+    "payload_refs": {"context": {"key": "<key>", "bytes": 24311}}
+
+Repeated passages (context, system prompt) are stored once per chunk
+instead, see shared/chunks.py.
+
+Readers that need the full text call hydrate_payloads(); everything else
+(Aggregator, session queries, change feed) moves the small document.
+
+Writers (TraceGenerator, the ingest buffer) and readers (EvaluatorRunner,
+the API) run on different hosts, so offloading is off unless a store
+every host can reach is configured: PAYLOAD_STORE=azure uses Azure Blob
+Storage (azure-storage-blob, connection string from Key Vault);
+PAYLOAD_STORE=local keeps blobs under PAYLOAD_STORE_PATH and is only for
+single-host setups or a path on a shared mount. If a blob is missing
+anyway, hydrate_payloads() keeps the stored preview for display; the
+evaluator passes strict=True so a truncated text is never scored.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from functools import lru_cache
+
+from shared.chunks import (
+    CHUNK_MIN_BYTES,
+    CHUNKED_FIELDS,
+    chunk_refs,
+    content_key,
+    is_chunked,
+    join_chunks,
+    split_chunks,
+)
+from shared.secrets import get_secret
+
+
+PAYLOAD_FIELDS = ("input", "context", "output")
+OFFLOAD_THRESHOLD_BYTES = int(os.getenv("PAYLOAD_OFFLOAD_THRESHOLD_BYTES", "4096"))
+PREVIEW_CHARS = 200
+
+PAYLOAD_STORE = os.getenv("PAYLOAD_STORE", "none")  # none | local | azure
+PAYLOAD_STORE_PATH = os.getenv(
+    "PAYLOAD_STORE_PATH",
+    os.path.join(tempfile.gettempdir(), "llmops-payloads"),
+)
+PAYLOAD_BLOB_CONTAINER = os.getenv("PAYLOAD_BLOB_CONTAINER", "trace-payloads")
+CHUNK_UPLOAD_CACHE_SIZE = 10000
+
+
+class PayloadUnavailable(LookupError):
+    """An offloaded or chunked field could not be restored (strict hydration)."""
+
+
+# =====================================================
+# Stores
+# =====================================================
+
+class LocalBlobStore:
+    """Filesystem stand-in: <root>/<ab>/<cd>/<key>."""
+
+    def __init__(self, root: str = PAYLOAD_STORE_PATH):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put(self, data: bytes) -> str:
+        key = content_key(data)
+        path = self._path(key)
+        if os.path.exists(path):
+            return key  # same content, already stored
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # atomic: readers never see a partial blob
+        return key
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+
+class AzureBlobStore:
+    """
+    Azure Blob Storage backend (blob name = content key). The client is
+    rebuilt when the BLOB-CONN secret rotates.
+    """
+
+    def __init__(self, container: str = PAYLOAD_BLOB_CONTAINER):
+        self._container_name = container
+        self._client = None  # (connection string, container client)
+
+    @property
+    def _container(self):
+        from azure.storage.blob import BlobServiceClient
+
+        conn = get_secret("BLOB-CONN")
+        client = self._client
+        if client is None or client[0] != conn:
+            service = BlobServiceClient.from_connection_string(conn)
+            client = self._client = (conn, service.get_container_client(self._container_name))
+        return client[1]
+
+    def put(self, data: bytes) -> str:
+        from azure.core.exceptions import ResourceExistsError
+
+        key = content_key(data)
+        try:
+            self._container.upload_blob(key, data, overwrite=False)
+        except ResourceExistsError:
+            pass  # same content, already stored
+        return key
+
+    def get(self, key: str) -> bytes:
+        return self._container.download_blob(key).readall()
+
+    def exists(self, key: str) -> bool:
+        return self._container.get_blob_client(key).exists()
+
+
+@lru_cache(maxsize=1)
+def get_store():
+    """The configured store, or None when offloading is off."""
+    if PAYLOAD_STORE == "azure":
+        return AzureBlobStore()
+    if PAYLOAD_STORE == "local":
+        return LocalBlobStore()
+    return None
+
+
+# =====================================================
+# Offload / hydrate
+# =====================================================
+
+def _preview(text: str) -> str:
+    return text[:PREVIEW_CHARS] + "…"
+
+
+@lru_cache(maxsize=CHUNK_UPLOAD_CACHE_SIZE)
+def _put_chunk(store, data: bytes) -> str:
+    # hot passages are uploaded once per process, not once per trace
+    return store.put(data)
+
+
+def offload_payloads(doc: dict, store=None, chunk: bool = True) -> dict:
+    """
+    Move large / repeated text fields of a trace document to the blob
+    store (in place): CHUNKED_FIELDS become chunk hash lists, any other
+    oversized PAYLOAD_FIELDS become a single payload reference.
+    Without a configured store the document is left as is.
+    """
+    store = store or get_store()
+    if store is None:
+        return doc
+    refs = dict(doc.get("payload_refs") or {})
+
+    for field in CHUNKED_FIELDS if chunk else ():
+        value = doc.get(field)
+        if not isinstance(value, str) or is_chunked(doc, field):
+            continue
+        if len(value.encode("utf-8")) < CHUNK_MIN_BYTES:
+            continue
+
+        keys = [_put_chunk(store, piece.encode("utf-8")) for piece in split_chunks(value)]
+        doc.update(chunk_refs(keys, field, lambda data: _put_chunk(store, data)))
+        doc[field] = _preview(value)
+
+    for field in PAYLOAD_FIELDS:
+        value = doc.get(field)
+        if not isinstance(value, str) or field in refs or is_chunked(doc, field):
+            continue
+
+        data = value.encode("utf-8")
+        if len(data) <= OFFLOAD_THRESHOLD_BYTES:
+            continue
+
+        key = store.put(data)
+        refs[field] = {"key": key, "bytes": len(data)}
+        doc[field] = _preview(value)
+
+    if refs:
+        doc["payload_refs"] = refs
+    return doc
+
+
+@lru_cache(maxsize=4096)
+def _load_text(key: str) -> str:
+    # content-addressed blobs never change, so caching by key is always safe
+    store = get_store()
+    if store is None:
+        raise LookupError(f"No payload store configured to load {key}")
+    return store.get(key).decode("utf-8")
+
+
+def hydrate_payloads(doc: dict, fields=PAYLOAD_FIELDS + CHUNKED_FIELDS, store=None,
+                     strict: bool = False) -> dict:
+    """
+    Return a copy of `doc` with offloaded / chunked fields restored to full
+    text. A field whose blob can't be read keeps its preview and is listed
+    in `payloads_missing`, or raises PayloadUnavailable with `strict`.
+    """
+    refs = doc.get("payload_refs") or {}
+    if not refs and not any(is_chunked(doc, f) for f in fields):
+        return doc
+
+    if store is None:
+        load = _load_text
+    else:
+        def load(key):
+            return store.get(key).decode("utf-8")
+
+    hydrated = dict(doc)
+    missing = []
+    for field in dict.fromkeys(fields):
+        try:
+            if is_chunked(doc, field):
+                hydrated[field] = join_chunks(doc, field, load)
+            elif field in refs:
+                hydrated[field] = load(refs[field]["key"])
+        except Exception as e:
+            if strict:
+                raise PayloadUnavailable(f"Payload for {doc.get('id')}.{field} unavailable: {e}") from e
+            logging.warning(f"Payload for {doc.get('id')}.{field} unavailable; using the preview")
+            missing.append(field)
+    if missing:
+        hydrated["payloads_missing"] = missing
+    return hydrated
@@ -0,0 +1,110 @@
+"""
+Content-addressed chunks for repeated trace text.
+
+RAG contexts are a handful of retrieved passages drawn from a shared
+corpus, and system prompts repeat verbatim across traces. Instead of
+storing every copy, CHUNKED_FIELDS are split into passages (one per
+line), each passage is stored once in the blob store under its hash,
+and the trace keeps the ordered list of hashes:
+
+    "context": "first 200 chars…",
+    "context_chunks": ["<key>", "<key>", ...]
+
+Long lists (> MAX_INLINE_CHUNKS) are themselves stored as a manifest
+blob ("\\n"-joined keys) and the trace keeps `context_manifest` only,
+so identical long contexts cost one short key per trace.
+
+Keys are the first 128 bits of sha256 (32 hex chars). Splitting on
+"\\n" and joining with "\\n" is lossless.
+
+The same hashes identify trace content for the evaluation result cache
+(trace_content_key) without loading or re-hashing the text.
+"""
+
+import hashlib
+import os
+from typing import Callable, List, Optional
+
+
+CHUNKED_FIELDS = ("context", "system_prompt")
+CHUNK_SEPARATOR = "\n"
+CHUNK_MIN_BYTES = int(os.getenv("CONTEXT_CHUNK_MIN_BYTES", "1024"))
+MAX_INLINE_CHUNKS = 16
+
+
+def content_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def text_key(text: Optional[str]) -> str:
+    return content_key((text or "").encode("utf-8"))
+
+
+def split_chunks(text: str) -> List[str]:
+    return text.split(CHUNK_SEPARATOR)
+
+
+def chunks_field(field: str) -> str:
+    return f"{field}_chunks"
+
+
+def manifest_field(field: str) -> str:
+    return f"{field}_manifest"
+
+
+def is_chunked(doc: dict, field: str) -> bool:
+    return bool(doc.get(chunks_field(field)) or doc.get(manifest_field(field)))
+
+
+def chunk_refs(keys: List[str], field: str, put: Callable[[bytes], str]) -> dict:
+    """Document fields referencing `keys`: inline list or manifest blob."""
+    if len(keys) <= MAX_INLINE_CHUNKS:
+        return {chunks_field(field): keys}
+    return {manifest_field(field): put(CHUNK_SEPARATOR.join(keys).encode("ascii"))}
+
+
+def join_chunks(doc: dict, field: str, load: Callable[[str], str]) -> str:
+    keys = doc.get(chunks_field(field))
+    if not keys:
+        keys = load(doc[manifest_field(field)]).split(CHUNK_SEPARATOR)
+    return CHUNK_SEPARATOR.join(load(key) for key in keys)
+
+
+# =====================================================
+# Trace identity for result caching
+# =====================================================
+
+def field_key(trace: dict, field: str) -> str:
+    """
+    Hash of one text field, preferring stored references over the text:
+    chunk list → hash of the hashes (which is also the manifest key),
+    offloaded payload → its blob key, inline text → hash of the text.
+    Equal text ⇒ equal key per form.
+    """
+    manifest = trace.get(manifest_field(field))
+    if manifest:
+        return manifest
+
+    chunks = trace.get(chunks_field(field))
+    if chunks:
+        return content_key(CHUNK_SEPARATOR.join(chunks).encode("ascii"))
+
+    ref = (trace.get("payload_refs") or {}).get(field)
+    if ref:
+        return ref["key"]
+
+    return text_key(trace.get(field))
+
+
+def trace_content_key(trace: dict) -> str:
+    """
+    Stable key for (question, context, answer) of a stored trace, taken
+    from the same fields the evaluator reads: `question` / `answer` when
+    set (older and OTLP producers), else `input` / `output`.
+    """
+    parts = [
+        field_key(trace, "question" if trace.get("question") else "input"),
+        field_key(trace, "context"),
+        field_key(trace, "answer" if trace.get("answer") else "output"),
+    ]
+    return content_key(":".join(parts).encode("ascii"))
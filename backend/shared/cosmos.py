@@ -4,12 +4,16 @@ Centralized Cosmos DB access layer.
 ✔ Used by Azure Functions
 ✔ Used by App Service (FastAPI)
 ✔ Secrets loaded from Azure Key Vault via Managed Identity
+✔ Rotated connection strings picked up when the secret cache expires
 ✔ Read / Write separation supported
 ✔ No env vars, no .env, no duplication
+✔ Lazy: clients connect on first use, only for containers actually used
 """
 
+import threading
+
 from azure.cosmos import CosmosClient
-from shared.secrets import get_secret
+from shared.secrets import get_secret, prefetch
 
 
 # =====================================================
@@ -18,50 +22,95 @@ from shared.secrets import get_secret
 
 COSMOS_DB = "llmops-data"  # not secret, keep static
 
-COSMOS_CONN_READ = get_secret("COSMOS-CONN-READ")
-COSMOS_CONN_WRITE = get_secret("COSMOS-CONN-WRITE")
+_CONN_SECRETS = {
+    "read": "COSMOS-CONN-READ",
+    "write": "COSMOS-CONN-WRITE",
+}
+
+_client_lock = threading.Lock()
 
 
 # =====================================================
-# Cosmos Clients
+# Cosmos Clients (created on first use)
 # =====================================================
 
-_client_read = CosmosClient.from_connection_string(
-    COSMOS_CONN_READ
-)
+_clients = {}     # mode -> (connection string, CosmosClient)
+_containers = {}  # (name, mode) -> (CosmosClient, container client)
 
-_client_write = CosmosClient.from_connection_string(
-    COSMOS_CONN_WRITE
-)
 
+def get_client(mode: str = "write") -> CosmosClient:
+    """
+    The client for `mode`. Connection strings come from the secret TTL
+    cache on every call, so a rotated one gets a new client once its
+    cache entry expires.
+    """
+    # Both connection strings arrive in one concurrent Key Vault round trip
+    prefetch(*_CONN_SECRETS.values())
+    conn = get_secret(_CONN_SECRETS[mode])
 
-# =====================================================
-# Database Clients
-# =====================================================
+    current = _clients.get(mode)
+    if current is None or current[0] != conn:
+        with _client_lock:
+            current = _clients.get(mode)
+            if current is None or current[0] != conn:
+                current = _clients[mode] = (conn, CosmosClient.from_connection_string(conn))
+    return current[1]
+
+
+def get_container(name: str, mode: str = "write"):
+    client = get_client(mode)
+    cached = _containers.get((name, mode))
+    if cached is None or cached[0] is not client:
+        container = client.get_database_client(COSMOS_DB).get_container_client(name)
+        cached = _containers[(name, mode)] = (client, container)
+    return cached[1]
+
+
+class _LazyContainer:
+    """Container proxy that resolves the real client on first attribute access."""
+
+    def __init__(self, name: str, mode: str):
+        self._name = name
+        self._mode = mode
+
+    def __getattr__(self, attr):
+        return getattr(get_container(self._name, self._mode), attr)
 
-_db_read = _client_read.get_database_client(COSMOS_DB)
-_db_write = _client_write.get_database_client(COSMOS_DB)
+    def __repr__(self):
+        return f"<LazyContainer {self._name} ({self._mode})>"
 
 
 # =====================================================
 # Container Clients (READ)
 # =====================================================
 
-traces_container_read = _db_read.get_container_client("traces")
-evaluations_container_read = _db_read.get_container_client("evaluations")
-metrics_container_read = _db_read.get_container_client("metrics")
-templates_container_read = _db_read.get_container_client("templates")
-evaluators_container_read = _db_read.get_container_client("evaluators")
-audit_container_read = _db_read.get_container_client("audit_logs")
+traces_container_read = _LazyContainer("traces", "read")
+evaluations_container_read = _LazyContainer("evaluations", "read")
+metrics_container_read = _LazyContainer("metrics", "read")
+templates_container_read = _LazyContainer("templates", "read")
+evaluators_container_read = _LazyContainer("evaluators", "read")
+audit_container_read = _LazyContainer("audit_logs", "read")
+eval_deadletters_container_read = _LazyContainer("eval_deadletters", "read")
+traces_by_session_container_read = _LazyContainer("traces_by_session", "read")
+audit_by_day_container_read = _LazyContainer("audit_by_day", "read")
+alert_rules_container_read = _LazyContainer("alert_rules", "read")
+alerts_container_read = _LazyContainer("alerts", "read")
 
 
 # =====================================================
 # Container Clients (WRITE)
 # =====================================================
 
-traces_container = _db_write.get_container_client("traces")
-evaluations_container = _db_write.get_container_client("evaluations")
-metrics_container = _db_write.get_container_client("metrics")
-templates_container = _db_write.get_container_client("templates")
-evaluators_container = _db_write.get_container_client("evaluators")
-audit_container = _db_write.get_container_client("audit_logs")
+traces_container = _LazyContainer("traces", "write")
+evaluations_container = _LazyContainer("evaluations", "write")
+metrics_container = _LazyContainer("metrics", "write")
+templates_container = _LazyContainer("templates", "write")
+evaluators_container = _LazyContainer("evaluators", "write")
+audit_container = _LazyContainer("audit_logs", "write")
+eval_retries_container = _LazyContainer("eval_retries", "write")
+eval_deadletters_container = _LazyContainer("eval_deadletters", "write")
+eval_cache_container = _LazyContainer("eval_cache", "write")
+traces_by_session_container = _LazyContainer("traces_by_session", "write")
+audit_by_day_container = _LazyContainer("audit_by_day", "write")
+alert_rules_container = _LazyContainer("alert_rules", "write")
+alerts_container = _LazyContainer("alerts", "write")
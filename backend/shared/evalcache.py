@@ -0,0 +1,109 @@
+"""
+Evaluation result cache keyed on trace content.
+
+Deterministic (temperature 0) evaluators give the same verdict for the
+same question / context / answer, and synthetic or replayed traffic
+repeats those triples a lot. Results are cached under
+
+    sha256(<evaluator scope> + trace_content_key(trace))
+
+where the scope is the template id plus a hash of everything that
+shapes the verdict: template version, a fingerprint of the template's
+source (prompt included) and the evaluator's pre-screen gate and shadow
+rate. Editing a template or an evaluator's execution settings therefore
+starts fresh entries, and evaluators never share verdicts produced under
+different gating. Only LLM verdicts are stored. trace_content_key uses the chunk / payload
+hashes already on the stored trace, so a lookup never loads the text.
+
+Two tiers: an in-process LRU, then the `eval_cache` container
+(id = partition key = cache key, expired by container TTL).
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from azure.cosmos import exceptions
+
+from shared.chunks import content_key, trace_content_key
+from Templates.registry import gate_settings, template_fingerprint
+
+
+LOCAL_CACHE_SIZE = 10000
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+# Only the verdict is reused; timing / token fields describe a real call
+CACHED_FIELDS = (
+    "score",
+    "explanation",
+    "method",
+    "prescreen_score",
+    "prescreen_confident",
+)
+
+
+def evaluator_scope(evaluator: dict) -> str | None:
+    template = evaluator.get("template", {})
+    template_id = template.get("id")
+    if not template_id:
+        return None
+
+    settings = {
+        "version": template.get("version", 1),
+        "code": template_fingerprint(template_id),
+        "gate": gate_settings(template_id, evaluator.get("execution", {})),
+    }
+    digest = content_key(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    return f"{template_id}@{digest[:16]}"
+
+
+def cache_key(scope: str, trace: dict) -> str:
+    return content_key(f"{scope}:{trace_content_key(trace)}".encode("utf-8"))
+
+
+class EvalResultCache:
+    def __init__(self, container, size: int = LOCAL_CACHE_SIZE):
+        self._container = container
+        self._size = size
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            if key in self._local:
+                self._local.move_to_end(key)
+                self.hits += 1
+                return self._local[key]
+
+        try:
+            doc = self._container.read_item(item=key, partition_key=key)
+        except exceptions.CosmosResourceNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        result = {f: doc.get(f) for f in CACHED_FIELDS}
+        self._remember(key, result)
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: dict):
+        result = {f: result.get(f) for f in CACHED_FIELDS}
+        self._remember(key, result)
+        self._container.upsert_item({
+            "id": key,
+            **result,
+            "cached_at": datetime.now(timezone.utc).isoformat(),
+            "ttl": CACHE_TTL_SECONDS,
+        })
+
+    def _remember(self, key: str, result: dict):
+        with self._lock:
+            self._local[key] = result
+            self._local.move_to_end(key)
+            while len(self._local) > self._size:
+                self._local.popitem(last=False)
@@ -0,0 +1,188 @@
+"""
+Pre-binned distributions for dashboard charts.
+
+The Aggregator counts every trace / evaluation into fixed, fine-grained
+base bins (log-spaced for latency, cost and tokens; 0.01 wide for
+scores). The API re-bins those counters to whatever the chart asks for,
+so response size and time depend on the number of bins and groups, not
+on the number of traces. Re-binning assigns each base bin to the output
+bin holding its midpoint; with 20 base bins per decade the error is
+below one base bin (~12% of the value on log scales).
+"""
+
+import bisect
+import math
+from typing import Dict, List, Optional
+
+
+class BaseBins:
+    def __init__(self, scale: str, lo: float, hi: float, n: int):
+        self.scale = scale  # "log" | "linear"
+        self.lo, self.hi, self.n = lo, hi, n
+        if scale == "log":
+            self._a, self._w = math.log10(lo), (math.log10(hi) - math.log10(lo)) / n
+        else:
+            self._a, self._w = lo, (hi - lo) / n
+
+    def index(self, value: float) -> int:
+        """Base bin of a value; out-of-range values land in the end bins."""
+        if self.scale == "log":
+            if value <= self.lo:
+                return 0
+            x = math.log10(value)
+        else:
+            x = value
+        return min(self.n - 1, max(0, int((x - self._a) / self._w)))
+
+    def mid(self, i: int) -> float:
+        x = self._a + (i + 0.5) * self._w
+        return 10 ** x if self.scale == "log" else x
+
+
+BASE_BINS = {
+    "latency_ms": BaseBins("log", 1, 1e6, 120),
+    "cost": BaseBins("log", 1e-6, 100, 160),
+    "tokens": BaseBins("log", 1, 1e6, 120),
+    "score": BaseBins("linear", 0, 1, 100),
+}
+
+GROUP_BY = ("model", "trace_name")
+
+
+class Histogram:
+    """Sparse base-bin counts plus exact count / sum / min / max."""
+
+    def __init__(self, metric: str):
+        self.bins = BASE_BINS[metric]
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        if value is None or isinstance(value, bool):
+            return
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return
+        if math.isnan(value) or math.isinf(value):
+            return
+
+        i = self.bins.index(value)
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def to_doc(self) -> Dict:
+        return {
+            "counts": {str(i): c for i, c in sorted(self.counts.items())},
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class HistogramSet:
+    """One metric's histograms: overall plus per group-by value."""
+
+    def __init__(self, metric: str):
+        self.metric = metric
+        self.all = Histogram(metric)
+        self.groups = {g: {} for g in GROUP_BY}
+
+    def add(self, value, labels: Dict):
+        self.all.add(value)
+        for g in GROUP_BY:
+            key = labels.get(g) or "unknown"
+            if key not in self.groups[g]:
+                self.groups[g][key] = Histogram(self.metric)
+            self.groups[g][key].add(value)
+
+    def to_doc(self) -> Dict:
+        return {
+            "all": self.all.to_doc(),
+            **{g: {k: h.to_doc() for k, h in hs.items()} for g, hs in self.groups.items()},
+        }
+
+
+# =====================================================
+# Read side (re-binning stored counters)
+# =====================================================
+
+def _edges(bins: BaseBins, n: int, lo: float, hi: float) -> List[float]:
+    if bins.scale == "log":
+        a, b = math.log10(lo), math.log10(hi)
+        return [10 ** (a + (b - a) * k / n) for k in range(n + 1)]
+    return [lo + (hi - lo) * k / n for k in range(n + 1)]
+
+
+def _percentile(bins: BaseBins, counts: Dict[int, int], total: int, q: float) -> Optional[float]:
+    if not total:
+        return None
+    rank = max(1, math.ceil(q / 100 * total))
+    seen = 0
+    for i in sorted(counts):
+        seen += counts[i]
+        if seen >= rank:
+            return bins.mid(i)
+    return None
+
+
+def rebin(
+    metric: str,
+    hists: Dict[str, Dict],
+    bins: int = 20,
+    lo: Optional[float] = None,
+    hi: Optional[float] = None,
+) -> Dict:
+    """
+    Re-bin stored histograms (name -> to_doc() dict) onto shared edges.
+    The range defaults to the observed min / max across all of them
+    (the full 0..1 for scores); values outside an explicit range are
+    counted in the first / last bin.
+    """
+    base = BASE_BINS[metric]
+    docs = {name: h for name, h in hists.items() if h.get("count")}
+
+    if base.scale == "linear":
+        lo = base.lo if lo is None else lo
+        hi = base.hi if hi is None else hi
+    else:
+        if lo is None:
+            mins = [h["min"] for h in docs.values() if h.get("min") is not None]
+            lo = max(min(mins), base.lo) if mins else base.lo
+        if hi is None:
+            maxes = [h["max"] for h in docs.values() if h.get("max") is not None]
+            hi = max(maxes) if maxes else base.hi
+        lo = max(lo, base.lo)
+    if hi <= lo:
+        hi = lo * 10 if base.scale == "log" else lo + 1
+
+    edges = _edges(base, bins, lo, hi)
+
+    groups = {}
+    for name, h in docs.items():
+        counts = {int(i): c for i, c in h["counts"].items()}
+        out = [0] * bins
+        for i, c in counts.items():
+            j = bisect.bisect_right(edges, base.mid(i)) - 1
+            out[min(bins - 1, max(0, j))] += c
+        groups[name] = {
+            "counts": out,
+            "count": h["count"],
+            "mean": h["sum"] / h["count"],
+            "min": h["min"],
+            "max": h["max"],
+            **{
+                # bin midpoint, kept inside the observed range
+                f"p{q}": min(max(_percentile(base, counts, h["count"], q), h["min"]), h["max"])
+                for q in (50, 95, 99)
+            },
+        }
+
+    return {"edges": edges, "groups": groups}
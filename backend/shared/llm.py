@@ -0,0 +1,259 @@
+"""
+Shared Azure OpenAI call path for the evaluator templates.
+
+Configuration comes from Key Vault on first call (four secrets fetched
+concurrently, re-read as the secret cache expires) and a pooled
+requests.Session is reused across calls, so importing a template costs
+nothing.
+
+Every call runs under a hard deadline. Once an attempt outlives the
+observed p95 for its evaluator, a duplicate request is sent and the
+first answer wins (bounded by HEDGE_BUDGET).
+"""
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+import requests
+
+from shared.secrets import get_secret, prefetch
+from shared.stats import LatencyWindow
+AZURE_SECRETS = (
+    "AZURE-OPENAI-KEY",
+    "AZURE-OPENAI-ENDPOINT",
+    "AZURE-OPENAI-DEPLOYMENT",
+    "AZURE-OPENAI-API-VERSION",
+)
+
+DEFAULT_DEADLINE_SECONDS = 30
+
+HEDGE_PERCENTILE = 95
+HEDGE_BUDGET = 0.10      # max hedged calls as a share of all calls
+HEDGE_MIN_SAMPLES = 20   # no hedging until the p95 is meaningful
+MAX_WORKERS = 32
+
+
+# =====================================================
+# Lazy configuration / client
+# =====================================================
+
+_config_lock = threading.Lock()
+_config = None  # (secret values, config built from them)
+
+
+def get_config() -> dict:
+    """
+    Endpoint and headers from Key Vault. The secrets come from the TTL
+    cache in shared.secrets, so a rotated key or endpoint is picked up
+    once its cache entry expires; the config is rebuilt only then.
+    """
+    global _config
+    prefetch(*AZURE_SECRETS)
+    values = tuple(get_secret(name) for name in AZURE_SECRETS)
+
+    with _config_lock:
+        if _config is None or _config[0] != values:
+            _config = (values, _build_config(*values))
+        return _config[1]
+
+
+def _build_config(key: str, endpoint: str, deployment: str, api_version: str) -> dict:
+    endpoint = endpoint.rstrip("/") + "/"
+    if not endpoint.startswith("https://"):
+        raise RuntimeError("❌ AZURE_OPENAI_ENDPOINT looks incorrect")
+
+    return {
+        "url": (
+            f"{endpoint}"
+            f"openai/deployments/{deployment}/chat/completions"
+            f"?api-version={api_version}"
+        ),
+        "headers": {
+            "Content-Type": "application/json",
+            "api-key": key,
+        },
+    }
+
+
+@lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    return requests.Session()
+
+
+# =====================================================
+# Deadlines + hedging
+# =====================================================
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+# Per-call overrides set by the runner from the evaluator's execution config
+_policy = ContextVar("llm_call_policy", default={})
+
+
+@contextmanager
+def call_policy(deadline_ms=None, hedge=None):
+    """Override deadline / hedging for LLM calls made inside the block."""
+    policy = {}
+    if isinstance(deadline_ms, (int, float)) and deadline_ms > 0:
+        policy["deadline_s"] = deadline_ms / 1000
+    if hedge is not None:
+        policy["hedge"] = bool(hedge)
+
+    token = _policy.set(policy)
+    try:
+        yield
+    finally:
+        _policy.reset(token)
+
+
+_latency = defaultdict(LatencyWindow)
+_counts = defaultdict(lambda: {"calls": 0, "hedges": 0})
+_counts_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="llm")
+
+
+def _take_hedge(key: str) -> bool:
+    with _counts_lock:
+        c = _counts[key]
+        if c["hedges"] < HEDGE_BUDGET * c["calls"]:
+            c["hedges"] += 1
+            return True
+        return False
+
+
+def hedge_stats() -> dict:
+    with _counts_lock:
+        counts = {k: dict(v) for k, v in _counts.items()}
+    for key, c in counts.items():
+        c["p95_ms"] = _latency[key].percentile(HEDGE_PERCENTILE)
+        if c["p95_ms"] is not None:
+            c["p95_ms"] = round(c["p95_ms"] * 1000, 1)
+    return counts
+
+
+def hedged_call(attempt, key: str, deadline_s: float, hedge: bool = True):
+    """
+    Run `attempt(timeout_s)` with a hard deadline, hedging once past p95.
+
+    Each attempt receives the time left until the deadline, so a losing
+    or abandoned attempt ends by then at the latest; its result is
+    discarded. Not-yet-started attempts are cancelled outright.
+    """
+    started = time.monotonic()
+    deadline = started + deadline_s
+    window = _latency[key]
+
+    with _counts_lock:
+        _counts[key]["calls"] += 1
+
+    hedge_at = None
+    if hedge and len(window) >= HEDGE_MIN_SAMPLES:
+        hedge_at = started + window.percentile(HEDGE_PERCENTILE)
+
+    def timed(timeout_s):
+        t0 = time.monotonic()
+        result = attempt(timeout_s)
+        window.add(time.monotonic() - t0)  # per-attempt latency, winners and losers
+        return result
+
+    pending = [_pool().submit(timed, deadline_s)]
+    error = None
+
+    while pending:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+
+        wait_until = deadline
+        if hedge_at is not None:
+            wait_until = min(deadline, max(now, hedge_at))
+
+        done, _ = wait(pending, timeout=wait_until - now, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            pending.remove(future)
+            if future.exception() is None:
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            error = future.exception()
+
+        if (
+            hedge_at is not None
+            and pending
+            and time.monotonic() >= hedge_at
+        ):
+            hedge_at = None  # at most one hedge per call
+            if _take_hedge(key):
+                remaining = deadline - time.monotonic()
+                pending.append(_pool().submit(timed, remaining))
+
+    for future in pending:
+        future.cancel()
+
+    if error is not None and not pending:
+        raise error
+    raise DeadlineExceeded(f"LLM call '{key}' exceeded {deadline_s:.1f}s deadline")
+
+
+# =====================================================
+# Chat Completion
+# =====================================================
+
+def chat_completion(
+    system_prompt: str,
+    prompt: str,
+    max_tokens: int,
+    name: str = "default",
+    deadline_s: float = DEFAULT_DEADLINE_SECONDS,
+) -> tuple:
+    """
+    Returns (content, usage) for a single deterministic completion.
+    `name` keys the latency window used for hedging (one per evaluator).
+    """
+    config = get_config()
+    policy = _policy.get()
+
+    payload = {
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": 0,
+        "max_tokens": max_tokens,
+    }
+
+    def attempt(timeout_s):
+        response = get_session().post(
+            config["url"],
+            headers=config["headers"],
+            json=payload,
+            timeout=timeout_s,
+        )
+        with response:
+            response.raise_for_status()
+            data = response.json()
+
+        choices = data.get("choices", [])
+        if not choices:
+            raise ValueError("No choices returned from Azure OpenAI")
+
+        return choices[0]["message"]["content"], data.get("usage", {})
+
+    return hedged_call(
+        attempt,
+        key=name,
+        deadline_s=policy.get("deadline_s", deadline_s),
+        hedge=policy.get("hedge", True),
+    )
@@ -0,0 +1,91 @@
+"""
+Retry queue + dead-letter helpers for failed evaluations.
+
+Failed / timed-out evaluations are parked in `eval_retries` with an
+exponential backoff. The EvaluatorRetry timer re-runs due items; after
+MAX_ATTEMPTS they move to `eval_deadletters`, where the replay command
+can re-drive them in bulk.
+
+Both containers mirror `evaluations`: id = "<trace_id>:<evaluator>",
+partition key = trace_id.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+
+MAX_ATTEMPTS = 5
+BASE_DELAY_SECONDS = 30
+MAX_DELAY_SECONDS = 3600
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with full jitter (attempt is 1-based)."""
+    cap = min(MAX_DELAY_SECONDS, BASE_DELAY_SECONDS * (2 ** (attempt - 1)))
+    return random.uniform(0, cap)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def is_failure(doc: dict) -> bool:
+    """An evaluation counts as failed when it produced no score."""
+    return doc.get("status") != "completed" or doc.get("score") is None
+
+
+def schedule_retry(container, eval_doc: dict, evaluator: dict, attempts: int = 0):
+    """
+    Park a failed evaluation for a later attempt.
+    `attempts` is the number of retries already made.
+    """
+    attempt = attempts + 1
+    container.upsert_item({
+        "id": eval_doc["id"],
+        "trace_id": eval_doc["trace_id"],
+        "evaluator_name": eval_doc["evaluator_name"],
+        "evaluator": evaluator,
+        "attempts": attempts,
+        "last_error": eval_doc.get("explanation", ""),
+        "last_status": eval_doc.get("status"),
+        "next_attempt_at": (
+            _now() + timedelta(seconds=backoff_seconds(attempt))
+        ).isoformat(),
+        "updated_at": _now().isoformat(),
+    })
+
+
+def dead_letter(retry_container, deadletter_container, retry_doc: dict, error: str):
+    """Move an exhausted retry item to the dead-letter container."""
+    deadletter_container.upsert_item({
+        "id": retry_doc["id"],
+        "trace_id": retry_doc["trace_id"],
+        "evaluator_name": retry_doc["evaluator_name"],
+        "evaluator": retry_doc.get("evaluator", {}),
+        "attempts": retry_doc.get("attempts", 0),
+        "last_error": error,
+        "dead_lettered_at": _now().isoformat(),
+        "replays": retry_doc.get("replays", 0),
+    })
+    retry_container.delete_item(
+        item=retry_doc["id"],
+        partition_key=retry_doc["trace_id"],
+    )
+
+
+def due_retries(container, limit: int = 50) -> list:
+    """Retry items whose backoff has elapsed (oldest first)."""
+    return list(
+        container.query_items(
+            query=(
+                "SELECT TOP @limit * FROM c "
+                "WHERE c.next_attempt_at <= @now "
+                "ORDER BY c.next_attempt_at"
+            ),
+            parameters=[
+                {"name": "@limit", "value": limit},
+                {"name": "@now", "value": _now().isoformat()},
+            ],
+            enable_cross_partition_query=True,
+        )
+    )
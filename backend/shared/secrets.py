@@ -1,16 +1,89 @@
+"""
+Key Vault access with a process-wide TTL cache.
+
+Nothing touches the network at import time: the SecretClient is built on
+first use, and `prefetch()` pulls a set of secrets concurrently so a cold
+start pays one round trip instead of one per secret.
+
+Callers read through get_secret() on every use rather than holding on
+to values, so rotated secrets are picked up once the cache entry
+expires. If Key Vault can't be reached at that point the old value is
+kept and the fetch retried after SECRET_RETRY_SECONDS.
+"""
+
+import logging
 import os
-from azure.identity import DefaultAzureCredential
-from azure.keyvault.secrets import SecretClient
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+SECRET_TTL_SECONDS = int(os.getenv("SECRET_TTL_SECONDS", "3600"))
+SECRET_RETRY_SECONDS = 60
+
+_lock = threading.Lock()
+_client = None
+_cache = {}  # name -> (value, expires_at monotonic)
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                key_vault_uri = os.getenv("KEY_VAULT_URI")
+                if not key_vault_uri:
+                    raise RuntimeError("KEY_VAULT_URI not set")
+
+                from azure.identity import DefaultAzureCredential
+                from azure.keyvault.secrets import SecretClient
 
-KEY_VAULT_URI = os.getenv("KEY_VAULT_URI")
-if not KEY_VAULT_URI:
-    raise RuntimeError("KEY_VAULT_URI not set")
+                _client = SecretClient(
+                    vault_url=key_vault_uri,
+                    credential=DefaultAzureCredential()
+                )
+    return _client
+
+
+def _cached(name: str):
+    entry = _cache.get(name)
+    if entry and entry[1] > time.monotonic():
+        return entry[0]
+    return None
+
+
+def _fetch(name: str) -> str:
+    try:
+        value = _get_client().get_secret(name).value
+    except Exception as e:
+        stale = _cache.get(name)
+        if stale is None:
+            raise
+        logger.warning(f"Refreshing secret '{name}' failed, keeping the cached value: {e}")
+        _cache[name] = (stale[0], time.monotonic() + SECRET_RETRY_SECONDS)
+        return stale[0]
+    _cache[name] = (value, time.monotonic() + SECRET_TTL_SECONDS)
+    return value
 
-_credential = DefaultAzureCredential()
-_client = SecretClient(
-    vault_url=KEY_VAULT_URI,
-    credential=_credential
-)
 
 def get_secret(name: str) -> str:
-    return _client.get_secret(name).value
+    value = _cached(name)
+    if value is not None:
+        return value
+    return _fetch(name)
+
+
+def prefetch(*names: str):
+    """Load every missing / expired secret in parallel."""
+    missing = [n for n in names if _cached(n) is None]
+    if not missing:
+        return
+
+    _get_client()  # build once, outside the pool
+    with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+        list(pool.map(_fetch, missing))
+
+
+def clear_cache():
+    _cache.clear()
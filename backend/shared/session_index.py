@@ -0,0 +1,78 @@
+"""
+Session-keyed secondary index for traces.
+
+Traces are partitioned by trace_id, so "all traces of a session" is a
+cross-partition fan-out. The `traces_by_session` container (partition
+key /session_id) holds one lightweight reference per trace, kept in sync
+from the traces change feed (SessionIndexer), so session views are
+single-partition queries ordered by timestamp.
+
+A reference carries the fields list / session views show plus short
+text previews; the full trace is still one point read away (id = pk =
+trace_id in `traces`).
+"""
+
+from shared.blobstore import PREVIEW_CHARS
+
+
+REF_FIELDS = (
+    "trace_id",
+    "session_id",
+    "user_id",
+    "trace_name",
+    "timestamp",
+    "model",
+    "latency_ms",
+    "tokens",
+    "tokens_in",
+    "tokens_out",
+    "cost",
+)
+PREVIEW_FIELDS = ("input", "output")
+
+
+def _preview(value):
+    if not isinstance(value, str) or len(value) <= PREVIEW_CHARS:
+        return value
+    return value[:PREVIEW_CHARS] + "…"
+
+
+def session_ref(trace: dict) -> dict | None:
+    """Index entry for a trace, or None when it has no session."""
+    session_id = trace.get("session_id")
+    trace_id = trace.get("trace_id") or trace.get("id")
+    if not session_id or not trace_id:
+        return None
+
+    # absent fields stay absent (readers use .get defaults, never None)
+    ref = {field: trace[field] for field in REF_FIELDS if trace.get(field) is not None}
+    ref.update({
+        field: _preview(trace[field]) for field in PREVIEW_FIELDS if trace.get(field) is not None
+    })
+    ref.update({
+        "id": trace_id,
+        "trace_id": trace_id,
+        "source_ts": trace.get("_ts"),  # trace version the ref was built from
+    })
+
+    # archived traces carry a ttl (RetentionArchiver) — expire the ref with them
+    if "ttl" in trace:
+        ref["ttl"] = trace["ttl"]
+    return ref
+
+
+def session_traces(container, session_id: str, newest_first: bool = False, limit: int | None = None) -> list:
+    """All refs of one session in timestamp order (single partition)."""
+    query = "SELECT * FROM c ORDER BY c.timestamp " + ("DESC" if newest_first else "ASC")
+    params = []
+    if limit:
+        query = query.replace("SELECT *", "SELECT TOP @limit *")
+        params.append({"name": "@limit", "value": limit})
+
+    return list(
+        container.query_items(
+            query=query,
+            parameters=params,
+            partition_key=session_id,
+        )
+    )
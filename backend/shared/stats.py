@@ -0,0 +1,36 @@
+"""
+Small, dependency-free statistics helpers shared by Functions and the API.
+"""
+
+import math
+import threading
+from collections import deque
+
+
+def percentile(values, q: float):
+    """Nearest-rank percentile (q in 0..100). None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class LatencyWindow:
+    """Thread-safe window of the most recent N latency samples."""
+
+    def __init__(self, size: int = 500):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, value: float):
+        with self._lock:
+            self._samples.append(value)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, q: float):
+        with self._lock:
+            samples = list(self._samples)
+        return percentile(samples, q)
@@ -100,6 +100,11 @@ const TraceModal = ({
                   <label className="text-[10px] uppercase text-gray-500 font-black">
                     Retrieval Context
                   </label>
+                  {selectedTrace.payloads_missing?.includes("context") && (
+                    <p className="mt-1 text-[10px] text-amber-400">
+                      Full text unavailable — showing a truncated preview.
+                    </p>
+                  )}
                   <div className="mt-2 bg-[#0e1117] border border-gray-800 rounded-xl p-4 text-xs text-gray-400 whitespace-pre-wrap">
                     {typeof selectedTrace.context === "string"
                       ? selectedTrace.context